@@ -0,0 +1,400 @@
+from __future__ import annotations
+
+"""Memory-mapped columnar archive for deep candle history.
+
+One file per (exchange, symbol, timeframe):
+
+    <root>/<exchange>/<symbol>/<timeframe>.candles
+
+    header   64 bytes: magic, version, flags, timeframe_ms, capacity, rows,
+             first_timestamp_ms, last_timestamp_ms
+    columns  timestamp_ms int64[capacity], then open/high/low/close/volume
+             float64[capacity], little-endian
+
+Columns are preallocated to ``capacity`` rows, so appends write in place and
+a read maps each column with ``np.memmap`` without copying. The header row
+count is rewritten only after the appended values are flushed, which makes
+it the commit point. While a series has no gaps, a timestamp maps to its row
+with one division by ``timeframe_ms``; otherwise lookups fall back to a
+binary search over the timestamp column.
+
+SQLite remains the store for the live window; this format is for research
+reads over years of bars.
+"""
+
+import argparse
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from adapters.market_data import CandleArray, MarketDataError, timeframe_to_ms
+
+MAGIC = b"PFCANDLE"
+FORMAT_VERSION = 1
+FLAG_GAP_FREE = 1
+HEADER = struct.Struct("<8sIIqqqqq")
+HEADER_SIZE = 64
+MIN_CAPACITY = 1024
+SUFFIX = ".candles"
+
+_DTYPES = ("<i8",) + ("<f8",) * 5
+
+
+class CandleArchiveError(MarketDataError):
+    """Raised when an archive file is malformed or an append is out of order."""
+
+
+@dataclass(frozen=True)
+class ArchiveHeader:
+    flags: int
+    timeframe_ms: int
+    capacity: int
+    rows: int
+    first_timestamp_ms: int
+    last_timestamp_ms: int
+
+    @property
+    def gap_free(self) -> bool:
+        return bool(self.flags & FLAG_GAP_FREE)
+
+    def pack(self) -> bytes:
+        return HEADER.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            self.flags,
+            self.timeframe_ms,
+            self.capacity,
+            self.rows,
+            self.first_timestamp_ms,
+            self.last_timestamp_ms,
+        ).ljust(HEADER_SIZE, b"\0")
+
+    @classmethod
+    def unpack(cls, raw: bytes) -> "ArchiveHeader":
+        if len(raw) < HEADER.size:
+            raise CandleArchiveError("Candle archive header is truncated.")
+        magic, version, *fields = HEADER.unpack(raw[: HEADER.size])
+        if magic != MAGIC:
+            raise CandleArchiveError("Not a candle archive file.")
+        if version != FORMAT_VERSION:
+            raise CandleArchiveError(f"Unsupported candle archive version: {version}")
+        return cls(*fields)
+
+
+def _column_offset(capacity: int, column: int) -> int:
+    return HEADER_SIZE + column * capacity * 8
+
+
+def _is_gap_free(timestamp_ms: np.ndarray, timeframe_ms: int) -> bool:
+    return bool(np.all(np.diff(timestamp_ms) == timeframe_ms))
+
+
+def _safe(part: str) -> str:
+    return part.replace("/", "_").replace(":", "_")
+
+
+class CandleArchiveFile:
+    """A single (symbol, timeframe) archive file."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def header(self) -> ArchiveHeader:
+        with open(self.path, "rb") as handle:
+            return ArchiveHeader.unpack(handle.read(HEADER_SIZE))
+
+    def __len__(self) -> int:
+        return self.header().rows if self.exists() else 0
+
+    def _write(self, candles: CandleArray, timeframe_ms: int, capacity: int) -> None:
+        """Rewrite the whole file atomically with ``capacity`` preallocated rows."""
+        rows = len(candles)
+        header = ArchiveHeader(
+            flags=FLAG_GAP_FREE if _is_gap_free(candles.timestamp_ms, timeframe_ms) else 0,
+            timeframe_ms=timeframe_ms,
+            capacity=capacity,
+            rows=rows,
+            first_timestamp_ms=int(candles.timestamp_ms[0]) if rows else -1,
+            last_timestamp_ms=int(candles.timestamp_ms[-1]) if rows else -1,
+        )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        staging = self.path.with_name(f".{self.path.name}.{os.getpid()}")
+        with open(staging, "wb") as handle:
+            handle.write(header.pack())
+            padding = np.zeros(capacity - rows, dtype="<f8").tobytes()
+            for name, dtype in zip(CandleArray.FIELDS, _DTYPES):
+                handle.write(np.asarray(getattr(candles, name), dtype=dtype).tobytes())
+                handle.write(padding)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(staging, self.path)
+
+    def append(self, candles: CandleArray, *, timeframe_ms: int) -> int:
+        """Append candles newer than the last archived one; return rows added.
+
+        Candles at or before the archived tail are ignored; use ``compact`` to
+        merge backfills or corrections into existing history.
+        """
+        if not self.exists():
+            capacity = max(MIN_CAPACITY, len(candles))
+            self._write(candles, timeframe_ms, capacity)
+            return len(candles)
+
+        header = self.header()
+        if header.timeframe_ms != timeframe_ms:
+            raise CandleArchiveError(
+                f"{self.path} holds {header.timeframe_ms} ms bars, not {timeframe_ms} ms."
+            )
+        start = int(
+            np.searchsorted(candles.timestamp_ms, header.last_timestamp_ms, side="right")
+        )
+        candles = candles[start:]
+        if len(candles) == 0:
+            return 0
+        if np.any(np.diff(candles.timestamp_ms) <= 0):
+            raise CandleArchiveError("Appended candles must be strictly increasing.")
+
+        rows = header.rows + len(candles)
+        if rows > header.capacity:
+            # Grow geometrically so repeated appends stay amortized O(new rows).
+            existing = self.read()
+            merged = CandleArray(
+                *(
+                    np.concatenate([getattr(existing, name), getattr(candles, name)])
+                    for name in CandleArray.FIELDS
+                )
+            )
+            self._write(merged, timeframe_ms, max(rows, header.capacity * 2))
+            return len(candles)
+
+        gap_free = header.gap_free and (
+            header.rows == 0
+            or int(candles.timestamp_ms[0]) - header.last_timestamp_ms == timeframe_ms
+        ) and _is_gap_free(candles.timestamp_ms, timeframe_ms)
+
+        with open(self.path, "r+b") as handle:
+            for column, (name, dtype) in enumerate(zip(CandleArray.FIELDS, _DTYPES)):
+                handle.seek(_column_offset(header.capacity, column) + header.rows * 8)
+                handle.write(np.asarray(getattr(candles, name), dtype=dtype).tobytes())
+            handle.flush()
+            os.fsync(handle.fileno())
+            handle.seek(0)
+            handle.write(
+                ArchiveHeader(
+                    flags=FLAG_GAP_FREE if gap_free else 0,
+                    timeframe_ms=timeframe_ms,
+                    capacity=header.capacity,
+                    rows=rows,
+                    first_timestamp_ms=(
+                        header.first_timestamp_ms
+                        if header.rows
+                        else int(candles.timestamp_ms[0])
+                    ),
+                    last_timestamp_ms=int(candles.timestamp_ms[-1]),
+                ).pack()
+            )
+        return len(candles)
+
+    def row_range(
+        self,
+        header: ArchiveHeader,
+        timestamps: np.ndarray,
+        start_ms: int | None,
+        end_ms: int | None,
+    ) -> tuple[int, int]:
+        """Return the ``[lo, hi)`` rows whose timestamps fall in the range."""
+        rows = header.rows
+        if header.gap_free:
+            first, step = header.first_timestamp_ms, header.timeframe_ms
+            lo = 0 if start_ms is None else -((first - start_ms) // step)
+            hi = rows if end_ms is None else (end_ms - first) // step + 1
+        else:
+            lo = 0 if start_ms is None else int(np.searchsorted(timestamps, start_ms, "left"))
+            hi = rows if end_ms is None else int(np.searchsorted(timestamps, end_ms, "right"))
+        lo = min(max(lo, 0), rows)
+        return lo, min(max(hi, lo), rows)
+
+    def read(
+        self, *, start_ms: int | None = None, end_ms: int | None = None
+    ) -> CandleArray:
+        """Return candles with ``start_ms <= timestamp_ms <= end_ms`` as views.
+
+        The columns are read-only ``np.memmap`` slices, so no candle data is
+        copied until it is touched.
+        """
+        if not self.exists():
+            return CandleArray.from_rows(())
+        header = self.header()
+        if header.rows == 0:
+            return CandleArray.from_rows(())
+
+        columns = [
+            np.memmap(
+                self.path,
+                dtype=dtype,
+                mode="r",
+                offset=_column_offset(header.capacity, column),
+                shape=(header.rows,),
+            )
+            for column, dtype in enumerate(_DTYPES)
+        ]
+        lo, hi = self.row_range(header, columns[0], start_ms, end_ms)
+        return CandleArray(*(column[lo:hi] for column in columns))
+
+    def compact(
+        self,
+        *,
+        timeframe_ms: int,
+        merge: CandleArray | None = None,
+        reserve: int = 0,
+    ) -> int:
+        """Rewrite the file sorted, de-duplicated and trimmed to its rows.
+
+        ``merge`` candles (backfills or corrections) are folded in and win
+        over archived bars with the same timestamp. ``reserve`` keeps that
+        many free rows for future appends. Returns the resulting row count.
+        """
+        if self.exists() and self.header().timeframe_ms != timeframe_ms:
+            raise CandleArchiveError(
+                f"{self.path} holds {self.header().timeframe_ms} ms bars, "
+                f"not {timeframe_ms} ms."
+            )
+        existing = self.read()
+        parts = [existing] + ([merge] if merge is not None else [])
+        combined = {
+            name: np.concatenate([np.asarray(getattr(part, name)) for part in parts])
+            for name in CandleArray.FIELDS
+        }
+        # Reverse so np.unique keeps the last occurrence, i.e. the merged bar.
+        reversed_ts = combined["timestamp_ms"][::-1]
+        _, first_in_reversed = np.unique(reversed_ts, return_index=True)
+        keep = len(reversed_ts) - 1 - first_in_reversed
+        candles = CandleArray(
+            *(
+                np.ascontiguousarray(combined[name][keep])
+                for name in CandleArray.FIELDS
+            )
+        )
+        self._write(candles, timeframe_ms, len(candles) + reserve)
+        return len(candles)
+
+
+class CandleArchive:
+    """Directory of archive files keyed by exchange, symbol and timeframe."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def file(self, *, exchange: str, symbol: str, timeframe: str) -> CandleArchiveFile:
+        return CandleArchiveFile(
+            self.root / _safe(exchange) / _safe(symbol) / f"{_safe(timeframe)}{SUFFIX}"
+        )
+
+    def append(
+        self, *, exchange: str, symbol: str, timeframe: str, candles: CandleArray
+    ) -> int:
+        return self.file(exchange=exchange, symbol=symbol, timeframe=timeframe).append(
+            candles, timeframe_ms=timeframe_to_ms(timeframe)
+        )
+
+    def read(
+        self,
+        *,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start_ms: int | None = None,
+        end_ms: int | None = None,
+    ) -> CandleArray:
+        return self.file(exchange=exchange, symbol=symbol, timeframe=timeframe).read(
+            start_ms=start_ms, end_ms=end_ms
+        )
+
+    def compact(
+        self,
+        *,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        merge: CandleArray | None = None,
+        reserve: int = 0,
+    ) -> int:
+        return self.file(exchange=exchange, symbol=symbol, timeframe=timeframe).compact(
+            timeframe_ms=timeframe_to_ms(timeframe), merge=merge, reserve=reserve
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    from config import CONFIG
+    from db.db_handler import TradingDatabaseHandler
+
+    parser = argparse.ArgumentParser(
+        description="Maintain the columnar candle archive."
+    )
+    parser.add_argument("command", choices=("append", "compact", "info"))
+    parser.add_argument("--root", default=CONFIG.candle_archive_dir)
+    parser.add_argument("--symbols", help="Comma-separated symbols (default: SYMBOLS)")
+    parser.add_argument("--timeframe", default=CONFIG.timeframe)
+    parser.add_argument(
+        "--reserve", type=int, default=0, help="Free rows kept by compact"
+    )
+    parser.add_argument("--db", default=str(CONFIG.db_path))
+    args = parser.parse_args(argv)
+    if not args.root:
+        parser.error("--root is required when CANDLE_ARCHIVE_DIR is not set")
+
+    archive = CandleArchive(args.root)
+    exchange = CONFIG.market_data_exchange_id
+    symbols = (
+        tuple(symbol.strip() for symbol in args.symbols.split(",") if symbol.strip())
+        if args.symbols
+        else CONFIG.symbols
+    )
+    db = TradingDatabaseHandler(args.db) if args.command != "info" else None
+
+    for symbol in symbols:
+        archive_file = archive.file(
+            exchange=exchange, symbol=symbol, timeframe=args.timeframe
+        )
+        if args.command == "info":
+            if not archive_file.exists():
+                print(f"ℹ️ {symbol} {args.timeframe}: no archive")
+                continue
+            header = archive_file.header()
+            print(
+                f"ℹ️ {symbol} {args.timeframe}: rows={header.rows} "
+                f"capacity={header.capacity} gap_free={header.gap_free} "
+                f"first={header.first_timestamp_ms} last={header.last_timestamp_ms}"
+            )
+            continue
+
+        stored = db.get_candle_array(
+            exchange=exchange, symbol=symbol, timeframe=args.timeframe
+        )
+        if args.command == "append":
+            added = archive.append(
+                exchange=exchange,
+                symbol=symbol,
+                timeframe=args.timeframe,
+                candles=stored,
+            )
+            print(f"✅ {symbol} {args.timeframe}: appended {added} candles")
+        else:
+            rows = archive.compact(
+                exchange=exchange,
+                symbol=symbol,
+                timeframe=args.timeframe,
+                merge=stored,
+                reserve=args.reserve,
+            )
+            print(f"✅ {symbol} {args.timeframe}: compacted to {rows} candles")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 P0 deliberately contains no live execution implementation.
 Market-data acquisition and order execution are separate contracts.
+``adapters.paper_execution`` simulates the contract without an exchange.
 """
 
 from abc import ABC, abstractmethod
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+"""Hedged market-data requests across a ranked list of exchanges.
+
+The primary is asked first. If it has not answered within the configured
+percentile of its own recent latencies, or fails, the next exchange is
+asked as well; the first valid closed-candle result wins. Losing requests
+are not cancelled (ccxt calls are blocking) but finish in the background,
+bounded by their adapter's timeout, and an adapter that is still busy is
+skipped rather than used concurrently.
+"""
+
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Sequence
+
+from adapters.market_data import (
+    Candle,
+    MarketDataAdapter,
+    MarketDataError,
+    timeframe_to_ms,
+)
+from adapters.resilience import EndpointHealth
+
+
+class HedgedMarketDataAdapter(MarketDataAdapter):
+    DEFAULT_HEDGE_DELAY_S = 2.0
+    MIN_LATENCY_SAMPLES = 10
+
+    def __init__(
+        self,
+        adapters: Sequence[MarketDataAdapter],
+        *,
+        percentile: float = 0.95,
+        default_delay_s: float = DEFAULT_HEDGE_DELAY_S,
+        clock_ms: Callable[[], int] | None = None,
+    ) -> None:
+        if not adapters:
+            raise ValueError("At least one market-data adapter is required.")
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be between 0 and 1")
+        self.adapters = list(adapters)
+        self.exchange_id = self.adapters[0].exchange_id
+        self.percentile = percentile
+        self.default_delay_s = default_delay_s
+        self.clock_ms = clock_ms or (lambda: int(time.time() * 1000))
+        self.primary_latency = EndpointHealth(window=100)
+        self.hedges = 0
+        self.served: Counter[str] = Counter()
+        self._provenance: dict[str, str] = {}
+        self._locks = [threading.Lock() for _ in self.adapters]
+        self._executor = ThreadPoolExecutor(
+            max_workers=2 * len(self.adapters), thread_name_prefix="market-data-hedge"
+        )
+
+    def hedge_delay_s(self) -> float:
+        if len(self.primary_latency) < self.MIN_LATENCY_SAMPLES:
+            return self.default_delay_s
+        return self.primary_latency.quantile(self.percentile)
+
+    def provenance(self, symbol: str) -> str:
+        return self._provenance.get(symbol, self.exchange_id)
+
+    def _validate(
+        self, candles: list[Candle], symbol: str, timeframe: str, limit: int, source: str
+    ) -> None:
+        """Reject short, unordered or stale series that passed the adapter."""
+        if len(candles) != limit:
+            raise MarketDataError(
+                f"{source} returned {len(candles)} candles for {symbol}; {limit} required."
+            )
+        timestamps = [candle.timestamp_ms for candle in candles]
+        if any(later <= earlier for earlier, later in zip(timestamps, timestamps[1:])):
+            raise MarketDataError(f"{source} returned unordered candles for {symbol}.")
+        # The newest closed bar must be present, so a lagging source cannot
+        # win the race with an older series.
+        duration_ms = timeframe_to_ms(timeframe)
+        if timestamps[-1] + 2 * duration_ms <= self.clock_ms():
+            raise MarketDataError(f"{source} candles for {symbol} are stale.")
+
+    def _fetch(self, index: int, symbol: str, timeframe: str, limit: int) -> list[Candle]:
+        adapter = self.adapters[index]
+        if not self._locks[index].acquire(blocking=False):
+            raise MarketDataError(
+                f"{adapter.exchange_id} is still serving an earlier request."
+            )
+        try:
+            started = time.monotonic()
+            candles = adapter.fetch_closed_ohlcv(symbol, timeframe, limit)
+            if index == 0:
+                self.primary_latency.observe(time.monotonic() - started)
+        finally:
+            self._locks[index].release()
+        self._validate(candles, symbol, timeframe, limit, adapter.exchange_id)
+        return candles
+
+    def fetch_ohlcv_range(
+        self, symbol: str, timeframe: str, start_ms: int, end_ms: int
+    ) -> list[Candle]:
+        """Historical ranges are not latency-critical: fail over in rank order."""
+        errors: list[str] = []
+        for adapter in self.adapters:
+            try:
+                candles = adapter.fetch_ohlcv_range(symbol, timeframe, start_ms, end_ms)
+            except Exception as exc:
+                errors.append(f"{adapter.exchange_id}: {exc}")
+                continue
+            self._provenance[symbol] = adapter.exchange_id
+            return candles
+        raise MarketDataError(
+            f"No exchange served {symbol} {timeframe} candles: {'; '.join(errors)}"
+        )
+
+    def fetch_closed_ohlcv(
+        self, symbol: str, timeframe: str, limit: int
+    ) -> list[Candle]:
+        pending: dict[Future, int] = {}
+        errors: list[str] = []
+        next_index = 0
+
+        def launch() -> None:
+            nonlocal next_index
+            future = self._executor.submit(self._fetch, next_index, symbol, timeframe, limit)
+            pending[future] = next_index
+            next_index += 1
+
+        launch()
+        delay_s = self.hedge_delay_s()
+        while pending:
+            can_hedge = next_index < len(self.adapters)
+            done, _ = wait(
+                pending,
+                timeout=delay_s if can_hedge else None,
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                # Past the latency threshold with no answer: hedge.
+                self.hedges += 1
+                launch()
+                continue
+
+            for future in done:
+                index = pending.pop(future)
+                source = self.adapters[index].exchange_id
+                try:
+                    candles = future.result()
+                except Exception as exc:
+                    errors.append(f"{source}: {exc}")
+                    continue
+                self._provenance[symbol] = source
+                self.served[source] += 1
+                return candles
+
+            if next_index < len(self.adapters):
+                # A failure needs no latency threshold to fail over.
+                launch()
+
+        raise MarketDataError(
+            f"All market-data sources failed for {symbol}: {'; '.join(errors)}"
+        )
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
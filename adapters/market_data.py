@@ -3,18 +3,36 @@ from __future__ import annotations
 """Market-data adapters.
 
 This module owns market-data access only. It must never place orders.
+ccxt is imported when the first exchange is built: loading it registers every
+exchange class, which would dominate the start-up of processes that end up
+making no request.
 """
 
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from typing import Callable, Iterable, Sequence
 
-import ccxt
+import numpy as np
+
+import metrics
+from adapters.resilience import AdaptivePacer, CircuitBreaker, EndpointHealth
+
+
+def _ccxt():
+    import ccxt
+
+    return ccxt
 
 
 class MarketDataError(RuntimeError):
     """Raised when market data cannot be fetched or validated."""
 
 
+class CircuitOpenError(MarketDataError):
+    """Raised without a network call while an endpoint or symbol circuit is open."""
+
+
 @dataclass(frozen=True)
 class Candle:
     timestamp_ms: int
@@ -31,6 +49,68 @@ class Candle:
         )
 
 
+@dataclass(frozen=True)
+class CandleArray:
+    """Column-oriented closed candles: one 1-D NumPy array per OHLCV field.
+
+    Slicing returns views, so windows over long histories cost no copies.
+    """
+
+    timestamp_ms: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    FIELDS = ("timestamp_ms", "open", "high", "low", "close", "volume")
+
+    @classmethod
+    def from_candles(cls, candles: Sequence[Candle]) -> "CandleArray":
+        return cls.from_rows(
+            (
+                candle.timestamp_ms,
+                candle.open,
+                candle.high,
+                candle.low,
+                candle.close,
+                candle.volume,
+            )
+            for candle in candles
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[float]]) -> "CandleArray":
+        """Build from ``(timestamp_ms, open, high, low, close, volume)`` rows."""
+        matrix = np.asarray(list(rows), dtype=float).reshape(-1, 6)
+        return cls(
+            timestamp_ms=matrix[:, 0].astype(np.int64),
+            open=np.ascontiguousarray(matrix[:, 1]),
+            high=np.ascontiguousarray(matrix[:, 2]),
+            low=np.ascontiguousarray(matrix[:, 3]),
+            close=np.ascontiguousarray(matrix[:, 4]),
+            volume=np.ascontiguousarray(matrix[:, 5]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamp_ms)
+
+    def __getitem__(self, index: slice) -> "CandleArray":
+        if not isinstance(index, slice):
+            raise TypeError("CandleArray supports slice indexing only.")
+        return CandleArray(
+            *(getattr(self, name)[index] for name in self.FIELDS)
+        )
+
+    def to_candles(self) -> list[Candle]:
+        return [
+            Candle(int(ts), float(o), float(h), float(l), float(c), float(v))
+            for ts, o, h, l, c, v in zip(
+                *(getattr(self, name) for name in self.FIELDS)
+            )
+        ]
+
+
 class MarketDataAdapter:
     """Abstract market-data contract."""
 
@@ -41,6 +121,16 @@ class MarketDataAdapter:
     ) -> list[Candle]:
         raise NotImplementedError
 
+    def fetch_ohlcv_range(
+        self, symbol: str, timeframe: str, start_ms: int, end_ms: int
+    ) -> list[Candle]:
+        """Closed candles opening in ``[start_ms, end_ms)``, in one request."""
+        raise NotImplementedError
+
+    def provenance(self, symbol: str) -> str:
+        """Exchange that served the most recent candles for ``symbol``."""
+        return self.exchange_id
+
 
 def timeframe_to_ms(timeframe: str) -> int:
     """Convert a CCXT-style timeframe such as 1m/1h/1d to milliseconds."""
@@ -67,58 +157,173 @@ def timeframe_to_ms(timeframe: str) -> int:
     return value * multipliers[unit]
 
 
-class BitgetMarketDataAdapter(MarketDataAdapter):
-    """Primary Bitget public market-data adapter with bounded requests."""
+class CcxtMarketDataAdapter(MarketDataAdapter):
+    """Public ccxt market-data adapter with bounded, validated requests.
 
-    exchange_id = "bitget"
-    DEFAULT_TIMEOUT_MS = 10_000
+    Every exchange call passes an endpoint circuit breaker and, for symbol
+    requests, a per-symbol breaker. Network failures trip both; other
+    exchange errors only trip the symbol's. While a circuit is open, calls
+    raise ``CircuitOpenError`` immediately instead of waiting out the
+    timeout. Request pacing widens on 429s and unusually slow responses.
+    Once enough latencies have been seen, the timeout shrinks to a multiple
+    of the observed p95.
+    """
 
-    def __init__(self, timeout_ms: int = DEFAULT_TIMEOUT_MS) -> None:
+    DEFAULT_TIMEOUT_MS = 10_000
+    MIN_TIMEOUT_MS = 2_000
+    TIMEOUT_P95_MULTIPLIER = 3.0
+    MIN_LATENCY_SAMPLES = 10
+    SLOW_RESPONSE_MULTIPLIER = 2.0
+    ENDPOINT_FAILURE_THRESHOLD = 3
+    SYMBOL_FAILURE_THRESHOLD = 2
+    CIRCUIT_RESET_S = 30.0
+
+    def __init__(
+        self,
+        exchange_id: str,
+        timeout_ms: int = DEFAULT_TIMEOUT_MS,
+        *,
+        exchange=None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
         if timeout_ms <= 0:
             raise ValueError("timeout_ms must be greater than zero")
 
-        self.exchange = ccxt.bitget(
-            {
-                "enableRateLimit": True,
-                "timeout": timeout_ms,
-            }
-        )
+        self.exchange_id = exchange_id
+        self.name = exchange_id.capitalize()
+        if exchange is None:
+            exchange_class = getattr(_ccxt(), exchange_id, None)
+            if exchange_class is None:
+                raise ValueError(f"Unknown ccxt exchange '{exchange_id}'.")
+            exchange = exchange_class(
+                {
+                    "enableRateLimit": True,
+                    "timeout": timeout_ms,
+                }
+            )
+        self.exchange = exchange
+        self.timeout_ms = timeout_ms
+        self.clock = clock
+        self.pacer = AdaptivePacer(float(self.exchange.rateLimit))
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.health: dict[str, EndpointHealth] = {}
         self._markets_loaded = False
 
+    def _breaker(self, key: str, threshold: int) -> CircuitBreaker:
+        breaker = self.breakers.get(key)
+        if breaker is None:
+            breaker = self.breakers[key] = CircuitBreaker(
+                failure_threshold=threshold,
+                reset_timeout_s=self.CIRCUIT_RESET_S,
+                clock=self.clock,
+            )
+        return breaker
+
+    def _timeout_for(self, health: EndpointHealth) -> int:
+        if len(health) < self.MIN_LATENCY_SAMPLES:
+            return self.timeout_ms
+        adaptive_ms = health.quantile(0.95) * 1000 * self.TIMEOUT_P95_MULTIPLIER
+        return int(min(self.timeout_ms, max(self.MIN_TIMEOUT_MS, adaptive_ms)))
+
+    def _call(self, endpoint: str, symbol: str | None, request: Callable[[], object]):
+        endpoint_breaker = self._breaker(endpoint, self.ENDPOINT_FAILURE_THRESHOLD)
+        symbol_breaker = (
+            self._breaker(f"{endpoint}:{symbol}", self.SYMBOL_FAILURE_THRESHOLD)
+            if symbol is not None
+            else None
+        )
+        for key, breaker in ((endpoint, endpoint_breaker), (symbol, symbol_breaker)):
+            if breaker is not None and not breaker.allow():
+                raise CircuitOpenError(
+                    f"{self.name} {endpoint} circuit open for {key}; "
+                    f"retry in {breaker.retry_after():.1f}s"
+                )
+        endpoint_breaker.begin()
+        if symbol_breaker is not None:
+            symbol_breaker.begin()
+
+        health = self.health.setdefault(endpoint, EndpointHealth())
+        health.calls += 1
+        self.exchange.rateLimit = self.pacer.interval_ms
+        self.exchange.timeout = self._timeout_for(health)
+        started = self.clock()
+        try:
+            result = request()
+        except _ccxt().NetworkError as exc:
+            # Timeouts, 429s, maintenance and connection errors: the exchange
+            # itself is unhealthy for this endpoint.
+            health.failures += 1
+            metrics.count(f"exchange_{endpoint}_errors")
+            ccxt = _ccxt()
+            if isinstance(exc, (ccxt.RateLimitExceeded, ccxt.DDoSProtection)):
+                self.pacer.on_rate_limited()
+            endpoint_breaker.record_failure()
+            if symbol_breaker is not None:
+                symbol_breaker.record_failure()
+            raise
+        except Exception:
+            # The exchange answered, but not usefully for this symbol.
+            health.failures += 1
+            metrics.count(f"exchange_{endpoint}_errors")
+            endpoint_breaker.record_success()
+            if symbol_breaker is not None:
+                symbol_breaker.record_failure()
+            raise
+
+        latency = self.clock() - started
+        metrics.observe(f"exchange_{endpoint}_seconds", latency)
+        typical = health.quantile(0.5)
+        if len(health) >= self.MIN_LATENCY_SAMPLES and latency > (
+            typical * self.SLOW_RESPONSE_MULTIPLIER
+        ):
+            self.pacer.on_slow()
+        else:
+            self.pacer.on_success()
+        health.observe(latency)
+        endpoint_breaker.record_success()
+        if symbol_breaker is not None:
+            symbol_breaker.record_success()
+        return result
+
     def _ensure_markets_loaded(self) -> None:
         if self._markets_loaded:
             return
         try:
-            self.exchange.load_markets()
+            with metrics.span("load_markets"):
+                self._call("load_markets", None, self.exchange.load_markets)
+        except CircuitOpenError:
+            raise
         except Exception as exc:
-            raise MarketDataError(f"Bitget market metadata load failed: {exc}") from exc
+            raise MarketDataError(f"{self.name} market metadata load failed: {exc}") from exc
         self._markets_loaded = True
 
-    def fetch_closed_ohlcv(
-        self, symbol: str, timeframe: str, limit: int
-    ) -> list[Candle]:
-        if limit <= 0:
-            raise ValueError("limit must be greater than zero")
-
+    def _fetch_ohlcv(self, symbol: str, timeframe: str, **params) -> list:
         if not self.exchange.has.get("fetchOHLCV"):
-            raise MarketDataError("Bitget does not advertise fetchOHLCV support.")
+            raise MarketDataError(
+                f"{self.name} does not advertise fetchOHLCV support."
+            )
 
         self._ensure_markets_loaded()
 
         try:
-            raw = self.exchange.fetch_ohlcv(
+            raw = self._call(
+                "fetch_ohlcv",
                 symbol,
-                timeframe,
-                limit=limit + 1,
+                lambda: self.exchange.fetch_ohlcv(symbol, timeframe, **params),
             )
+        except CircuitOpenError:
+            raise
         except Exception as exc:
             raise MarketDataError(
-                f"Bitget OHLCV fetch failed for {symbol} {timeframe}: {exc}"
+                f"{self.name} OHLCV fetch failed for {symbol} {timeframe}: {exc}"
             ) from exc
 
         if not raw:
-            raise MarketDataError(f"Bitget returned no candles for {symbol}.")
+            raise MarketDataError(f"{self.name} returned no candles for {symbol}.")
+        return raw
 
+    def _closed_candles(self, raw: list, symbol: str, timeframe: str) -> list[Candle]:
+        """Validate raw OHLCV rows and drop the still-forming candle."""
         duration_ms = timeframe_to_ms(timeframe)
         now_ms = self.exchange.milliseconds()
 
@@ -158,7 +363,16 @@ class BitgetMarketDataAdapter(MarketDataAdapter):
                 )
 
             closed.append(candle)
+        return closed
 
+    def fetch_closed_ohlcv(
+        self, symbol: str, timeframe: str, limit: int
+    ) -> list[Candle]:
+        if limit <= 0:
+            raise ValueError("limit must be greater than zero")
+
+        raw = self._fetch_ohlcv(symbol, timeframe, limit=limit + 1)
+        closed = self._closed_candles(raw, symbol, timeframe)
         if len(closed) < limit:
             raise MarketDataError(
                 f"Only {len(closed)} closed candles available for {symbol}; "
@@ -167,14 +381,64 @@ class BitgetMarketDataAdapter(MarketDataAdapter):
 
         return closed[-limit:]
 
-
-def create_market_data_adapter(exchange_id: str) -> MarketDataAdapter:
+    def fetch_ohlcv_range(
+        self, symbol: str, timeframe: str, start_ms: int, end_ms: int
+    ) -> list[Candle]:
+        duration_ms = timeframe_to_ms(timeframe)
+        limit = -(-(end_ms - start_ms) // duration_ms)
+        if limit <= 0:
+            raise ValueError("end_ms must be after start_ms")
+
+        raw = self._fetch_ohlcv(symbol, timeframe, since=start_ms, limit=limit)
+        return [
+            candle
+            for candle in self._closed_candles(raw, symbol, timeframe)
+            if start_ms <= candle.timestamp_ms < end_ms
+        ]
+
+
+class BitgetMarketDataAdapter(CcxtMarketDataAdapter):
+    """Primary Bitget public market-data adapter."""
+
+    def __init__(
+        self,
+        timeout_ms: int = CcxtMarketDataAdapter.DEFAULT_TIMEOUT_MS,
+        *,
+        exchange=None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__("bitget", timeout_ms, exchange=exchange, clock=clock)
+
+
+def create_market_data_adapter(
+    exchange_id: str,
+    hedge_exchange_ids: Sequence[str] = (),
+    hedge_percentile: float = 0.95,
+) -> MarketDataAdapter:
+    """Return the Bitget adapter, hedged across secondaries when configured.
+
+    Bitget stays the only primary source. Secondary exchanges are only asked
+    when Bitget is slow or failing, and every result records its provenance.
+    """
     exchange_id = exchange_id.strip().lower()
 
-    if exchange_id == "bitget":
-        return BitgetMarketDataAdapter()
+    if exchange_id != "bitget":
+        raise ValueError(
+            f"Unsupported market-data exchange '{exchange_id}'. "
+            "P0 permits Bitget only as the primary source."
+        )
+
+    primary = BitgetMarketDataAdapter()
+    if not hedge_exchange_ids:
+        return primary
+
+    from adapters.hedged import HedgedMarketDataAdapter
 
-    raise ValueError(
-        f"Unsupported market-data exchange '{exchange_id}'. "
-        "P0 permits Bitget only; failover is intentionally deferred."
+    return HedgedMarketDataAdapter(
+        [primary]
+        + [
+            CcxtMarketDataAdapter(hedge_id.strip().lower())
+            for hedge_id in hedge_exchange_ids
+        ],
+        percentile=hedge_percentile,
     )
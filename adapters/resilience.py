@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+"""Failure isolation and pacing for exchange requests.
+
+- ``CircuitBreaker`` opens after consecutive failures so later calls fail
+  immediately, lets a single half-open probe through after a cool-down and
+  doubles the cool-down each time the probe fails.
+- ``EndpointHealth`` counts calls and failures and keeps recent latencies
+  for percentile-based timeouts.
+- ``AdaptivePacer`` widens the request interval multiplicatively on rate
+  limiting (and moderately on unusually slow responses) and narrows it
+  gradually on success.
+"""
+
+import math
+import time
+from collections import deque
+from typing import Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 3,
+        reset_timeout_s: float = 30.0,
+        max_reset_timeout_s: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if failure_threshold <= 0:
+            raise ValueError("failure_threshold must be greater than zero")
+        if reset_timeout_s <= 0 or max_reset_timeout_s < reset_timeout_s:
+            raise ValueError("reset timeouts must be positive and ordered")
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout_s = reset_timeout_s
+        self.max_reset_timeout_s = max_reset_timeout_s
+        self.clock = clock
+        self.reset_timeout_s = reset_timeout_s
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout_s:
+            return HALF_OPEN
+        return OPEN
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout_s - self.clock())
+
+    def allow(self) -> bool:
+        """Return whether a call may start now; does not change state."""
+        state = self.state
+        return state == CLOSED or (state == HALF_OPEN and not self.probe_in_flight)
+
+    def begin(self) -> None:
+        """Mark an allowed call as started; in half-open state it is the probe."""
+        if self.state == HALF_OPEN:
+            self.probe_in_flight = True
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+        self.reset_timeout_s = self.base_reset_timeout_s
+
+    def record_failure(self) -> None:
+        if self.probe_in_flight:
+            # The probe failed: stay open and back off further.
+            self.probe_in_flight = False
+            self.reset_timeout_s = min(self.reset_timeout_s * 2, self.max_reset_timeout_s)
+            self.opened_at = self.clock()
+            return
+        self.consecutive_failures += 1
+        if self.opened_at is None and self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+
+
+class EndpointHealth:
+    def __init__(self, window: int = 50) -> None:
+        self.samples: deque[float] = deque(maxlen=window)
+        self.calls = 0
+        self.failures = 0
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        if not self.samples:
+            return math.nan
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    @property
+    def error_rate(self) -> float:
+        return self.failures / self.calls if self.calls else 0.0
+
+
+class AdaptivePacer:
+    """Multiplicative increase on rate limiting, gradual decrease on success."""
+
+    def __init__(
+        self,
+        base_interval_ms: float,
+        *,
+        max_interval_ms: float = 10_000.0,
+        increase: float = 2.0,
+        decrease: float = 0.9,
+    ) -> None:
+        if base_interval_ms < 0 or max_interval_ms < base_interval_ms:
+            raise ValueError("pacing intervals must be non-negative and ordered")
+        self.base_interval_ms = base_interval_ms
+        self.max_interval_ms = max_interval_ms
+        self.increase = increase
+        self.decrease = decrease
+        self.interval_ms = base_interval_ms
+
+    def on_rate_limited(self) -> None:
+        widened = max(self.interval_ms, 1.0) * self.increase
+        self.interval_ms = min(widened, self.max_interval_ms)
+
+    def on_slow(self) -> None:
+        """A response far slower than usual: back off, less than for a 429."""
+        widened = max(self.interval_ms, 1.0) * math.sqrt(self.increase)
+        self.interval_ms = min(widened, self.max_interval_ms)
+
+    def on_success(self) -> None:
+        self.interval_ms = max(self.base_interval_ms, self.interval_ms * self.decrease)
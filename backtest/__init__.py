@@ -0,0 +1 @@
+"""Historical replay and research tooling for ProfitForge strategies."""
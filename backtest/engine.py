@@ -0,0 +1,459 @@
+from __future__ import annotations
+
+"""Vectorized historical replay of the baseline signal cycle.
+
+The engine reuses the live building blocks rather than re-implementing them:
+- ``models.baseline`` for window features, model fits, stops and expiry;
+- the ``_evaluate_signal`` rules (first touching candle wins, SL+TP in one
+  candle is AMBIGUOUS, candles after expiry are ignored);
+- ``risk.risk_manager`` for account-risk position sizing (array API).
+
+Per-bar model fitting is inherently sequential per symbol, so symbols are
+spread across worker processes. Outcome evaluation for all signals of a
+symbol is a handful of array operations.
+
+With ``FEATURE_STORE_DIR`` set, a symbol whose stored ``baseline`` features
+cover the replayed history reads them instead of recomputing them.
+
+The replay corresponds to ``RETRAIN_POLICY=always`` without a meta filter.
+Results are written to ``backtest_runs``/``backtest_results`` and never touch
+the live ``signals`` table.
+"""
+
+import argparse
+import json
+import math
+import os
+import uuid
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+
+import numpy as np
+from sklearn.exceptions import ConvergenceWarning
+
+from adapters.candle_archive import CandleArchive
+from adapters.market_data import CandleArray, timeframe_to_ms
+from config import CONFIG, RuntimeConfig
+from db.db_handler import TradingDatabaseHandler
+from features.store import BASELINE_FEATURES, FeatureStore
+from models.baseline import (
+    baseline_features,
+    fit_baseline_models,
+    predict_baseline,
+    signal_expiry_ms,
+    signal_levels,
+)
+from risk.risk_manager import calculate_position_sizes
+
+OUTCOME_PENDING = 0
+OUTCOME_TAKE_PROFIT = 1
+OUTCOME_STOP_LOSS = 2
+OUTCOME_AMBIGUOUS = 3
+OUTCOME_EXPIRED = 4
+OUTCOME_REJECTED_RISK = 5
+
+# (outcome, status) exactly as the live monitor would record them.
+OUTCOME_LABELS = {
+    OUTCOME_PENDING: ("PENDING", "ACTIVE"),
+    OUTCOME_TAKE_PROFIT: ("TAKE_PROFIT", "CLOSED"),
+    OUTCOME_STOP_LOSS: ("STOP_LOSS", "CLOSED"),
+    OUTCOME_AMBIGUOUS: ("AMBIGUOUS", "CLOSED_AMBIGUOUS"),
+    OUTCOME_EXPIRED: ("EXPIRED", "EXPIRED"),
+    OUTCOME_REJECTED_RISK: ("REJECTED_RISK", "RISK_BLOCKED"),
+}
+
+
+@dataclass(frozen=True)
+class Predictions:
+    """Model outputs for every bar that had a full training window."""
+
+    index: np.ndarray
+    probability_up: np.ndarray
+    predicted_magnitude: np.ndarray
+
+
+@dataclass(frozen=True)
+class SymbolResult:
+    symbol: str
+    candle_timestamp_ms: np.ndarray
+    is_long: np.ndarray
+    entry: np.ndarray
+    stop_loss: np.ndarray
+    take_profit: np.ndarray
+    confidence: np.ndarray
+    predicted_magnitude: np.ndarray
+    outcome: np.ndarray
+    outcome_price: np.ndarray
+    outcome_timestamp_ms: np.ndarray
+    risk_amount_usdt: np.ndarray
+    position_size: np.ndarray
+
+
+def predict_series(
+    candles: CandleArray,
+    ohlcv_limit: int,
+    *,
+    first_index: int = 0,
+    features: np.ndarray | None = None,
+) -> Predictions:
+    """Fit and predict on every rolling ``ohlcv_limit`` window, like the live cycle.
+
+    ``features`` are the series' stored ``[ret, vol]`` rows, one per candle;
+    without them they are computed from the candles.
+    """
+    if features is None:
+        features = baseline_features(candles.close, candles.high, candles.low)
+    start = max(ohlcv_limit - 1, first_index)
+
+    indices: list[int] = []
+    probabilities: list[float] = []
+    magnitudes: list[float] = []
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", ConvergenceWarning)
+        for end in range(start, len(candles)):
+            window = features[end - ohlcv_limit + 1 : end + 1].copy()
+            # Inside a live window the first candle has no previous close.
+            window[0, 0] = 0.0
+            probability_up, predicted_magnitude = predict_baseline(
+                fit_baseline_models(window), window[-1]
+            )
+            if not (
+                math.isfinite(probability_up)
+                and math.isfinite(predicted_magnitude)
+                and 0.0 <= probability_up <= 1.0
+            ):
+                continue
+            indices.append(end)
+            probabilities.append(probability_up)
+            magnitudes.append(predicted_magnitude)
+
+    return Predictions(
+        index=np.asarray(indices, dtype=np.int64),
+        probability_up=np.asarray(probabilities, dtype=float),
+        predicted_magnitude=np.asarray(magnitudes, dtype=float),
+    )
+
+
+def evaluate_series(
+    symbol: str,
+    candles: CandleArray,
+    predictions: Predictions,
+    config: RuntimeConfig,
+) -> SymbolResult:
+    """Apply stops, sizing and the monitor's outcome rules to all signals."""
+    timeframe_ms = timeframe_to_ms(config.timeframe)
+    index = predictions.index
+    n = len(candles)
+    timestamps = candles.timestamp_ms
+
+    entry = candles.close[index]
+    is_long, confidence, stop_loss, take_profit = signal_levels(
+        entry,
+        predictions.probability_up,
+        predictions.predicted_magnitude,
+        min_stop_distance_pct=config.min_stop_distance_pct,
+        reward_risk_ratio=config.reward_risk_ratio,
+    )
+    signal_ts = timestamps[index]
+    expiry_ms = signal_expiry_ms(signal_ts, timeframe_ms, config.signal_validity_bars)
+
+    # With strictly increasing timestamps no candle later than this offset can
+    # still be at or before expiry; gaps only shrink the usable window.
+    width = config.signal_validity_bars + 1
+    offsets = index[:, None] + np.arange(1, width + 1)[None, :]
+    in_range = offsets < n
+    offsets = np.minimum(offsets, n - 1)
+    window_ts = timestamps[offsets]
+    usable = (
+        in_range
+        & (window_ts > signal_ts[:, None])
+        & (window_ts <= expiry_ms[:, None])
+    )
+
+    lows = candles.low[offsets]
+    highs = candles.high[offsets]
+    long_col = is_long[:, None]
+    hit_sl = usable & np.where(
+        long_col, lows <= stop_loss[:, None], highs >= stop_loss[:, None]
+    )
+    hit_tp = usable & np.where(
+        long_col, highs >= take_profit[:, None], lows <= take_profit[:, None]
+    )
+
+    touched = hit_sl | hit_tp
+    has_touch = touched.any(axis=1)
+    first = touched.argmax(axis=1)
+    rows = np.arange(len(index))
+    first_sl = hit_sl[rows, first]
+    first_tp = hit_tp[rows, first]
+
+    last_close_ms = int(timestamps[-1]) + timeframe_ms if n else 0
+    outcome = np.full(len(index), OUTCOME_PENDING, dtype=np.int8)
+    outcome[~has_touch & (last_close_ms >= expiry_ms)] = OUTCOME_EXPIRED
+    outcome[has_touch & first_sl & first_tp] = OUTCOME_AMBIGUOUS
+    outcome[has_touch & first_sl & ~first_tp] = OUTCOME_STOP_LOSS
+    outcome[has_touch & ~first_sl & first_tp] = OUTCOME_TAKE_PROFIT
+
+    outcome_price = np.full(len(index), np.nan)
+    outcome_price[outcome == OUTCOME_STOP_LOSS] = stop_loss[outcome == OUTCOME_STOP_LOSS]
+    outcome_price[outcome == OUTCOME_TAKE_PROFIT] = take_profit[outcome == OUTCOME_TAKE_PROFIT]
+
+    outcome_ts = np.full(len(index), -1, dtype=np.int64)
+    touched_rows = rows[has_touch]
+    outcome_ts[touched_rows] = window_ts[touched_rows, first[touched_rows]]
+    expired = outcome == OUTCOME_EXPIRED
+    outcome_ts[expired] = expiry_ms[expired]
+
+    sized = calculate_position_sizes(
+        equity_usdt=config.account_equity_usdt,
+        risk_fraction=config.risk_per_trade,
+        entry_prices=entry,
+        stop_losses=stop_loss,
+    )
+    # RISK_BLOCKED signals never reach the monitor.
+    blocked = ~sized.accepted
+    outcome[blocked] = OUTCOME_REJECTED_RISK
+    outcome_price[blocked] = np.nan
+    outcome_ts[blocked] = -1
+    risk_amount = sized.risk_amount_usdt
+    position_size = sized.quantity
+
+    return SymbolResult(
+        symbol=symbol,
+        candle_timestamp_ms=signal_ts,
+        is_long=is_long,
+        entry=entry,
+        stop_loss=stop_loss,
+        take_profit=take_profit,
+        confidence=confidence,
+        predicted_magnitude=predictions.predicted_magnitude,
+        outcome=outcome,
+        outcome_price=outcome_price,
+        outcome_timestamp_ms=outcome_ts,
+        risk_amount_usdt=risk_amount,
+        position_size=position_size,
+    )
+
+
+def backtest_symbol(
+    symbol: str,
+    candles: CandleArray,
+    config: RuntimeConfig,
+    start_ms: int | None = None,
+    features: np.ndarray | None = None,
+) -> SymbolResult:
+    first_index = 0
+    if start_ms is not None:
+        first_index = int(np.searchsorted(candles.timestamp_ms, start_ms, side="left"))
+    predictions = predict_series(
+        candles, config.ohlcv_limit, first_index=first_index, features=features
+    )
+    return evaluate_series(symbol, candles, predictions, config)
+
+
+def stored_features(
+    config: RuntimeConfig, symbol: str, candles: CandleArray
+) -> np.ndarray | None:
+    """The stored ``[ret, vol]`` rows of exactly these candles, if any."""
+    if config.feature_store_dir is None:
+        return None
+    frame = FeatureStore(config.feature_store_dir).read_window(
+        BASELINE_FEATURES,
+        exchanges=(config.market_data_exchange_id,),
+        symbol=symbol,
+        timeframe=config.timeframe,
+        timestamp_ms=candles.timestamp_ms,
+    )
+    return None if frame is None else frame.matrix(BASELINE_FEATURES.columns)
+
+
+def _result_rows(result: SymbolResult):
+    for row in range(len(result.candle_timestamp_ms)):
+        outcome, status = OUTCOME_LABELS[int(result.outcome[row])]
+        outcome_price = float(result.outcome_price[row])
+        outcome_ts = int(result.outcome_timestamp_ms[row])
+        risk_amount = float(result.risk_amount_usdt[row])
+        position_size = float(result.position_size[row])
+        yield {
+            "symbol": result.symbol,
+            "candle_timestamp_ms": int(result.candle_timestamp_ms[row]),
+            "signal_type": "LONG" if result.is_long[row] else "SHORT",
+            "entry": float(result.entry[row]),
+            "sl": float(result.stop_loss[row]),
+            "tp": float(result.take_profit[row]),
+            "confidence": float(result.confidence[row]),
+            "pred_move": float(result.predicted_magnitude[row]),
+            "status": status,
+            "outcome": outcome,
+            "outcome_price": None if math.isnan(outcome_price) else outcome_price,
+            "outcome_timestamp_ms": None if outcome_ts < 0 else outcome_ts,
+            "risk_amount_usdt": None if math.isnan(risk_amount) else risk_amount,
+            "position_size": None if math.isnan(position_size) else position_size,
+        }
+
+
+def summarize(results: list[SymbolResult]) -> dict[str, int | float]:
+    outcomes = (
+        np.concatenate([result.outcome for result in results])
+        if results
+        else np.empty(0, dtype=np.int8)
+    )
+    summary: dict[str, int | float] = {
+        OUTCOME_LABELS[code][0].lower(): int((outcomes == code).sum())
+        for code in OUTCOME_LABELS
+    }
+    summary["signals"] = int(len(outcomes))
+    decided = summary["take_profit"] + summary["stop_loss"]
+    summary["hit_rate"] = summary["take_profit"] / decided if decided else 0.0
+    return summary
+
+
+def run_backtest(
+    db: TradingDatabaseHandler,
+    config: RuntimeConfig = CONFIG,
+    *,
+    symbols: tuple[str, ...] | None = None,
+    start_ms: int | None = None,
+    end_ms: int | None = None,
+    workers: int | None = None,
+    archive: CandleArchive | None = None,
+) -> tuple[str, dict[str, int | float]]:
+    """Replay stored candle history for ``symbols`` and persist the results.
+
+    History comes from the ``candles`` table unless ``archive`` is given.
+    """
+    symbols = symbols or config.symbols
+    timeframe_ms = timeframe_to_ms(config.timeframe)
+    # Load enough history before ``start_ms`` for the first training window
+    # and enough after ``end_ms`` for the last signal to reach its expiry.
+    load_start = None if start_ms is None else start_ms - config.ohlcv_limit * timeframe_ms
+    load_end = (
+        None
+        if end_ms is None
+        else end_ms + (config.signal_validity_bars + 1) * timeframe_ms
+    )
+
+    source = archive.read if archive is not None else db.get_candle_array
+    histories = {
+        symbol: source(
+            exchange=config.market_data_exchange_id,
+            symbol=symbol,
+            timeframe=config.timeframe,
+            start_ms=load_start,
+            end_ms=load_end,
+        )
+        for symbol in symbols
+    }
+    histories = {
+        symbol: candles
+        for symbol, candles in histories.items()
+        if len(candles) >= config.ohlcv_limit
+    }
+
+    features = {
+        symbol: stored_features(config, symbol, candles)
+        for symbol, candles in histories.items()
+    }
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(histories) <= 1:
+        results = [
+            backtest_symbol(symbol, candles, config, start_ms, features[symbol])
+            for symbol, candles in histories.items()
+        ]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(histories))) as pool:
+            results = list(
+                pool.map(
+                    backtest_symbol,
+                    histories.keys(),
+                    histories.values(),
+                    [config] * len(histories),
+                    [start_ms] * len(histories),
+                    features.values(),
+                )
+            )
+
+    if end_ms is not None:
+        results = [
+            _trim_result(result, end_ms) for result in results
+        ]
+
+    run_id = uuid.uuid4().hex
+    summary = summarize(results)
+    config_json = json.dumps(asdict(config), default=str, sort_keys=True)
+    db.record_backtest_run(
+        run_id=run_id,
+        strategy_id=config.strategy_id,
+        timeframe=config.timeframe,
+        config_json=config_json,
+    )
+    for result in results:
+        db.insert_backtest_results(run_id, _result_rows(result))
+    db.record_backtest_run(
+        run_id=run_id,
+        strategy_id=config.strategy_id,
+        timeframe=config.timeframe,
+        config_json=config_json,
+        summary_json=json.dumps(summary, sort_keys=True),
+    )
+    return run_id, summary
+
+
+def _trim_result(result: SymbolResult, end_ms: int) -> SymbolResult:
+    keep = result.candle_timestamp_ms <= end_ms
+    return SymbolResult(
+        result.symbol,
+        *(
+            getattr(result, name)[keep]
+            for name in SymbolResult.__dataclass_fields__
+            if name != "symbol"
+        ),
+    )
+
+
+def _parse_ms(value: str | None) -> int | None:
+    if value is None:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", help="Comma-separated symbols (default: SYMBOLS)")
+    parser.add_argument("--start", help="ISO timestamp of the first signal candle")
+    parser.add_argument("--end", help="ISO timestamp of the last signal candle")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--db", default=str(CONFIG.db_path))
+    parser.add_argument(
+        "--archive",
+        default=CONFIG.candle_archive_dir,
+        help="Read history from this candle archive instead of the database",
+    )
+    args = parser.parse_args(argv)
+
+    symbols = (
+        tuple(symbol.strip() for symbol in args.symbols.split(",") if symbol.strip())
+        if args.symbols
+        else None
+    )
+    run_id, summary = run_backtest(
+        TradingDatabaseHandler(args.db),
+        CONFIG,
+        symbols=symbols,
+        start_ms=_parse_ms(args.start),
+        end_ms=_parse_ms(args.end),
+        workers=args.workers,
+        archive=CandleArchive(args.archive) if args.archive else None,
+    )
+    print(f"✅ Backtest {run_id} finished: {json.dumps(summary, sort_keys=True)}")
+
+
+if __name__ == "__main__":
+    main()
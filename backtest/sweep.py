@@ -0,0 +1,398 @@
+from __future__ import annotations
+
+"""Parallel, resumable parameter sweeps over RuntimeConfig knobs.
+
+Candle history is loaded from the database once and copied into a single
+shared-memory block that every worker process maps read-only.
+
+A sweep runs in two phases:
+1. model predictions for each (symbol, ohlcv_limit) pair; this is the only
+   expensive part, and stop/expiry knobs do not change it;
+2. a cheap vectorized outcome evaluation per configuration.
+
+Both phases checkpoint into the output directory: predictions as ``.npz``
+files and finished configurations as lines in ``results.jsonl``. A rerun with
+the same directory skips everything already done.
+"""
+
+import argparse
+import dataclasses
+import hashlib
+import itertools
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Sequence
+
+import numpy as np
+
+from adapters.market_data import CandleArray
+from backtest.engine import Predictions, evaluate_series, predict_series, summarize
+from config import CONFIG, RuntimeConfig
+from db.db_handler import TradingDatabaseHandler
+
+SWEEP_FIELDS = {
+    "min_stop_distance_pct": float,
+    "reward_risk_ratio": float,
+    "signal_validity_bars": int,
+    "ohlcv_limit": int,
+}
+RESULTS_FILENAME = "results.jsonl"
+PREDICTIONS_DIRNAME = "predictions"
+
+
+def validate_params(params: Mapping[str, Any]) -> dict[str, Any]:
+    """Coerce and validate one configuration with the config.py rules."""
+    unknown = set(params) - set(SWEEP_FIELDS)
+    if unknown:
+        raise ValueError(f"Unsupported sweep fields: {', '.join(sorted(unknown))}")
+
+    coerced = {name: SWEEP_FIELDS[name](value) for name, value in params.items()}
+    if coerced.get("min_stop_distance_pct", 1.0) <= 0:
+        raise ValueError("min_stop_distance_pct must be greater than 0.")
+    if coerced.get("reward_risk_ratio", 1.0) <= 0:
+        raise ValueError("reward_risk_ratio must be greater than 0.")
+    if coerced.get("signal_validity_bars", 1) < 1:
+        raise ValueError("signal_validity_bars must be at least 1.")
+    if coerced.get("ohlcv_limit", 20) < 20:
+        raise ValueError("ohlcv_limit must be at least 20.")
+    return coerced
+
+
+def grid(space: Mapping[str, Sequence[Any]]) -> list[dict[str, Any]]:
+    names = sorted(space)
+    return [
+        validate_params(dict(zip(names, values)))
+        for values in itertools.product(*(space[name] for name in names))
+    ]
+
+
+def random_search(
+    space: Mapping[str, Sequence[Any]], count: int, *, seed: int = 0
+) -> list[dict[str, Any]]:
+    """Sample ``count`` distinct configurations uniformly from the grid."""
+    combinations = grid(space)
+    if count >= len(combinations):
+        return combinations
+    return random.Random(seed).sample(combinations, count)
+
+
+def config_key(params: Mapping[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True)
+
+
+class SharedCandles:
+    """All symbols' candle columns in one shared-memory block."""
+
+    def __init__(self, histories: Mapping[str, CandleArray]) -> None:
+        total = sum(len(candles) for candles in histories.values())
+        self.shm = shared_memory.SharedMemory(
+            create=True, size=max(total * len(CandleArray.FIELDS) * 8, 8)
+        )
+        self.layout: dict[str, tuple[int, int]] = {}
+
+        offset = 0
+        for symbol, candles in histories.items():
+            length = len(candles)
+            for column, name in enumerate(CandleArray.FIELDS):
+                dtype = np.int64 if name == "timestamp_ms" else np.float64
+                target = np.ndarray(
+                    (length,),
+                    dtype=dtype,
+                    buffer=self.shm.buf,
+                    offset=(offset + column * length) * 8,
+                )
+                target[:] = getattr(candles, name)
+            self.layout[symbol] = (offset, length)
+            offset += length * len(CandleArray.FIELDS)
+
+    @property
+    def descriptor(self) -> tuple[str, dict[str, tuple[int, int]]]:
+        return self.shm.name, self.layout
+
+    @staticmethod
+    def attach(
+        descriptor: tuple[str, dict[str, tuple[int, int]]],
+    ) -> tuple[shared_memory.SharedMemory, dict[str, CandleArray]]:
+        name, layout = descriptor
+        shm = shared_memory.SharedMemory(name=name)
+        # Only the creating process may unlink the block; stop this process's
+        # resource tracker from destroying it when the worker exits.
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+
+        candles: dict[str, CandleArray] = {}
+        for symbol, (offset, length) in layout.items():
+            columns = []
+            for column, field_name in enumerate(CandleArray.FIELDS):
+                dtype = np.int64 if field_name == "timestamp_ms" else np.float64
+                view = np.ndarray(
+                    (length,),
+                    dtype=dtype,
+                    buffer=shm.buf,
+                    offset=(offset + column * length) * 8,
+                )
+                view.flags.writeable = False
+                columns.append(view)
+            candles[symbol] = CandleArray(*columns)
+        return shm, candles
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+
+# Per-process worker state, populated by _init_worker.
+_WORKER: dict[str, Any] = {}
+
+
+def _init_worker(
+    descriptor: tuple[str, dict[str, tuple[int, int]]],
+    base_config: RuntimeConfig,
+    predictions_dir: str,
+) -> None:
+    shm, candles = SharedCandles.attach(descriptor)
+    _WORKER.update(
+        shm=shm,
+        candles=candles,
+        base_config=base_config,
+        predictions_dir=Path(predictions_dir),
+        predictions={},
+    )
+
+
+def _predictions_path(predictions_dir: Path, symbol: str, ohlcv_limit: int) -> Path:
+    safe_symbol = symbol.replace("/", "_").replace(":", "_")
+    return predictions_dir / f"{safe_symbol}-{ohlcv_limit}.npz"
+
+
+def _predict_task(symbol: str, ohlcv_limit: int) -> str:
+    path = _predictions_path(_WORKER["predictions_dir"], symbol, ohlcv_limit)
+    if not path.exists():
+        predictions = predict_series(_WORKER["candles"][symbol], ohlcv_limit)
+        staging = path.with_name(f".{path.stem}-{os.getpid()}.npz")
+        np.savez(
+            staging,
+            index=predictions.index,
+            probability_up=predictions.probability_up,
+            predicted_magnitude=predictions.predicted_magnitude,
+        )
+        os.replace(staging, path)
+    return str(path)
+
+
+def _load_predictions(symbol: str, ohlcv_limit: int) -> Predictions:
+    cache = _WORKER["predictions"]
+    key = (symbol, ohlcv_limit)
+    if key not in cache:
+        with np.load(
+            _predictions_path(_WORKER["predictions_dir"], symbol, ohlcv_limit)
+        ) as stored:
+            cache[key] = Predictions(
+                index=stored["index"],
+                probability_up=stored["probability_up"],
+                predicted_magnitude=stored["predicted_magnitude"],
+            )
+    return cache[key]
+
+
+def _evaluate_task(params: dict[str, Any]) -> dict[str, Any]:
+    config = replace(_WORKER["base_config"], **params)
+    results = [
+        evaluate_series(
+            symbol,
+            candles,
+            _load_predictions(symbol, config.ohlcv_limit),
+            config,
+        )
+        for symbol, candles in _WORKER["candles"].items()
+        if len(candles) >= config.ohlcv_limit
+    ]
+    summary = summarize(results)
+    summary["net_r"] = (
+        summary["take_profit"] * config.reward_risk_ratio - summary["stop_loss"]
+    )
+    return {"key": config_key(params), "params": params, **summary}
+
+
+def _candles_digest(candles: CandleArray) -> str:
+    digest = hashlib.sha256()
+    for name in CandleArray.FIELDS:
+        digest.update(np.ascontiguousarray(getattr(candles, name)).tobytes())
+    return digest.hexdigest()
+
+
+def _config_digest(config: RuntimeConfig) -> str:
+    # Hashed rather than stored: the config may hold secrets such as webhooks.
+    payload = json.dumps(dataclasses.asdict(config), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _check_manifest(
+    output_dir: Path, histories: Mapping[str, CandleArray], base_config: RuntimeConfig
+) -> None:
+    """Refuse to resume checkpoints computed from other candles or base config."""
+    manifest = {
+        "timeframe": base_config.timeframe,
+        "exchange": base_config.market_data_exchange_id,
+        "base_config_sha256": _config_digest(base_config),
+        "symbols": {
+            symbol: {
+                "candles": len(candles),
+                "last_timestamp_ms": int(candles.timestamp_ms[-1]),
+                "sha256": _candles_digest(candles),
+            }
+            for symbol, candles in sorted(histories.items())
+        },
+    }
+    path = output_dir / "manifest.json"
+    if path.exists():
+        if json.loads(path.read_text(encoding="utf-8")) != manifest:
+            raise ValueError(
+                f"Candle history or base config changed since {output_dir} was "
+                "created; use a new output directory."
+            )
+        return
+    path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def _completed_keys(results_path: Path) -> set[str]:
+    if not results_path.exists():
+        return set()
+    keys = set()
+    with results_path.open(encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                keys.add(json.loads(line)["key"])
+            except (ValueError, KeyError):
+                # A torn final line from an interrupted run is simply redone.
+                continue
+    return keys
+
+
+def run_sweep(
+    db: TradingDatabaseHandler,
+    configurations: Iterable[Mapping[str, Any]],
+    output_dir: str | Path,
+    *,
+    base_config: RuntimeConfig = CONFIG,
+    symbols: tuple[str, ...] | None = None,
+    workers: int | None = None,
+) -> Path:
+    """Evaluate every configuration not yet in ``output_dir`` and return the results file."""
+    output_dir = Path(output_dir)
+    predictions_dir = output_dir / PREDICTIONS_DIRNAME
+    predictions_dir.mkdir(parents=True, exist_ok=True)
+    results_path = output_dir / RESULTS_FILENAME
+
+    done = _completed_keys(results_path)
+    pending = [
+        params
+        for params in (validate_params(params) for params in configurations)
+        if config_key(params) not in done
+    ]
+    if not pending:
+        return results_path
+
+    symbols = symbols or base_config.symbols
+    histories = {
+        symbol: db.get_candle_array(
+            exchange=base_config.market_data_exchange_id,
+            symbol=symbol,
+            timeframe=base_config.timeframe,
+        )
+        for symbol in symbols
+    }
+    histories = {symbol: candles for symbol, candles in histories.items() if len(candles)}
+    _check_manifest(output_dir, histories, base_config)
+    limits = sorted(
+        {params.get("ohlcv_limit", base_config.ohlcv_limit) for params in pending}
+    )
+
+    shared = SharedCandles(histories)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count() or 1,
+            initializer=_init_worker,
+            initargs=(shared.descriptor, base_config, str(predictions_dir)),
+        ) as pool:
+            prediction_jobs = [
+                pool.submit(_predict_task, symbol, limit)
+                for limit in limits
+                for symbol, candles in histories.items()
+                if len(candles) >= limit
+            ]
+            for job in as_completed(prediction_jobs):
+                job.result()
+
+            # Grouping by window length keeps each worker's prediction cache hot.
+            pending.sort(
+                key=lambda params: params.get("ohlcv_limit", base_config.ohlcv_limit)
+            )
+            with results_path.open("a", encoding="utf-8") as handle:
+                for job in as_completed(
+                    pool.submit(_evaluate_task, params) for params in pending
+                ):
+                    handle.write(json.dumps(job.result(), sort_keys=True) + "\n")
+                    handle.flush()
+    finally:
+        shared.close()
+
+    return results_path
+
+
+def _parse_space(entries: Sequence[str]) -> dict[str, list[str]]:
+    space: dict[str, list[str]] = {}
+    for entry in entries:
+        name, _, values = entry.partition("=")
+        if not values:
+            raise ValueError(f"Expected FIELD=v1,v2,... but got '{entry}'.")
+        space[name.strip()] = [value.strip() for value in values.split(",") if value.strip()]
+    return space
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--space",
+        action="append",
+        required=True,
+        help="FIELD=v1,v2,... for one of: " + ", ".join(SWEEP_FIELDS),
+    )
+    parser.add_argument("--random", type=int, help="Sample this many configurations")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="Checkpoint/results directory")
+    parser.add_argument("--symbols", help="Comma-separated symbols (default: SYMBOLS)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--db", default=str(CONFIG.db_path))
+    args = parser.parse_args(argv)
+
+    space = _parse_space(args.space)
+    configurations = (
+        random_search(space, args.random, seed=args.seed)
+        if args.random
+        else grid(space)
+    )
+    symbols = (
+        tuple(symbol.strip() for symbol in args.symbols.split(",") if symbol.strip())
+        if args.symbols
+        else None
+    )
+    results_path = run_sweep(
+        TradingDatabaseHandler(args.db),
+        configurations,
+        args.out,
+        symbols=symbols,
+        workers=args.workers,
+    )
+    print(f"✅ Sweep finished: {len(configurations)} configurations in {results_path}")
+
+
+if __name__ == "__main__":
+    main()
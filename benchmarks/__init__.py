@@ -0,0 +1 @@
+"""Scaled synthetic benchmarks for the trainer, monitor, database and models."""
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+"""Start-up cost of the CLI entry points.
+
+``import_report`` runs ``python -X importtime`` on a module in a fresh
+interpreter and parses the per-module self/cumulative microseconds;
+``noop_monitor_pass`` times a whole monitor run against a database without
+active signals. Both flag the heavy dependencies that must stay lazy until a
+code path really needs them::
+
+    python -m benchmarks.startup monitor_trades trainer_daemon --top 10
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ("ccxt", "pandas", "sklearn", "scipy", "river", "requests", "hmmlearn")
+STARTUP_BUDGET_SECONDS = 1.0
+
+_NOOP_MONITOR = """
+import json, sys
+from dataclasses import replace
+import monitor_trades
+monitor_trades.CONFIG = replace(monitor_trades.CONFIG, db_path=sys.argv[1])
+monitor_trades.check_outcomes()
+heavy = [name for name in json.loads(sys.argv[2]) if name in sys.modules]
+print(json.dumps(heavy))
+"""
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    module: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+def _run(args: list[str]) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    )
+
+
+def import_report(module: str) -> list[ImportTiming]:
+    """Every module imported by ``import <module>``, in completion order."""
+    completed = _run(["-X", "importtime", "-c", f"import {module}"])
+    timings = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        stripped = name.lstrip()
+        timings.append(
+            ImportTiming(
+                module=stripped,
+                depth=(len(name) - len(stripped) - 1) // 2,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+            )
+        )
+    return timings
+
+
+def heavy_imports(timings: list[ImportTiming]) -> list[str]:
+    return sorted({t.module for t in timings if t.module in HEAVY_MODULES})
+
+
+def noop_monitor_pass(db_path: str | Path) -> tuple[float, list[str]]:
+    """Wall seconds, interpreter start-up included, and heavy modules loaded."""
+    started = time.perf_counter()
+    completed = _run(["-c", _NOOP_MONITOR, str(db_path), json.dumps(HEAVY_MODULES)])
+    seconds = time.perf_counter() - started
+    return seconds, json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Report entry-point import times.")
+    parser.add_argument("modules", nargs="*", default=["monitor_trades", "trainer_daemon"])
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        timings = import_report(module)
+        total = next(t.cumulative_us for t in timings if t.module == module)
+        print(f"ℹ️ import {module}: {total / 1000:.1f} ms")
+        for timing in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[
+            1 : args.top + 1
+        ]:
+            print(
+                f"   {timing.cumulative_us / 1000:8.1f} ms  "
+                f"{'  ' * timing.depth}{timing.module}"
+            )
+        heavy = heavy_imports(timings)
+        if heavy:
+            print(f"⚠️ {module} imports {', '.join(heavy)} at start-up")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        seconds, heavy = noop_monitor_pass(Path(workdir) / "trading.db")
+    marker = "✅" if seconds < STARTUP_BUDGET_SECONDS and not heavy else "❌"
+    print(
+        f"{marker} No-op monitor pass: {seconds:.3f}s "
+        f"(budget {STARTUP_BUDGET_SECONDS:.1f}s), heavy modules: {', '.join(heavy) or 'none'}"
+    )
+
+
+if __name__ == "__main__":
+    main()
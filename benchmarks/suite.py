@@ -0,0 +1,381 @@
+from __future__ import annotations
+
+"""Scaled benchmarks of the cycle's hot paths on deterministic synthetic data.
+
+Every case runs at each requested scale (10, 100, 1,000 and 10,000 by
+default) and reports throughput plus p50/p95/p99 latency per operation:
+
+- ``baseline_models``: features, fit and prediction per symbol window (the
+  work of ``BaselineStrategy.predict`` on a refit);
+- ``evaluate_signal`` and ``check_outcomes``: per-signal SL/TP resolution
+  and a whole monitor pass over a database of active signals;
+- ``insert_signal`` and ``mark_signal_outcome``: database write throughput;
+- ``purged_kfold_split``, ``walk_forward`` and ``detect_regimes``: model
+  research tools over ``SERIES_BARS_PER_UNIT`` bars per scale unit.
+
+Usage::
+
+    python -m benchmarks.suite --scales 10,100 --output results.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --write-baseline
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --tolerance 0.2
+
+With ``--baseline`` every (case, scale) whose throughput fell more than the
+tolerance below the stored one is reported and the run exits non-zero.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import tempfile
+import time
+import warnings
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Sequence
+from unittest import mock
+
+import numpy as np
+
+from benchmarks.synthetic import (
+    HOUR_MS,
+    synthetic_candles,
+    synthetic_signals,
+    synthetic_universe,
+)
+
+DEFAULT_SCALES = (10, 100, 1_000, 10_000)
+SERIES_BARS_PER_UNIT = 10
+WINDOW_BARS = 100
+
+
+@dataclass(frozen=True)
+class Timing:
+    """Items processed and the latency of every timed operation."""
+
+    items: int
+    latencies: list[float]
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    name: str
+    unit: str
+    run: Callable[[int, int, Path], Timing]
+
+
+def _timed(operations) -> list[float]:
+    latencies = []
+    for operation in operations:
+        started = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def _database(workdir: Path):
+    from db.db_handler import TradingDatabaseHandler
+
+    return TradingDatabaseHandler(workdir / "benchmark.db")
+
+
+def _signal_fixture(count: int, seed: int, workdir: Path, **universe_options):
+    universe = synthetic_universe(count, WINDOW_BARS, seed=seed, **universe_options)
+    signals = synthetic_signals(universe, seed=seed, validity_bars=2 * WINDOW_BARS)
+    db = _database(workdir)
+    for signal in signals:
+        signal["id"] = db.insert_signal(signal)
+    return db, universe, signals
+
+
+def _baseline_models(scale: int, seed: int, workdir: Path) -> Timing:
+    from models.baseline import baseline_features, fit_baseline_models, predict_baseline
+
+    windows = synthetic_universe(scale, WINDOW_BARS, seed=seed).values()
+
+    def fit(candles):
+        features = baseline_features(candles.close, candles.high, candles.low)
+        predict_baseline(fit_baseline_models(features), features[-1])
+
+    return Timing(scale, _timed(lambda candles=candles: fit(candles) for candles in windows))
+
+
+def _evaluate_signal(scale: int, seed: int, workdir: Path) -> Timing:
+    import monitor_trades
+
+    db, universe, signals = _signal_fixture(scale, seed, workdir)
+    windows = {symbol: candles.to_candles() for symbol, candles in universe.items()}
+    now = datetime.fromtimestamp(
+        (int(next(iter(universe.values())).timestamp_ms[-1]) + HOUR_MS) / 1000, timezone.utc
+    )
+    with mock.patch.object(
+        monitor_trades, "CONFIG", replace(monitor_trades.CONFIG, discord_webhook=None)
+    ):
+        latencies = _timed(
+            lambda signal=signal: monitor_trades._evaluate_signal(
+                db, signal, windows[signal["symbol"]], now
+            )
+            for signal in signals
+        )
+    return Timing(scale, latencies)
+
+
+class _ReplayAdapter:
+    def __init__(self, universe) -> None:
+        self.windows = {symbol: candles.to_candles() for symbol, candles in universe.items()}
+
+    def fetch_closed_ohlcv(self, symbol: str, timeframe: str, limit: int):
+        return self.windows[symbol]
+
+
+def _check_outcomes(scale: int, seed: int, workdir: Path) -> Timing:
+    import monitor_trades
+
+    # Histories end at the last closed candle so no signal is already expired.
+    latest_ms = int(time.time() * 1000) // HOUR_MS * HOUR_MS - HOUR_MS
+    db, universe, _ = _signal_fixture(
+        scale, seed, workdir, start_ms=latest_ms - (WINDOW_BARS - 1) * HOUR_MS
+    )
+    config = replace(
+        monitor_trades.CONFIG,
+        db_path=db.db_path,
+        discord_webhook=None,
+        metrics_enabled=False,
+        profile_dir=None,
+        monitor_time_budget_seconds=86_400.0,
+    )
+    adapter = _ReplayAdapter(universe)
+    with mock.patch.object(monitor_trades, "CONFIG", config), mock.patch.object(
+        monitor_trades, "create_market_data_adapter", lambda *_: adapter
+    ), mock.patch("builtins.print"):
+        latencies = _timed([monitor_trades.check_outcomes])
+    return Timing(scale, latencies)
+
+
+def _insert_signal(scale: int, seed: int, workdir: Path) -> Timing:
+    universe = synthetic_universe(scale, WINDOW_BARS, seed=seed)
+    signals = synthetic_signals(universe, seed=seed)
+    db = _database(workdir)
+    return Timing(
+        scale, _timed(lambda signal=signal: db.insert_signal(signal) for signal in signals)
+    )
+
+
+def _mark_signal_outcome(scale: int, seed: int, workdir: Path) -> Timing:
+    db, _, signals = _signal_fixture(scale, seed, workdir)
+    return Timing(
+        scale,
+        _timed(
+            lambda signal=signal: db.mark_signal_outcome(
+                signal["id"],
+                outcome="TAKE_PROFIT",
+                outcome_price=signal["tp"],
+                outcome_at=signal["expires_at"],
+                status="CLOSED",
+            )
+            for signal in signals
+        ),
+    )
+
+
+def _series(scale: int, seed: int):
+    return synthetic_candles(scale * SERIES_BARS_PER_UNIT, seed=seed)
+
+
+def _purged_kfold_split(scale: int, seed: int, workdir: Path) -> Timing:
+    from models.purged_kfold import PurgedKFold
+
+    candles = _series(scale, seed)
+    timestamps = candles.timestamp_ms
+    label_end_times = timestamps + 24 * HOUR_MS
+    folds = PurgedKFold(n_splits=5).split(candles.close, timestamps, label_end_times)
+    return Timing(len(candles), _timed(lambda: next(folds) for _ in range(5)))
+
+
+def _walk_forward(scale: int, seed: int, workdir: Path) -> Timing:
+    import pandas as pd
+    from sklearn.linear_model import SGDClassifier
+
+    from models.baseline import baseline_features
+    from models.walk_forward import walk_forward
+
+    candles = _series(scale, seed)
+    features = baseline_features(candles.close, candles.high, candles.low)
+    df = pd.DataFrame(features[:-1], columns=["ret", "vol"])
+    df["target"] = (features[1:, 0] > 0).astype(int)
+    model = SGDClassifier(loss="log_loss", random_state=seed)
+    with warnings.catch_warnings():
+        # Short test windows with one predicted class make precision undefined.
+        warnings.simplefilter("ignore")
+        latencies = _timed(
+            [lambda: walk_forward(model, df, ["ret", "vol"], "target", 40, 20)]
+        )
+    return Timing(len(df), latencies)
+
+
+def _detect_regimes(scale: int, seed: int, workdir: Path) -> Timing:
+    import pandas as pd
+
+    from features.indicators import IndicatorEngine
+    from models.regime_hmm import detect_regimes
+
+    columns = IndicatorEngine().bulk(_series(scale, seed))
+    df = pd.DataFrame(
+        {name: columns[name] for name in ("log_return", "atr", "volatility")}
+    ).dropna()
+    hmm_logger = logging.getLogger("hmmlearn")
+    level = hmm_logger.level
+    # Short synthetic series routinely stop on the EM convergence check.
+    hmm_logger.setLevel(logging.ERROR)
+    # An unseeded initialisation occasionally collapses a state onto a few
+    # bars and the fit raises; seed it so every run times the same fit.
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            latencies = _timed([lambda: detect_regimes(df, random_state=seed)])
+    finally:
+        hmm_logger.setLevel(level)
+    return Timing(len(df), latencies)
+
+
+CASES = {
+    case.name: case
+    for case in (
+        BenchmarkCase("baseline_models", "symbols", _baseline_models),
+        BenchmarkCase("evaluate_signal", "signals", _evaluate_signal),
+        BenchmarkCase("check_outcomes", "signals", _check_outcomes),
+        BenchmarkCase("insert_signal", "signals", _insert_signal),
+        BenchmarkCase("mark_signal_outcome", "signals", _mark_signal_outcome),
+        BenchmarkCase("purged_kfold_split", "bars", _purged_kfold_split),
+        BenchmarkCase("walk_forward", "bars", _walk_forward),
+        BenchmarkCase("detect_regimes", "bars", _detect_regimes),
+    )
+}
+
+
+def _percentile_ms(latencies: Sequence[float], q: float) -> float:
+    return float(np.percentile(latencies, q) * 1000) if latencies else 0.0
+
+
+def run_case(case: BenchmarkCase, scale: int, *, seed: int = 7) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="profitforge-bench-") as workdir:
+        timing = case.run(scale, seed, Path(workdir))
+    seconds = sum(timing.latencies)
+    return {
+        "case": case.name,
+        "scale": scale,
+        "unit": case.unit,
+        "items": timing.items,
+        "operations": len(timing.latencies),
+        "seconds": seconds,
+        "throughput": timing.items / seconds if seconds else 0.0,
+        "p50_ms": _percentile_ms(timing.latencies, 50),
+        "p95_ms": _percentile_ms(timing.latencies, 95),
+        "p99_ms": _percentile_ms(timing.latencies, 99),
+    }
+
+
+def run_suite(
+    cases: Sequence[str] = tuple(CASES),
+    scales: Sequence[int] = DEFAULT_SCALES,
+    *,
+    seed: int = 7,
+    report: Callable[[dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        raise ValueError(f"Unknown benchmark case(s): {', '.join(sorted(unknown))}")
+    results = []
+    for name in cases:
+        for scale in scales:
+            result = run_case(CASES[name], scale, seed=seed)
+            results.append(result)
+            if report is not None:
+                report(result)
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "results": results,
+    }
+
+
+def compare_to_baseline(
+    run: dict[str, Any], baseline: dict[str, Any], *, tolerance: float
+) -> list[str]:
+    """Describe every (case, scale) whose throughput regressed beyond ``tolerance``."""
+    reference = {(row["case"], row["scale"]): row for row in baseline["results"]}
+    regressions = []
+    for row in run["results"]:
+        stored = reference.get((row["case"], row["scale"]))
+        if stored is None or not stored["throughput"]:
+            continue
+        change = row["throughput"] / stored["throughput"] - 1
+        if change < -tolerance:
+            regressions.append(
+                f"{row['case']} @ {row['scale']}: {row['throughput']:,.1f} "
+                f"{row['unit']}/s vs baseline {stored['throughput']:,.1f} ({change:+.0%})"
+            )
+    return regressions
+
+
+def _print_result(result: dict[str, Any]) -> None:
+    print(
+        f"ℹ️ {result['case']} @ {result['scale']}: "
+        f"{result['throughput']:,.1f} {result['unit']}/s, "
+        f"p50={result['p50_ms']:.3f}ms, p95={result['p95_ms']:.3f}ms, "
+        f"p99={result['p99_ms']:.3f}ms"
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Run the scaled synthetic benchmarks."
+    )
+    parser.add_argument("--cases", default=",".join(CASES))
+    parser.add_argument(
+        "--scales", default=",".join(str(scale) for scale in DEFAULT_SCALES)
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the results JSON here")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument(
+        "--write-baseline",
+        action="store_true",
+        help="Store this run as the --baseline instead of comparing",
+    )
+    args = parser.parse_args(argv)
+
+    run = run_suite(
+        [name.strip() for name in args.cases.split(",") if name.strip()],
+        [int(scale) for scale in args.scales.split(",") if scale.strip()],
+        seed=args.seed,
+        report=_print_result,
+    )
+    text = json.dumps(run, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+        print(f"✅ Results written to {args.output}")
+    if not args.baseline:
+        return
+    baseline_path = Path(args.baseline)
+    if args.write_baseline:
+        baseline_path.write_text(text, encoding="utf-8")
+        print(f"✅ Baseline written to {baseline_path}")
+        return
+
+    regressions = compare_to_baseline(
+        run, json.loads(baseline_path.read_text(encoding="utf-8")), tolerance=args.tolerance
+    )
+    for regression in regressions:
+        print(f"❌ Regression: {regression}")
+    if regressions:
+        raise SystemExit(1)
+    print(f"✅ No regressions beyond {args.tolerance:.0%} against {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+"""Deterministic synthetic candles and signals for benchmarks.
+
+Prices follow a log random walk whose volatility switches between a calm and
+a turbulent regime, so regime detection and SL/TP resolution see realistic
+structure. The same ``seed`` always yields the same arrays.
+"""
+
+from datetime import datetime, timezone
+from typing import Any
+
+import numpy as np
+
+from adapters.market_data import CandleArray
+
+HOUR_MS = 3_600_000
+START_MS = 1_700_000_000_000 // HOUR_MS * HOUR_MS
+REGIME_SIGMAS = np.array([0.004, 0.015])
+REGIME_SWITCH_PROBABILITY = 0.02
+
+
+def synthetic_symbols(count: int) -> list[str]:
+    return [f"SYN{index:05d}/USDT" for index in range(count)]
+
+
+def synthetic_candles(
+    bars: int,
+    *,
+    seed: int = 0,
+    start_ms: int = START_MS,
+    timeframe_ms: int = HOUR_MS,
+    price: float = 100.0,
+) -> CandleArray:
+    rng = np.random.default_rng(seed)
+    regime = np.cumsum(rng.random(bars) < REGIME_SWITCH_PROBABILITY) % 2
+    sigma = REGIME_SIGMAS[regime]
+    close = price * np.exp(np.cumsum(rng.normal(0.0, sigma)))
+    open_ = np.concatenate([[price], close[:-1]])
+    wick = np.abs(rng.normal(0.0, sigma, size=(2, bars)))
+    return CandleArray(
+        timestamp_ms=start_ms + np.arange(bars, dtype=np.int64) * timeframe_ms,
+        open=open_,
+        high=np.maximum(open_, close) * (1 + wick[0]),
+        low=np.minimum(open_, close) * (1 - wick[1]),
+        close=close,
+        volume=rng.lognormal(3.0, 0.5, size=bars),
+    )
+
+
+def synthetic_universe(
+    symbols: int,
+    bars: int,
+    *,
+    seed: int = 0,
+    start_ms: int = START_MS,
+    timeframe_ms: int = HOUR_MS,
+) -> dict[str, CandleArray]:
+    """One independent history per symbol; adding symbols keeps earlier ones."""
+    return {
+        symbol: synthetic_candles(
+            bars,
+            seed=seed * 1_000_003 + index,
+            start_ms=start_ms,
+            timeframe_ms=timeframe_ms,
+        )
+        for index, symbol in enumerate(synthetic_symbols(symbols))
+    }
+
+
+def synthetic_signals(
+    universe: dict[str, CandleArray],
+    *,
+    seed: int = 0,
+    timeframe: str = "1h",
+    timeframe_ms: int = HOUR_MS,
+    validity_bars: int = 48,
+    strategy_id: str = "benchmark",
+) -> list[dict[str, Any]]:
+    """One ACTIVE signal per symbol, entered halfway through its history.
+
+    Stops sit one to three bars' volatility away, so a mix of signals hits
+    SL, hits TP, touches both inside a candle or is still pending at the end.
+    """
+    rng = np.random.default_rng(seed)
+    signals = []
+    for symbol, candles in universe.items():
+        index = len(candles) // 2
+        entry = float(candles.close[index])
+        distance = entry * float(rng.uniform(1.0, 3.0)) * float(REGIME_SIGMAS.mean())
+        is_long = bool(rng.random() < 0.5)
+        direction = 1 if is_long else -1
+        candle_ms = int(candles.timestamp_ms[index])
+        created = datetime.fromtimestamp((candle_ms + timeframe_ms) / 1000, timezone.utc)
+        expires = datetime.fromtimestamp(
+            (candle_ms + (validity_bars + 1) * timeframe_ms) / 1000, timezone.utc
+        )
+        signals.append(
+            {
+                "signal_key": f"{strategy_id}|{symbol}|{timeframe}|{candle_ms}",
+                "timestamp": created.isoformat(),
+                "symbol": symbol,
+                "signal_type": "LONG" if is_long else "SHORT",
+                "timeframe": timeframe,
+                "strategy_id": strategy_id,
+                "candle_timestamp_ms": candle_ms,
+                "candle_closed": 1,
+                "entry": entry,
+                "sl": entry - direction * distance,
+                "tp": entry + direction * 1.5 * distance,
+                "confidence": 0.6,
+                "outcome": "PENDING",
+                "created_at": created.isoformat(),
+                "expires_at": expires.isoformat(),
+                "status": "ACTIVE",
+                "exchange": "bitget",
+            }
+        )
+    return signals
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+"""Server-side downsampling and figures for the dashboard's candle charts.
+
+Years of candles would send hundreds of thousands of points to the browser.
+Charts are therefore reduced to the viewport's point budget before plotting:
+
+- ``ohlc_buckets`` merges consecutive candles into coarser OHLC bars (first
+  open, max high, min low, last close), so every extreme stays visible;
+- ``lttb`` picks the Largest-Triangle-Three-Buckets subset of a line, which
+  keeps its visual shape with a fixed number of points.
+
+The dashboard re-queries the selected range on zoom, so detail comes back
+as the range narrows.
+"""
+
+import math
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from adapters.market_data import CandleArray
+
+OUTCOME_COLORS = {
+    "TAKE_PROFIT": "#2ca02c",
+    "STOP_LOSS": "#d62728",
+    "AMBIGUOUS": "#ff7f0e",
+    "EXPIRED": "#7f7f7f",
+}
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the Largest-Triangle-Three-Buckets subset of ``(x, y)``.
+
+    The first and last points are always kept; every bucket in between keeps
+    the point forming the largest triangle with the previously kept point
+    and the average of the next bucket.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_start = stop
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[next_start:next_stop].mean()
+        next_y = y[next_start:next_stop].mean()
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def ohlc_buckets(candles: "CandleArray", max_bars: int) -> "CandleArray":
+    """Merge runs of consecutive candles into at most ``max_bars`` OHLC bars."""
+    from adapters.market_data import CandleArray
+
+    n = len(candles)
+    if max_bars < 1:
+        raise ValueError("max_bars must be at least 1")
+    if n <= max_bars:
+        return candles
+
+    size = math.ceil(n / max_bars)
+    starts = np.arange(0, n, size)
+    ends = np.minimum(starts + size, n) - 1
+    return CandleArray(
+        timestamp_ms=candles.timestamp_ms[starts],
+        open=candles.open[starts],
+        high=np.maximum.reduceat(candles.high, starts),
+        low=np.minimum.reduceat(candles.low, starts),
+        close=candles.close[ends],
+        volume=np.add.reduceat(candles.volume, starts),
+    )
+
+
+def _datetimes(timestamps_ms: Sequence[int] | np.ndarray) -> np.ndarray:
+    return np.asarray(timestamps_ms, dtype="datetime64[ms]")
+
+
+def _iso_ms(value: str | None) -> int | None:
+    if not value:
+        return None
+    return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000)
+
+
+def candle_figure(
+    candles: "CandleArray",
+    signals: Sequence[dict[str, Any]],
+    *,
+    timeframe_ms: int,
+    max_points: int = 1_500,
+    style: str = "ohlc",
+    title: str = "",
+):
+    """Plotly figure of at most ``max_points`` bars plus signal markers.
+
+    Entries are drawn at the close of their signal candle, SL/TP as segments
+    until the outcome (or expiry) and outcomes as colored markers.
+    """
+    import plotly.graph_objects as go
+
+    figure = go.Figure()
+    if style == "line":
+        keep = lttb(candles.timestamp_ms, candles.close, max_points)
+        figure.add_trace(
+            go.Scattergl(
+                x=_datetimes(candles.timestamp_ms[keep] + timeframe_ms),
+                y=candles.close[keep],
+                mode="lines",
+                name="close",
+            )
+        )
+    else:
+        bars = ohlc_buckets(candles, max_points)
+        figure.add_trace(
+            go.Candlestick(
+                x=_datetimes(bars.timestamp_ms),
+                open=bars.open,
+                high=bars.high,
+                low=bars.low,
+                close=bars.close,
+                name="price",
+            )
+        )
+
+    for side, symbol_marker, color in (
+        ("LONG", "triangle-up", "#1f77b4"),
+        ("SHORT", "triangle-down", "#9467bd"),
+    ):
+        entries = [signal for signal in signals if signal["signal_type"] == side]
+        if entries:
+            figure.add_trace(
+                go.Scatter(
+                    x=_datetimes(
+                        [signal["candle_timestamp_ms"] + timeframe_ms for signal in entries]
+                    ),
+                    y=[signal["entry"] for signal in entries],
+                    mode="markers",
+                    marker={"symbol": symbol_marker, "size": 10, "color": color},
+                    name=f"{side.lower()} entry",
+                )
+            )
+
+    levels: dict[str, tuple[list, list]] = {"sl": ([], []), "tp": ([], [])}
+    outcomes: dict[str, tuple[list, list]] = {}
+    for signal in signals:
+        opened_ms = signal["candle_timestamp_ms"] + timeframe_ms
+        closed_ms = _iso_ms(signal.get("outcome_at")) or _iso_ms(signal.get("expires_at"))
+        if closed_ms is None:
+            continue
+        for level, (xs, ys) in levels.items():
+            # None breaks the line between signals.
+            xs.extend([opened_ms, closed_ms, None])
+            ys.extend([signal[level], signal[level], None])
+        if signal.get("outcome") in OUTCOME_COLORS:
+            xs, ys = outcomes.setdefault(signal["outcome"], ([], []))
+            xs.append(closed_ms)
+            ys.append(signal.get("outcome_price") or signal["entry"])
+
+    for level, color in (("sl", "#d62728"), ("tp", "#2ca02c")):
+        xs, ys = levels[level]
+        if xs:
+            figure.add_trace(
+                go.Scatter(
+                    x=[None if value is None else np.datetime64(value, "ms") for value in xs],
+                    y=ys,
+                    mode="lines",
+                    line={"color": color, "width": 1, "dash": "dot"},
+                    name=level.upper(),
+                )
+            )
+    for outcome, (xs, ys) in outcomes.items():
+        figure.add_trace(
+            go.Scatter(
+                x=_datetimes(xs),
+                y=ys,
+                mode="markers",
+                marker={"symbol": "x", "size": 9, "color": OUTCOME_COLORS[outcome]},
+                name=outcome.lower(),
+            )
+        )
+
+    figure.update_layout(
+        title=title,
+        xaxis_rangeslider_visible=False,
+        height=520,
+        margin={"l": 10, "r": 10, "t": 40, "b": 10},
+    )
+    return figure
@@ -26,6 +26,14 @@ def _env_float(name: str, default: float) -> float:
 MARKET_DATA_EXCHANGE_ID = os.getenv(
     "MARKET_DATA_EXCHANGE_ID", "bitget"
 ).strip().lower()
+# Optional ranked ccxt exchanges asked when Bitget is slower than its own
+# MARKET_DATA_HEDGE_PERCENTILE latency, or fails. Bitget stays the primary.
+MARKET_DATA_HEDGE_EXCHANGES = tuple(
+    exchange_id.strip().lower()
+    for exchange_id in os.getenv("MARKET_DATA_HEDGE_EXCHANGES", "").split(",")
+    if exchange_id.strip()
+)
+MARKET_DATA_HEDGE_PERCENTILE = _env_float("MARKET_DATA_HEDGE_PERCENTILE", 0.95)
 EXECUTION_EXCHANGE_ID = os.getenv("EXECUTION_EXCHANGE_ID", "").strip().lower() or None
 
 TIMEFRAME = os.getenv("SIGNAL_TIMEFRAME", "1h")
@@ -37,11 +45,34 @@ SIGNAL_VALIDITY_BARS = int(os.getenv("SIGNAL_VALIDITY_BARS", "1"))
 RISK_PER_TRADE = _env_float("RISK_PER_TRADE", 0.0075)
 ACCOUNT_EQUITY_USDT = _env_float("ACCOUNT_EQUITY_USDT", 10000.0)
 
+# Cap on the correlated risk of one cycle's ACTIVE signals, as a fraction of
+# equity. 0 disables the cap.
+PORTFOLIO_RISK_CAP = _env_float("PORTFOLIO_RISK_CAP", 0.03)
+CORRELATION_WINDOW_BARS = int(os.getenv("CORRELATION_WINDOW_BARS", "168"))
+
 MIN_STOP_DISTANCE_PCT = _env_float("MIN_STOP_DISTANCE_PCT", 0.008)
 REWARD_RISK_RATIO = _env_float("REWARD_RISK_RATIO", 1.5)
 
+# Label the baseline strategy's signals, models and drift state are stored
+# under; any value is accepted.
 STRATEGY_ID = os.getenv("STRATEGY_ID", "baseline_ml_v1")
 
+# Registered strategies evaluated on every fetched candle window. Each one
+# costs CPU only; candles are fetched once per symbol and shared.
+STRATEGY_IDS = tuple(
+    strategy_id.strip()
+    for strategy_id in os.getenv("STRATEGY_IDS", "baseline_ml_v1").split(",")
+    if strategy_id.strip()
+)
+# Per-strategy CPU seconds per cycle; a strategy over budget skips its
+# remaining symbols so it cannot starve the others. 0 disables the budget.
+STRATEGY_CPU_BUDGET_SECONDS = _env_float("STRATEGY_CPU_BUDGET_SECONDS", 0.0)
+
+# "drift": reuse each symbol's persisted baseline models and refit only when
+# ADWIN flags a shift in its realized error stream (or no model exists yet).
+# "always": refit every symbol on every cycle.
+RETRAIN_POLICY = os.getenv("RETRAIN_POLICY", "drift").strip().lower()
+
 SYMBOLS = tuple(
     symbol.strip()
     for symbol in os.getenv(
@@ -54,9 +85,95 @@ SYMBOLS = tuple(
 
 DISCORD_WEBHOOK = os.getenv("DISCORD_WEBHOOK")
 
+# Time budgets keep each workflow step inside the job's timeout-minutes: 20.
+# The trainer stops starting symbols that would not finish before its budget
+# minus the reserve kept for filters and persistence; the monitor gets its own
+# budget so the outcome pass and the database commit always run.
+CYCLE_TIME_BUDGET_SECONDS = _env_float("CYCLE_TIME_BUDGET_SECONDS", 600.0)
+CYCLE_RESERVE_SECONDS = _env_float("CYCLE_RESERVE_SECONDS", 60.0)
+MONITOR_TIME_BUDGET_SECONDS = _env_float("MONITOR_TIME_BUDGET_SECONDS", 300.0)
+
+# "single" runs the whole cycle in one process. "sharded" lets several
+# workers sharing the database file split a cycle: each leases symbol tasks
+# from the cycle_tasks queue, heartbeats while working and lets abandoned
+# leases expire so another worker can reclaim them.
+CYCLE_MODE = os.getenv("CYCLE_MODE", "single").strip().lower()
+CYCLE_TASK_LEASE_SECONDS = _env_float("CYCLE_TASK_LEASE_SECONDS", 300.0)
+CYCLE_TASK_MAX_ATTEMPTS = int(os.getenv("CYCLE_TASK_MAX_ATTEMPTS", "3"))
+WORKER_ID = os.getenv("WORKER_ID", "").strip() or None
+
+# Results a trainer pipeline stage may run ahead of the next one: fetching
+# overlaps strategy evaluation and persistence overlaps notifications.
+# 0 runs every stage inline, one symbol at a time.
+PIPELINE_DEPTH = int(os.getenv("PIPELINE_DEPTH", "2"))
+
+# Per-stage timings and counters of each trainer/monitor cycle go to the
+# cycle_metrics table; with METRICS_DIR also to <process>.json and a
+# Prometheus textfile-collector <process>.prom file.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").strip().lower() not in {
+    "0",
+    "false",
+    "no",
+    "off",
+}
+METRICS_DIR = os.getenv("METRICS_DIR", "").strip() or None
+
+# Opt-in cProfile/tracemalloc capture of a cycle into PROFILE_DIR; with
+# PROFILE_SYMBOL only that symbol's work is captured. A positive
+# PROFILE_MEMORY_BUDGET_MB fails the run when the peak exceeds it.
+PROFILE_DIR = os.getenv("PROFILE_DIR", "").strip() or None
+PROFILE_SYMBOL = os.getenv("PROFILE_SYMBOL", "").strip() or None
+PROFILE_TOP_ALLOCATIONS = int(os.getenv("PROFILE_TOP_ALLOCATIONS", "25"))
+PROFILE_MEMORY_BUDGET_MB = _env_float("PROFILE_MEMORY_BUDGET_MB", 0.0)
+
+# Lower timeframe, e.g. "1m", whose candles inside a signal bar decide
+# whether SL or TP was touched first when the bar touches both. Only those
+# bars are fetched, once each, and kept in the candles table. Empty disables.
+AMBIGUOUS_DRILLDOWN_TIMEFRAME = (
+    os.getenv("AMBIGUOUS_DRILLDOWN_TIMEFRAME", "").strip() or None
+)
+
+# Optional "SYMBOL=weight" pairs; higher weights are scheduled first.
+SYMBOL_PRIORITY = tuple(
+    (symbol.strip(), float(weight))
+    for symbol, _, weight in (
+        entry.partition("=")
+        for entry in os.getenv("SYMBOL_PRIORITY", "").split(",")
+        if entry.strip()
+    )
+)
+
+# Optional columnar feature store; the trainer appends new bars when set.
+FEATURE_STORE_DIR = os.getenv("FEATURE_STORE_DIR", "").strip() or None
+
+# Optional content-addressed cache of baseline fits shared by every process
+# using the directory; least recently used entries go beyond MODEL_CACHE_MAX_MB.
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", "").strip() or None
+MODEL_CACHE_MAX_MB = _env_float("MODEL_CACHE_MAX_MB", 256.0)
+
+# Optional memory-mapped candle archive used for deep-history research reads.
+CANDLE_ARCHIVE_DIR = os.getenv("CANDLE_ARCHIVE_DIR", "").strip() or None
+
+# Optional meta-labeling filter. When set, the path must point to an artifact
+# directory written by models.meta_model.MetaModel.save().
+META_MODEL_PATH = os.getenv("META_MODEL_PATH", "").strip() or None
+META_MODEL_THRESHOLD = _env_float("META_MODEL_THRESHOLD", 0.5)
+
+if not 0 < MARKET_DATA_HEDGE_PERCENTILE < 1:
+    raise ValueError("MARKET_DATA_HEDGE_PERCENTILE must be between 0 and 1.")
+
+if MARKET_DATA_EXCHANGE_ID in MARKET_DATA_HEDGE_EXCHANGES:
+    raise ValueError("MARKET_DATA_HEDGE_EXCHANGES must not repeat the primary exchange.")
+
 if not 0 < RISK_PER_TRADE < 1:
     raise ValueError("RISK_PER_TRADE must be greater than 0 and less than 1.")
 
+if not 0 <= PORTFOLIO_RISK_CAP < 1:
+    raise ValueError("PORTFOLIO_RISK_CAP must be at least 0 and less than 1.")
+
+if CORRELATION_WINDOW_BARS < 2:
+    raise ValueError("CORRELATION_WINDOW_BARS must be at least 2.")
+
 if SIGNAL_VALIDITY_BARS < 1:
     raise ValueError("SIGNAL_VALIDITY_BARS must be at least 1.")
 
@@ -69,22 +186,104 @@ if MIN_STOP_DISTANCE_PCT <= 0:
 if REWARD_RISK_RATIO <= 0:
     raise ValueError("REWARD_RISK_RATIO must be greater than 0.")
 
+if not STRATEGY_IDS or len(set(STRATEGY_IDS)) != len(STRATEGY_IDS):
+    raise ValueError("STRATEGY_IDS must list at least one strategy, without duplicates.")
+
+if STRATEGY_CPU_BUDGET_SECONDS < 0:
+    raise ValueError("STRATEGY_CPU_BUDGET_SECONDS must be at least 0.")
+
+if CYCLE_TIME_BUDGET_SECONDS <= 0 or MONITOR_TIME_BUDGET_SECONDS <= 0:
+    raise ValueError("Cycle and monitor time budgets must be greater than 0.")
+
+if not 0 <= CYCLE_RESERVE_SECONDS < min(
+    CYCLE_TIME_BUDGET_SECONDS, MONITOR_TIME_BUDGET_SECONDS
+):
+    raise ValueError("CYCLE_RESERVE_SECONDS must be at least 0 and below each budget.")
+
+if CYCLE_MODE not in {"single", "sharded"}:
+    raise ValueError("CYCLE_MODE must be 'single' or 'sharded'.")
+
+if CYCLE_TASK_LEASE_SECONDS <= 0 or CYCLE_TASK_MAX_ATTEMPTS < 1:
+    raise ValueError(
+        "CYCLE_TASK_LEASE_SECONDS must be greater than 0 and "
+        "CYCLE_TASK_MAX_ATTEMPTS at least 1."
+    )
+
+if PIPELINE_DEPTH < 0:
+    raise ValueError("PIPELINE_DEPTH must be at least 0.")
+
+if PROFILE_TOP_ALLOCATIONS < 1 or PROFILE_MEMORY_BUDGET_MB < 0:
+    raise ValueError(
+        "PROFILE_TOP_ALLOCATIONS must be at least 1 and "
+        "PROFILE_MEMORY_BUDGET_MB at least 0."
+    )
+
+if AMBIGUOUS_DRILLDOWN_TIMEFRAME is not None and not (
+    AMBIGUOUS_DRILLDOWN_TIMEFRAME[:-1].isdigit()
+    and AMBIGUOUS_DRILLDOWN_TIMEFRAME[-1] in "smhdw"
+):
+    raise ValueError("AMBIGUOUS_DRILLDOWN_TIMEFRAME must look like '1m' or '5m'.")
+
+if MODEL_CACHE_MAX_MB <= 0:
+    raise ValueError("MODEL_CACHE_MAX_MB must be greater than 0.")
+
+if RETRAIN_POLICY not in {"drift", "always"}:
+    raise ValueError("RETRAIN_POLICY must be 'drift' or 'always'.")
+
+if not 0 <= META_MODEL_THRESHOLD <= 1:
+    raise ValueError("META_MODEL_THRESHOLD must be between 0 and 1.")
+
 
 @dataclass(frozen=True)
 class RuntimeConfig:
     db_path: Path = DB_PATH
     market_data_exchange_id: str = MARKET_DATA_EXCHANGE_ID
+    market_data_hedge_exchanges: tuple[str, ...] = MARKET_DATA_HEDGE_EXCHANGES
+    market_data_hedge_percentile: float = MARKET_DATA_HEDGE_PERCENTILE
     execution_exchange_id: str | None = EXECUTION_EXCHANGE_ID
     timeframe: str = TIMEFRAME
     ohlcv_limit: int = OHLCV_LIMIT
     signal_validity_bars: int = SIGNAL_VALIDITY_BARS
     risk_per_trade: float = RISK_PER_TRADE
     account_equity_usdt: float = ACCOUNT_EQUITY_USDT
+    portfolio_risk_cap: float = PORTFOLIO_RISK_CAP
+    correlation_window_bars: int = CORRELATION_WINDOW_BARS
     min_stop_distance_pct: float = MIN_STOP_DISTANCE_PCT
     reward_risk_ratio: float = REWARD_RISK_RATIO
     strategy_id: str = STRATEGY_ID
+    strategy_ids: tuple[str, ...] = STRATEGY_IDS
+    strategy_cpu_budget_seconds: float = STRATEGY_CPU_BUDGET_SECONDS
+    retrain_policy: str = RETRAIN_POLICY
     symbols: tuple[str, ...] = SYMBOLS
     discord_webhook: str | None = DISCORD_WEBHOOK
+    cycle_time_budget_seconds: float = CYCLE_TIME_BUDGET_SECONDS
+    cycle_reserve_seconds: float = CYCLE_RESERVE_SECONDS
+    monitor_time_budget_seconds: float = MONITOR_TIME_BUDGET_SECONDS
+    cycle_mode: str = CYCLE_MODE
+    cycle_task_lease_seconds: float = CYCLE_TASK_LEASE_SECONDS
+    cycle_task_max_attempts: int = CYCLE_TASK_MAX_ATTEMPTS
+    worker_id: str | None = WORKER_ID
+    pipeline_depth: int = PIPELINE_DEPTH
+    metrics_enabled: bool = METRICS_ENABLED
+    metrics_dir: Path | None = Path(METRICS_DIR) if METRICS_DIR else None
+    profile_dir: Path | None = Path(PROFILE_DIR) if PROFILE_DIR else None
+    profile_symbol: str | None = PROFILE_SYMBOL
+    profile_top_allocations: int = PROFILE_TOP_ALLOCATIONS
+    profile_memory_budget_mb: float | None = PROFILE_MEMORY_BUDGET_MB or None
+    symbol_priority: tuple[tuple[str, float], ...] = SYMBOL_PRIORITY
+    ambiguous_drilldown_timeframe: str | None = AMBIGUOUS_DRILLDOWN_TIMEFRAME
+    feature_store_dir: Path | None = (
+        Path(FEATURE_STORE_DIR) if FEATURE_STORE_DIR else None
+    )
+    model_cache_dir: Path | None = Path(MODEL_CACHE_DIR) if MODEL_CACHE_DIR else None
+    model_cache_max_mb: float = MODEL_CACHE_MAX_MB
+    candle_archive_dir: Path | None = (
+        Path(CANDLE_ARCHIVE_DIR) if CANDLE_ARCHIVE_DIR else None
+    )
+    meta_model_path: Path | None = (
+        Path(META_MODEL_PATH) if META_MODEL_PATH else None
+    )
+    meta_model_threshold: float = META_MODEL_THRESHOLD
 
 
 CONFIG = RuntimeConfig()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+"""Bounded-queue stages that overlap the per-symbol work of a cycle.
+
+``staged`` runs one stage of a pipeline (fetching a symbol, persisting a
+signal) in a worker thread and hands its results to the consuming stage
+through a queue of at most ``depth`` items. The worker runs ahead of the
+consumer by that many results and then blocks, so a slow consumer throttles
+the stage feeding it instead of letting results pile up in memory. Chained
+stages therefore overlap, network waits against model fitting, and a cycle
+takes about as long as its slowest stage rather than the sum of all stages.
+
+Stages report their own failures in their results; an exception escaping a
+stage stops the worker and is re-raised in the consumer. With ``depth`` 0
+the stage runs inline in the consumer's thread, one item at a time.
+"""
+
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, TypeVar
+
+import metrics
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+POLL_SECONDS = 0.1
+_DONE = object()
+
+
+def staged(
+    items: Iterable[T],
+    stage: Callable[[T], R],
+    *,
+    depth: int,
+    name: str,
+) -> Iterator[R]:
+    """Yield ``stage(item)`` for every item, computed up to ``depth`` ahead.
+
+    ``items`` is consumed by the worker thread, so a scheduler generator
+    driving it measures how long each item takes to pass the whole pipeline.
+    Time the worker spends blocked on a full queue is recorded as the
+    ``<name>_backpressure`` stage.
+    """
+    if depth <= 0:
+        for item in items:
+            yield stage(item)
+        return
+
+    results: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    failures: list[BaseException] = []
+
+    def put(value: object) -> bool:
+        try:
+            results.put_nowait(value)
+            return True
+        except queue.Full:
+            pass
+        with metrics.span(f"{name}_backpressure"):
+            while not stop.is_set():
+                try:
+                    results.put(value, timeout=POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    continue
+        return False
+
+    def work() -> None:
+        try:
+            for item in items:
+                if stop.is_set() or not put(stage(item)):
+                    return
+        except BaseException as exc:
+            failures.append(exc)
+        finally:
+            put(_DONE)
+
+    worker = threading.Thread(target=work, name=f"cycle-{name}", daemon=True)
+    worker.start()
+    try:
+        while True:
+            result = results.get()
+            if result is _DONE:
+                break
+            yield result
+    finally:
+        # Also reached when the consumer stops early: release a blocked put
+        # and let an in-flight item finish before returning.
+        stop.set()
+        worker.join()
+    if failures:
+        raise failures[0]
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+"""Lease-based sharing of one cycle's symbols between several workers.
+
+Every worker enqueues the cycle's (symbol, timeframe, candle) tasks, which is
+idempotent, and then leases them one at a time from the ``cycle_tasks`` table
+of the canonical database. A lease expires unless its worker heartbeats, so
+a crashed or killed worker's symbols are reclaimed by the others. Leasing
+only decides who does the work: the ``signal_key`` uniqueness of the
+``signals`` table still guarantees at most one signal per candle if a
+reclaimed task is processed twice.
+"""
+
+import os
+import socket
+import time
+from typing import Callable, Iterable, Sequence
+
+from db.db_handler import TradingDatabaseHandler
+
+
+def cycle_candle_ms(timeframe_ms: int, now_ms: int) -> int:
+    """Open time of the newest fully closed candle, which the cycle trades on."""
+    return now_ms // timeframe_ms * timeframe_ms - timeframe_ms
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class CycleWorkQueue:
+    def __init__(
+        self,
+        db: TradingDatabaseHandler,
+        *,
+        timeframe: str,
+        candle_timestamp_ms: int,
+        worker_id: str,
+        lease_seconds: float,
+        max_attempts: int = 3,
+        retry_delay_seconds: float = 30.0,
+        clock_ms: Callable[[], int] | None = None,
+    ) -> None:
+        if lease_seconds <= 0:
+            raise ValueError("lease_seconds must be greater than zero")
+        self.db = db
+        self.timeframe = timeframe
+        self.candle_timestamp_ms = candle_timestamp_ms
+        self.worker_id = worker_id
+        self.lease_ms = int(lease_seconds * 1000)
+        self.max_attempts = max_attempts
+        self.retry_delay_ms = int(retry_delay_seconds * 1000)
+        self.clock_ms = clock_ms or (lambda: int(time.time() * 1000))
+        self.held: dict[str, str] = {}
+        self.lost: list[str] = []
+        self._renewed_at_ms = 0
+
+    def enqueue(self, symbols: Iterable[str]) -> int:
+        return self.db.enqueue_cycle_tasks(
+            timeframe=self.timeframe,
+            candle_timestamp_ms=self.candle_timestamp_ms,
+            symbols=list(symbols),
+        )
+
+    def claim(self, symbol_order: Sequence[str] = ()) -> str | None:
+        """Lease the highest-ranked open task; None once nothing is left."""
+        now_ms = self.clock_ms()
+        rows = self.db.claim_cycle_tasks(
+            timeframe=self.timeframe,
+            candle_timestamp_ms=self.candle_timestamp_ms,
+            worker_id=self.worker_id,
+            lease_ms=self.lease_ms,
+            now_ms=now_ms,
+            symbol_order=symbol_order,
+            max_attempts=self.max_attempts,
+        )
+        if not rows:
+            return None
+        if not self.held:
+            self._renewed_at_ms = now_ms
+        self.held[rows[0]["symbol"]] = rows[0]["task_key"]
+        return rows[0]["symbol"]
+
+    def heartbeat(self) -> None:
+        """Extend held leases, writing at most once per third of a lease."""
+        now_ms = self.clock_ms()
+        if not self.held or now_ms - self._renewed_at_ms < self.lease_ms // 3:
+            return
+        self.db.renew_cycle_leases(
+            worker_id=self.worker_id, lease_ms=self.lease_ms, now_ms=now_ms
+        )
+        self._renewed_at_ms = now_ms
+
+    def complete(self, symbol: str) -> bool:
+        return self._finish(symbol, None)
+
+    def fail(self, symbol: str, error: str) -> bool:
+        """Release the task for a retry by any worker after the retry delay."""
+        return self._finish(symbol, error)
+
+    def _finish(self, symbol: str, error: str | None) -> bool:
+        task_key = self.held.pop(symbol)
+        finished = self.db.finish_cycle_task(
+            task_key,
+            worker_id=self.worker_id,
+            error=error,
+            retry_at_ms=self.clock_ms() + self.retry_delay_ms if error else 0,
+            max_attempts=self.max_attempts,
+        )
+        if not finished:
+            self.lost.append(symbol)
+        return finished
+
+    def counts(self) -> dict[str, int]:
+        return self.db.get_cycle_task_counts(
+            timeframe=self.timeframe, candle_timestamp_ms=self.candle_timestamp_ms
+        )
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+"""Deadline-aware ordering of per-symbol cycle work.
+
+The hourly workflow is killed after a fixed timeout. A cycle therefore runs
+its per-symbol work under a time budget: items are started in priority
+order only while the slowest item seen so far still fits before the
+deadline minus a reserve kept for the cycle's own filters and persistence.
+Items that do not fit are deferred, reported, and promoted to the front of
+the next cycle so low-priority symbols cannot starve.
+"""
+
+import json
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Mapping
+
+SCHEDULER_COMPONENT = "cycle_scheduler"
+
+
+@dataclass(frozen=True)
+class WorkItem:
+    key: str
+    weight: float = 1.0
+    open_signals: int = 0
+    liquidity: float = 0.0
+    deferred_before: bool = False
+
+    def priority(self) -> tuple:
+        # Sorted ascending: deferred work first, then configured weight, open
+        # signals and liquidity, highest first.
+        return (
+            not self.deferred_before,
+            -self.weight,
+            -self.open_signals,
+            -self.liquidity,
+        )
+
+
+class CycleScheduler:
+    """Hands out work items while they can still finish before the deadline."""
+
+    def __init__(
+        self,
+        budget_seconds: float,
+        *,
+        reserve_seconds: float = 0.0,
+        initial_estimate_seconds: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if budget_seconds <= 0:
+            raise ValueError("budget_seconds must be greater than zero")
+        if not 0 <= reserve_seconds < budget_seconds:
+            raise ValueError("reserve_seconds must be at least 0 and below the budget")
+        self.budget_seconds = budget_seconds
+        self.reserve_seconds = reserve_seconds
+        self.clock = clock
+        self.started_at = clock()
+        self.deferred: list[str] = []
+        self.completed = 0
+        self._estimate = initial_estimate_seconds
+
+    def elapsed(self) -> float:
+        return self.clock() - self.started_at
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline, including the reserve."""
+        return self.budget_seconds - self.elapsed()
+
+    def can_start(self, estimate_seconds: float | None = None) -> bool:
+        estimate = self._estimate if estimate_seconds is None else estimate_seconds
+        return self.remaining() - self.reserve_seconds >= estimate
+
+    def schedule(self, items: Iterable[WorkItem]) -> Iterator[WorkItem]:
+        """Yield items by priority until the next one would miss the deadline.
+
+        The time between yielding an item and resuming the iterator is taken
+        as that item's cost; the largest cost seen so far is the estimate for
+        the next item.
+        """
+        ordered = sorted(items, key=WorkItem.priority)
+        for position, item in enumerate(ordered):
+            if not self.can_start():
+                self.deferred.extend(pending.key for pending in ordered[position:])
+                return
+            started = self.clock()
+            yield item
+            self._estimate = max(self._estimate, self.clock() - started)
+            self.completed += 1
+
+    def drain(self, claim: Callable[[], str | None]) -> Iterator[str]:
+        """Yield keys from ``claim`` while another item still fits.
+
+        For shared work queues: nothing is claimed that could not finish, so
+        unclaimed keys stay available to other workers instead of deferred.
+        """
+        while self.can_start():
+            key = claim()
+            if key is None:
+                return
+            started = self.clock()
+            yield key
+            self._estimate = max(self._estimate, self.clock() - started)
+            self.completed += 1
+
+
+def build_work_items(
+    keys: Iterable[str],
+    *,
+    weights: Mapping[str, float] | None = None,
+    activity: Mapping[str, tuple[float, int]] | None = None,
+    deferred_before: Iterable[str] = (),
+) -> list[WorkItem]:
+    """Combine configured weights, ``(liquidity, open signals)`` and deferrals."""
+    weights = weights or {}
+    activity = activity or {}
+    deferred_before = set(deferred_before)
+    items = []
+    for key in keys:
+        liquidity, open_signals = activity.get(key, (0.0, 0))
+        items.append(
+            WorkItem(
+                key=key,
+                weight=float(weights.get(key, 1.0)),
+                open_signals=int(open_signals),
+                liquidity=float(liquidity) if math.isfinite(liquidity) else 0.0,
+                deferred_before=key in deferred_before,
+            )
+        )
+    return items
+
+
+def load_deferred(db, state_key: str) -> list[str]:
+    payload = db.load_component_states(SCHEDULER_COMPONENT).get(state_key)
+    return json.loads(payload.decode("utf-8")) if payload else []
+
+
+def save_deferred(db, state_key: str, deferred: Iterable[str]) -> None:
+    db.save_component_states(
+        SCHEDULER_COMPONENT,
+        {state_key: json.dumps(list(deferred)).encode("utf-8")},
+    )
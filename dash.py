@@ -1,28 +1,159 @@
-import streamlit as st
-import pandas as pd
 import sqlite3
-import os
+from datetime import datetime, timezone
+
+import pandas as pd
+import streamlit as st
+
+from adapters.market_data import timeframe_to_ms
+from charts import candle_figure
+from config import CONFIG
+from db.dashboard_data import DashboardDataSource
 
 st.set_page_config(page_title="Nexus Command", layout="wide")
 
-DB_PATH = "data/trading.db"
+PAGE_SIZE = 50
+# Roughly one bar per two horizontal pixels of a wide chart.
+CHART_POINTS = 800
+
+
+@st.cache_resource
+def get_data_source() -> DashboardDataSource:
+    # One read-only source per server process, shared by every session.
+    return DashboardDataSource(CONFIG.db_path)
+
+
+def _utc(timestamp_ms: int) -> datetime:
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+
 
-def get_data():
-    if not os.path.exists(DB_PATH): return None
+@st.cache_data(ttl=600, show_spinner=False)
+def latest_regime(
+    symbol: str, start_ms: int, end_ms: int
+) -> tuple[int, float, int] | None:
+    """HMM regime of the range's last bar from stored indicator features."""
+    from features.store import FeatureStore
+    from models.regime_hmm import detect_regimes_from_store
+
+    regimes = detect_regimes_from_store(
+        FeatureStore(CONFIG.feature_store_dir),
+        exchange=CONFIG.market_data_exchange_id,
+        symbol=symbol,
+        timeframe=CONFIG.timeframe,
+        start_ms=start_ms,
+        end_ms=end_ms,
+        random_state=0,
+    )
+    if regimes.empty:
+        return None
+    last = regimes.iloc[-1]
+    return int(last["regime"]), float(last["regime_prob"]), len(regimes)
+
+
+def render_chart(source: DashboardDataSource) -> None:
+    st.subheader("Price and signals")
+    columns = st.columns([2, 1, 4])
+    symbol = columns[0].selectbox("Symbol", CONFIG.symbols)
+    style = columns[1].radio("Style", ("ohlc", "line"), horizontal=True)
+    span = source.candle_span(
+        exchange=CONFIG.market_data_exchange_id, symbol=symbol, timeframe=CONFIG.timeframe
+    )
+    if span is None:
+        st.info(f"No stored candles for {symbol} yet.")
+        return
+
+    # Narrowing the range re-queries it, so zooming in brings back detail.
+    first, last = _utc(span[0]), _utc(span[1])
+    start, end = first, last
+    if first < last:
+        start, end = columns[2].slider(
+            "Range", min_value=first, max_value=last, value=(first, last), format="YYYY-MM-DD"
+        )
+    start_ms, end_ms = int(start.timestamp() * 1000), int(end.timestamp() * 1000)
+    candles = source.candles(
+        exchange=CONFIG.market_data_exchange_id,
+        symbol=symbol,
+        timeframe=CONFIG.timeframe,
+        start_ms=start_ms,
+        end_ms=end_ms,
+    )
+    signals = source.chart_signals(
+        symbol=symbol, timeframe=CONFIG.timeframe, start_ms=start_ms, end_ms=end_ms
+    )
+    st.plotly_chart(
+        candle_figure(
+            candles,
+            signals,
+            timeframe_ms=timeframe_to_ms(CONFIG.timeframe),
+            max_points=CHART_POINTS,
+            style=style,
+            title=f"{symbol} {CONFIG.timeframe}: {len(candles)} candles, {len(signals)} signals",
+        ),
+        use_container_width=True,
+    )
+
+    if CONFIG.feature_store_dir is None:
+        return
     try:
-        conn = sqlite3.connect(DB_PATH)
-        df = pd.read_sql("SELECT * FROM signals ORDER BY timestamp DESC LIMIT 50", conn)
-        conn.close()
-        return df
-    except: return None
+        regime = latest_regime(symbol, start_ms, end_ms)
+    except Exception as exc:
+        st.warning(f"⚠️ Regime detection unavailable: {exc}")
+        return
+    if regime is None:
+        st.info(f"No stored indicator features for {symbol} in this range.")
+    else:
+        state, probability, bars = regime
+        st.caption(
+            f"Market regime at the last bar: {state} "
+            f"(probability {probability:.0%}, HMM over {bars} stored bars)"
+        )
+
 
 st.title("🛰️ Nexus Live Intelligence")
 
-df = get_data()
+source = get_data_source()
+df = None
+latest = None
+total = 0
+if source.available():
+    try:
+        total = source.total_signals()
+        latest = next(iter(source.recent_signals(1)), None)
+        page = st.number_input(
+            "Page", min_value=1, max_value=max(1, -(-total // PAGE_SIZE)), value=1
+        )
+        df = pd.DataFrame(source.signals_page(int(page) - 1, page_size=PAGE_SIZE))
+    except sqlite3.Error as exc:
+        st.error(f"❌ Database read failed: {exc}")
 
 if df is not None and not df.empty:
-    st.metric("Latest Signal", df.iloc[0]['symbol'], df.iloc[0]['signal_type'])
+    st.metric("Latest Signal", latest['symbol'], latest['signal_type'])
+    st.caption(f"{total} signals")
     st.dataframe(df, use_container_width=True)
+
+    try:
+        render_chart(source)
+    except sqlite3.Error as exc:
+        st.error(f"❌ Chart read failed: {exc}")
+
+    st.subheader("Performance by strategy and symbol")
+    try:
+        analytics = pd.DataFrame(source.analytics())
+    except sqlite3.Error as exc:
+        st.error(f"❌ Analytics read failed: {exc}")
+    else:
+        if analytics.empty:
+            st.info("No realized outcomes yet.")
+        else:
+            st.dataframe(
+                analytics[
+                    [
+                        "strategy_id", "symbol", "resolved", "hit_rate",
+                        "expectancy_r", "avg_hours_to_outcome", "ambiguous_rate",
+                        "expired",
+                    ]
+                ],
+                use_container_width=True,
+            )
 else:
     # Prevents blank screen
     st.warning("📡 **Connecting to Nexus Grid...**")
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+"""Reads of the incrementally maintained ``signal_analytics`` aggregates.
+
+The handler updates the daily rows whenever a signal first realizes an
+outcome; this module rolls them up into hit rate, expectancy, average time
+to outcome and ambiguous rate. ``python -m db.analytics rebuild`` recomputes
+the table from ``signals`` for backfills and after manual data repairs.
+"""
+
+import argparse
+import sqlite3
+from typing import Any, Sequence
+
+GROUP_COLUMNS = ("strategy_id", "symbol", "timeframe", "day")
+
+
+def query_signal_analytics(
+    conn: sqlite3.Connection,
+    *,
+    group_by: Sequence[str] = ("strategy_id", "symbol"),
+    since_day: str | None = None,
+) -> list[dict[str, Any]]:
+    unknown = set(group_by) - set(GROUP_COLUMNS)
+    if unknown:
+        raise ValueError(f"Cannot group analytics by: {', '.join(sorted(unknown))}")
+    columns = ", ".join(group_by)
+    select = f"{columns}, " if group_by else ""
+    grouping = f"GROUP BY {columns} ORDER BY {columns}" if group_by else ""
+    rows = conn.execute(
+        f"""
+        SELECT {select}
+            SUM(resolved) AS resolved,
+            SUM(take_profit) AS take_profit,
+            SUM(stop_loss) AS stop_loss,
+            SUM(ambiguous) AS ambiguous,
+            SUM(expired) AS expired,
+            SUM(sum_r) AS sum_r,
+            SUM(sum_return) AS sum_return,
+            SUM(sum_seconds_to_outcome) AS sum_seconds_to_outcome
+        FROM signal_analytics
+        WHERE day >= ?
+        {grouping}
+        """,
+        (since_day or "",),
+    ).fetchall()
+
+    summaries = []
+    for row in rows:
+        summary = dict(row)
+        if not summary["resolved"]:
+            continue
+        decided = summary["take_profit"] + summary["stop_loss"]
+        summary["hit_rate"] = summary["take_profit"] / decided if decided else None
+        summary["expectancy_r"] = summary["sum_r"] / decided if decided else None
+        summary["avg_return"] = summary["sum_return"] / decided if decided else None
+        summary["avg_hours_to_outcome"] = (
+            summary["sum_seconds_to_outcome"] / summary["resolved"] / 3600
+        )
+        summary["ambiguous_rate"] = summary["ambiguous"] / summary["resolved"]
+        summaries.append(summary)
+    return summaries
+
+
+def main(argv: list[str] | None = None) -> None:
+    from config import CONFIG
+    from db.db_handler import TradingDatabaseHandler
+
+    parser = argparse.ArgumentParser(description="Maintain signal outcome analytics.")
+    parser.add_argument("command", choices=("rebuild", "show"))
+    parser.add_argument("--db", default=str(CONFIG.db_path))
+    parser.add_argument(
+        "--group-by",
+        default="strategy_id,symbol",
+        help=f"Comma-separated subset of {', '.join(GROUP_COLUMNS)}",
+    )
+    parser.add_argument("--since", help="First outcome day, YYYY-MM-DD")
+    args = parser.parse_args(argv)
+
+    db = TradingDatabaseHandler(args.db)
+    if args.command == "rebuild":
+        groups = db.rebuild_signal_analytics()
+        print(f"✅ Rebuilt signal analytics: groups={groups}")
+        return
+
+    group_by = tuple(column.strip() for column in args.group_by.split(",") if column.strip())
+    for summary in db.get_signal_analytics(group_by=group_by, since_day=args.since):
+        label = " ".join(str(summary[column]) for column in group_by) or "all"
+        hit_rate = summary["hit_rate"]
+        expectancy = summary["expectancy_r"]
+        print(
+            f"ℹ️ {label}: resolved={summary['resolved']}, "
+            f"hit_rate={'n/a' if hit_rate is None else f'{hit_rate:.3f}'}, "
+            f"expectancy_r={'n/a' if expectancy is None else f'{expectancy:.3f}'}, "
+            f"avg_hours_to_outcome={summary['avg_hours_to_outcome']:.1f}, "
+            f"ambiguous_rate={summary['ambiguous_rate']:.3f}, "
+            f"expired={summary['expired']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
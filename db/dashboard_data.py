@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+"""Read-only, shared data layer for the dashboard.
+
+One ``DashboardDataSource`` per process serves every viewer. It holds a
+single read-only connection and keeps the newest signals in memory. On a
+read it checks, at most once per ``poll_seconds``, whether the database
+changed: ``PRAGMA data_version`` catches commits by other connections and
+the file's inode/mtime/size catch the file being replaced (a ``git pull``
+of trading.db). Only then does it query, and only for rows with ``id`` above
+the last one seen plus the cached rows that were still open, since outcomes
+update those in place. Older pages are read in primary-key order and
+cached until the next change.
+
+No writes happen here; writes stay with ``TradingDatabaseHandler``.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Sequence
+
+from db.analytics import query_signal_analytics
+
+if TYPE_CHECKING:
+    from adapters.market_data import CandleArray
+
+OPEN_STATUS = "ACTIVE"
+MAX_CACHED_READS = 64
+
+
+class DashboardDataSource:
+    def __init__(
+        self,
+        db_path: str | Path,
+        *,
+        window: int = 1_000,
+        poll_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.db_path = Path(db_path)
+        self.window = window
+        self.poll_seconds = poll_seconds
+        self.clock = clock
+        self.queries = 0
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._file_identity: tuple[int, int, int] | None = None
+        self._data_version: int | None = None
+        self._checked_at = -float("inf")
+        self._recent: dict[int, dict[str, Any]] = {}
+        self._newest_first: list[int] = []
+        self._last_id = 0
+        self._total = 0
+        self._pages: dict[tuple, list[dict[str, Any]]] = {}
+
+    def available(self) -> bool:
+        return self.db_path.exists()
+
+    def recent_signals(self, limit: int = 50) -> list[dict[str, Any]]:
+        return self.signals_page(0, page_size=limit)
+
+    def signals_page(self, page: int, *, page_size: int = 50) -> list[dict[str, Any]]:
+        """Newest-first page of signals; page 0 is the most recent."""
+        if page < 0 or page_size < 1:
+            raise ValueError("page must be at least 0 and page_size at least 1")
+        with self._lock:
+            self._refresh()
+            start = page * page_size
+            if start + page_size <= self.window:
+                ids = self._newest_first[start : start + page_size]
+                return [self._recent[row_id] for row_id in ids]
+            key = (page, page_size)
+            if key not in self._pages:
+                self._pages[key] = self._query(
+                    """
+                    SELECT *
+                    FROM signals
+                    ORDER BY id DESC
+                    LIMIT ? OFFSET ?
+                    """,
+                    (page_size, start),
+                )
+            return self._pages[key]
+
+    def analytics(
+        self, group_by: Sequence[str] = ("strategy_id", "symbol")
+    ) -> list[dict[str, Any]]:
+        """Outcome aggregates; reads O(groups) rows, cached until the next change."""
+        with self._lock:
+            self._refresh()
+            key = ("analytics", tuple(group_by))
+            if key not in self._pages:
+                self.queries += 1
+                self._pages[key] = query_signal_analytics(self._conn, group_by=group_by)
+            return self._pages[key]
+
+    def candle_span(
+        self, *, exchange: str, symbol: str, timeframe: str
+    ) -> tuple[int, int] | None:
+        """First and last stored candle open times, or None without candles."""
+        rows = self._cached(
+            ("span", exchange, symbol, timeframe),
+            """
+            SELECT MIN(timestamp_ms) AS first_ms, MAX(timestamp_ms) AS last_ms
+            FROM candles
+            WHERE exchange = ? AND symbol = ? AND timeframe = ?
+            """,
+            (exchange, symbol, timeframe),
+        )
+        if rows[0]["first_ms"] is None:
+            return None
+        return int(rows[0]["first_ms"]), int(rows[0]["last_ms"])
+
+    def candles(
+        self,
+        *,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start_ms: int,
+        end_ms: int,
+    ) -> "CandleArray":
+        from adapters.market_data import CandleArray
+
+        rows = self._cached(
+            ("candles", exchange, symbol, timeframe, start_ms, end_ms),
+            """
+            SELECT timestamp_ms, open, high, low, close, volume
+            FROM candles
+            WHERE exchange = ?
+              AND symbol = ?
+              AND timeframe = ?
+              AND timestamp_ms BETWEEN ? AND ?
+            ORDER BY timestamp_ms ASC
+            """,
+            (exchange, symbol, timeframe, start_ms, end_ms),
+        )
+        return CandleArray.from_rows(
+            tuple(row[name] for name in CandleArray.FIELDS) for row in rows
+        )
+
+    def chart_signals(
+        self, *, symbol: str, timeframe: str, start_ms: int, end_ms: int
+    ) -> list[dict[str, Any]]:
+        return self._cached(
+            ("chart_signals", symbol, timeframe, start_ms, end_ms),
+            """
+            SELECT id, strategy_id, signal_type, candle_timestamp_ms, entry, sl, tp,
+                   status, outcome, outcome_price, outcome_at, expires_at
+            FROM signals
+            WHERE symbol = ?
+              AND timeframe = ?
+              AND candle_timestamp_ms BETWEEN ? AND ?
+            ORDER BY candle_timestamp_ms ASC
+            """,
+            (symbol, timeframe, start_ms, end_ms),
+        )
+
+    def total_signals(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self._total
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # mode=ro never creates, locks for writing or journals the file.
+        conn = sqlite3.connect(
+            f"{self.db_path.resolve().as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _cached(self, key: tuple, sql: str, params: tuple) -> list[dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            if key not in self._pages:
+                if len(self._pages) >= MAX_CACHED_READS:
+                    self._pages.clear()
+                self._pages[key] = self._query(sql, params)
+            return self._pages[key]
+
+    def _query(self, sql: str, params: tuple = ()) -> list[dict[str, Any]]:
+        self.queries += 1
+        return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def _refresh(self) -> None:
+        now = self.clock()
+        if now - self._checked_at < self.poll_seconds and self._conn is not None:
+            return
+        self._checked_at = now
+
+        stat = os.stat(self.db_path)
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if identity[0] != (self._file_identity or (None,))[0] or self._conn is None:
+            # A replaced file is a different database: start over.
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = self._connect()
+            self._data_version = None
+            self._recent.clear()
+            self._newest_first = []
+            self._last_id = 0
+
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if identity == self._file_identity and data_version == self._data_version:
+            return
+
+        self._load_changes()
+        self._file_identity = identity
+        self._data_version = data_version
+
+    def _load_changes(self) -> None:
+        open_ids = [
+            row_id for row_id, row in self._recent.items() if row["status"] == OPEN_STATUS
+        ]
+        if self._last_id == 0:
+            rows = self._query(
+                "SELECT * FROM signals ORDER BY id DESC LIMIT ?", (self.window,)
+            )
+        else:
+            rows = self._query(
+                """
+                SELECT *
+                FROM signals
+                WHERE id > ?
+                   OR id IN (SELECT value FROM json_each(?))
+                """,
+                (self._last_id, json.dumps(open_ids)),
+            )
+        for row in rows:
+            self._recent[row["id"]] = row
+        newest_first = sorted(self._recent, reverse=True)
+        for row_id in newest_first[self.window :]:
+            del self._recent[row_id]
+        self._newest_first = newest_first[: self.window]
+        self._last_id = self._newest_first[0] if self._newest_first else 0
+        self._total = self._query("SELECT COUNT(*) AS total FROM signals")[0]["total"]
+        self._pages.clear()
@@ -9,11 +9,73 @@ import hashlib
 import sqlite3
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Mapping, Sequence
+
+from db.analytics import query_signal_analytics
+
+if TYPE_CHECKING:
+    from adapters.market_data import Candle, CandleArray
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 DEFAULT_DB_PATH = ROOT_DIR / "data" / "trading.db"
 
+# Outcomes that never went through PENDING are filters, not results.
+UNREALIZED_OUTCOMES = ("PENDING", "REJECTED_RISK", "REJECTED_META", "REJECTED_DATA")
+
+
+def _analytics_upsert(*, outcome: str, price: str, at: str, where: str) -> str:
+    """Add the realized outcomes of the signals matching ``where``.
+
+    ``outcome``, ``price`` and ``at`` are SQL expressions: bound parameters
+    for an outcome being written now, or the signals columns for a rebuild.
+    R is the move to the outcome price in units of the initial stop distance.
+    """
+    move = f"""
+        CASE WHEN signal_type = 'LONG' THEN {price} - entry ELSE entry - {price} END
+    """
+    return f"""
+        INSERT INTO signal_analytics (
+            strategy_id, symbol, timeframe, day, resolved,
+            take_profit, stop_loss, ambiguous, expired,
+            sum_r, sum_return, sum_seconds_to_outcome, updated_at
+        )
+        SELECT
+            strategy_id,
+            symbol,
+            timeframe,
+            substr({at}, 1, 10),
+            COUNT(*),
+            SUM({outcome} = 'TAKE_PROFIT'),
+            SUM({outcome} = 'STOP_LOSS'),
+            SUM({outcome} = 'AMBIGUOUS'),
+            SUM({outcome} = 'EXPIRED'),
+            COALESCE(SUM(
+                CASE WHEN {price} IS NULL OR entry = sl THEN 0
+                     ELSE ({move}) / ABS(entry - sl) END
+            ), 0),
+            COALESCE(SUM(
+                CASE WHEN {price} IS NULL OR entry = 0 THEN 0
+                     ELSE ({move}) / entry END
+            ), 0),
+            COALESCE(SUM(
+                MAX(0, (julianday({at}) - julianday(created_at)) * 86400)
+            ), 0),
+            :updated_at
+        FROM signals
+        WHERE {where}
+        GROUP BY strategy_id, symbol, timeframe, substr({at}, 1, 10)
+        ON CONFLICT(strategy_id, symbol, timeframe, day) DO UPDATE SET
+            resolved = resolved + excluded.resolved,
+            take_profit = take_profit + excluded.take_profit,
+            stop_loss = stop_loss + excluded.stop_loss,
+            ambiguous = ambiguous + excluded.ambiguous,
+            expired = expired + excluded.expired,
+            sum_r = sum_r + excluded.sum_r,
+            sum_return = sum_return + excluded.sum_return,
+            sum_seconds_to_outcome = sum_seconds_to_outcome + excluded.sum_seconds_to_outcome,
+            updated_at = excluded.updated_at
+    """
+
 
 class TradingDatabaseHandler:
     """Owns SQLite connection, schema initialization, migrations and writes."""
@@ -50,6 +112,13 @@ class TradingDatabaseHandler:
             raise RuntimeError(f"Canonical schema is empty: {schema_path}")
 
         with self._get_connection() as conn:
+            analytics_existed = conn.execute(
+                """
+                SELECT 1 FROM sqlite_master
+                WHERE type = 'table' AND name = 'signal_analytics'
+                """
+            ).fetchone()
+
             # The first statement is the canonical table definition. Existing
             # databases keep their rows and are upgraded by the migration layer.
             conn.execute(schema_statements[0])
@@ -66,6 +135,10 @@ class TradingDatabaseHandler:
             # invariant for all newly generated signals.
             self._ensure_signal_key_uniqueness(conn)
 
+            # Databases that predate the aggregates are backfilled once.
+            if not analytics_existed:
+                self._rebuild_signal_analytics(conn)
+
     @staticmethod
     def _migrate_legacy_columns(conn: sqlite3.Connection) -> None:
         columns = {
@@ -266,6 +339,48 @@ class TradingDatabaseHandler:
                 """
             ).fetchall()
 
+    def get_symbol_activity(
+        self, *, exchange: str, timeframe: str
+    ) -> dict[str, tuple[float, int]]:
+        """Return ``symbol -> (latest quote volume, open signal count)``.
+
+        The quote volume is ``close * volume`` of the newest stored candle.
+        """
+        with self._get_connection() as conn:
+            volumes = conn.execute(
+                """
+                SELECT c.symbol, c.close * c.volume AS quote_volume
+                FROM candles AS c
+                JOIN (
+                    SELECT symbol, MAX(timestamp_ms) AS timestamp_ms
+                    FROM candles
+                    WHERE exchange = ? AND timeframe = ?
+                    GROUP BY symbol
+                ) AS latest
+                  ON latest.symbol = c.symbol
+                 AND latest.timestamp_ms = c.timestamp_ms
+                WHERE c.exchange = ? AND c.timeframe = ?
+                """,
+                (exchange, timeframe, exchange, timeframe),
+            ).fetchall()
+            open_counts = conn.execute(
+                """
+                SELECT symbol, COUNT(*) AS open_signals
+                FROM signals
+                WHERE status = 'ACTIVE'
+                  AND outcome = 'PENDING'
+                  AND timeframe = ?
+                GROUP BY symbol
+                """,
+                (timeframe,),
+            ).fetchall()
+
+        activity = {row["symbol"]: (float(row["quote_volume"]), 0) for row in volumes}
+        for row in open_counts:
+            quote_volume, _ = activity.get(row["symbol"], (0.0, 0))
+            activity[row["symbol"]] = (quote_volume, int(row["open_signals"]))
+        return activity
+
     def mark_signal_outcome(
         self,
         signal_id: int,
@@ -276,6 +391,37 @@ class TradingDatabaseHandler:
         status: str,
     ) -> None:
         with self._get_connection() as conn:
+            # Log and aggregate only the first outcome of a signal so consumers
+            # never double count a re-marked row; a rejection is logged but,
+            # as in a rebuild, never counted as resolved.
+            if outcome not in UNREALIZED_OUTCOMES:
+                conn.execute(
+                    _analytics_upsert(
+                        outcome=":outcome",
+                        price=":outcome_price",
+                        at=":outcome_at",
+                        where="id = :signal_id AND outcome = 'PENDING'",
+                    ),
+                    {
+                        "outcome": outcome,
+                        "outcome_price": outcome_price,
+                        "outcome_at": outcome_at,
+                        "signal_id": signal_id,
+                        "updated_at": datetime.now(timezone.utc).isoformat(),
+                    },
+                )
+            conn.execute(
+                """
+                INSERT INTO signal_outcome_events (
+                    signal_id, strategy_id, symbol, timeframe, outcome, recorded_at
+                )
+                SELECT id, strategy_id, symbol, timeframe, ?, ?
+                FROM signals
+                WHERE id = ?
+                  AND outcome = 'PENDING'
+                """,
+                (outcome, outcome_at, signal_id),
+            )
             conn.execute(
                 """
                 UPDATE signals
@@ -288,9 +434,249 @@ class TradingDatabaseHandler:
                 (outcome, outcome_price, outcome_at, status, signal_id),
             )
 
+    def get_outcome_events(
+        self, *, after_id: int, limit: int = 1000
+    ) -> list[sqlite3.Row]:
+        with self._get_connection() as conn:
+            return conn.execute(
+                """
+                SELECT *
+                FROM signal_outcome_events
+                WHERE id > ?
+                ORDER BY id ASC
+                LIMIT ?
+                """,
+                (after_id, limit),
+            ).fetchall()
+
+    def load_component_states(self, component: str) -> dict[str, bytes]:
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT state_key, payload
+                FROM component_state
+                WHERE component = ?
+                """,
+                (component,),
+            ).fetchall()
+            return {row["state_key"]: bytes(row["payload"]) for row in rows}
+
+    def save_component_states(
+        self, component: str, states: Mapping[str, bytes]
+    ) -> None:
+        """Upsert several state blobs for one component in a single transaction."""
+        if not states:
+            return
+        updated_at = datetime.now(timezone.utc).isoformat()
+        with self._get_connection() as conn:
+            conn.executemany(
+                """
+                INSERT INTO component_state (component, state_key, payload, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(component, state_key) DO UPDATE SET
+                    payload = excluded.payload,
+                    updated_at = excluded.updated_at
+                """,
+                [
+                    (component, key, sqlite3.Binary(payload), updated_at)
+                    for key, payload in states.items()
+                ],
+            )
+
+    def update_component_states(
+        self,
+        component: str,
+        update: Callable[[dict[str, bytes]], Mapping[str, bytes]],
+    ) -> None:
+        """Read, change and upsert one component's state blobs atomically.
+
+        ``update`` receives every stored blob and returns the ones to write.
+        The read and the write share one IMMEDIATE transaction, so concurrent
+        workers apply their updates one after another instead of overwriting
+        each other's.
+        """
+        conn = self._get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                """
+                SELECT state_key, payload
+                FROM component_state
+                WHERE component = ?
+                """,
+                (component,),
+            ).fetchall()
+            states = update({row["state_key"]: bytes(row["payload"]) for row in rows})
+            updated_at = datetime.now(timezone.utc).isoformat()
+            conn.executemany(
+                """
+                INSERT INTO component_state (component, state_key, payload, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(component, state_key) DO UPDATE SET
+                    payload = excluded.payload,
+                    updated_at = excluded.updated_at
+                """,
+                [
+                    (component, key, sqlite3.Binary(payload), updated_at)
+                    for key, payload in states.items()
+                ],
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def store_candles(
+        self,
+        *,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        candles: Sequence["Candle"],
+    ) -> int:
+        """Persist closed candles once; return the number of new rows."""
+        with self._get_connection() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                """
+                INSERT INTO candles (
+                    exchange, symbol, timeframe, timestamp_ms,
+                    open, high, low, close, volume
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(exchange, symbol, timeframe, timestamp_ms) DO NOTHING
+                """,
+                [
+                    (
+                        exchange,
+                        symbol,
+                        timeframe,
+                        candle.timestamp_ms,
+                        candle.open,
+                        candle.high,
+                        candle.low,
+                        candle.close,
+                        candle.volume,
+                    )
+                    for candle in candles
+                ],
+            )
+            return conn.total_changes - before
+
+    def get_candle_array(
+        self,
+        *,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start_ms: int | None = None,
+        end_ms: int | None = None,
+    ) -> "CandleArray":
+        from adapters.market_data import CandleArray
+
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT timestamp_ms, open, high, low, close, volume
+                FROM candles
+                WHERE exchange = ?
+                  AND symbol = ?
+                  AND timeframe = ?
+                  AND timestamp_ms >= ?
+                  AND timestamp_ms <= ?
+                ORDER BY timestamp_ms ASC
+                """,
+                (
+                    exchange,
+                    symbol,
+                    timeframe,
+                    start_ms if start_ms is not None else -(2**63),
+                    end_ms if end_ms is not None else 2**63 - 1,
+                ),
+            ).fetchall()
+        return CandleArray.from_rows(tuple(row) for row in rows)
+
+    def record_backtest_run(
+        self,
+        *,
+        run_id: str,
+        strategy_id: str,
+        timeframe: str,
+        config_json: str,
+        summary_json: str | None = None,
+    ) -> None:
+        with self._get_connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO backtest_runs (
+                    run_id, created_at, strategy_id, timeframe,
+                    config_json, summary_json
+                )
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(run_id) DO UPDATE SET
+                    summary_json = excluded.summary_json
+                """,
+                (
+                    run_id,
+                    datetime.now(timezone.utc).isoformat(),
+                    strategy_id,
+                    timeframe,
+                    config_json,
+                    summary_json,
+                ),
+            )
+
+    def insert_backtest_results(
+        self, run_id: str, rows: Iterable[Mapping[str, Any]]
+    ) -> int:
+        columns = [
+            "symbol",
+            "candle_timestamp_ms",
+            "signal_type",
+            "entry",
+            "sl",
+            "tp",
+            "confidence",
+            "pred_move",
+            "status",
+            "outcome",
+            "outcome_price",
+            "outcome_timestamp_ms",
+            "risk_amount_usdt",
+            "position_size",
+        ]
+        placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+        with self._get_connection() as conn:
+            cursor = conn.executemany(
+                f"""
+                INSERT OR REPLACE INTO backtest_results (run_id, {", ".join(columns)})
+                VALUES ({placeholders})
+                """,
+                [
+                    (run_id, *(row.get(column) for column in columns))
+                    for row in rows
+                ],
+            )
+            return int(cursor.rowcount)
+
     def expire_due_signals(self, now: datetime) -> int:
         now_iso = now.astimezone(timezone.utc).isoformat()
         with self._get_connection() as conn:
+            conn.execute(
+                _analytics_upsert(
+                    outcome="'EXPIRED'",
+                    price="NULL",
+                    at=":now",
+                    where="""
+                        status = 'ACTIVE'
+                        AND outcome = 'PENDING'
+                        AND expires_at <= :now
+                    """,
+                ),
+                {"now": now_iso, "updated_at": now_iso},
+            )
             cursor = conn.execute(
                 """
                 UPDATE signals
@@ -305,6 +691,39 @@ class TradingDatabaseHandler:
             )
             return int(cursor.rowcount)
 
+    def rebuild_signal_analytics(self) -> int:
+        """Recompute every aggregate from signals; return the group count."""
+        with self._get_connection() as conn:
+            return self._rebuild_signal_analytics(conn)
+
+    @staticmethod
+    def _rebuild_signal_analytics(conn: sqlite3.Connection) -> int:
+        conn.execute("DELETE FROM signal_analytics")
+        unrealized = ", ".join(f"'{outcome}'" for outcome in UNREALIZED_OUTCOMES)
+        conn.execute(
+            _analytics_upsert(
+                outcome="outcome",
+                price="outcome_price",
+                at="outcome_at",
+                where=f"outcome NOT IN ({unrealized}) AND outcome_at IS NOT NULL",
+            ),
+            {"updated_at": datetime.now(timezone.utc).isoformat()},
+        )
+        return conn.execute("SELECT COUNT(*) FROM signal_analytics").fetchone()[0]
+
+    def get_signal_analytics(
+        self,
+        *,
+        group_by: Sequence[str] = ("strategy_id", "symbol"),
+        since_day: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Aggregate the daily rows by ``group_by`` and derive rates.
+
+        ``hit_rate`` and ``expectancy_r`` cover trades that reached TP or SL.
+        """
+        with self._get_connection() as conn:
+            return query_signal_analytics(conn, group_by=group_by, since_day=since_day)
+
     def get_latest_signal_status(
         self, symbol: str, strategy_id: str = "baseline_ml_v1"
     ) -> dict[str, Any] | None:
@@ -321,3 +740,284 @@ class TradingDatabaseHandler:
                 (symbol, strategy_id),
             ).fetchone()
             return dict(row) if row else None
+
+    def insert_cycle_metrics(
+        self,
+        *,
+        process: str,
+        started_at: str,
+        duration_seconds: float,
+        metrics_json: str,
+    ) -> int:
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO cycle_metrics (
+                    process, started_at, duration_seconds, metrics_json
+                )
+                VALUES (?, ?, ?, ?)
+                """,
+                (process, started_at, duration_seconds, metrics_json),
+            )
+            return int(cursor.lastrowid)
+
+    def get_cycle_metrics(self, *, process: str, limit: int = 100) -> list[sqlite3.Row]:
+        """Newest cycle records of one process first."""
+        with self._get_connection() as conn:
+            return conn.execute(
+                """
+                SELECT *
+                FROM cycle_metrics
+                WHERE process = ?
+                ORDER BY started_at DESC
+                LIMIT ?
+                """,
+                (process, limit),
+            ).fetchall()
+
+    def insert_paper_fills(self, fills: Iterable[Sequence[Any]]) -> int:
+        """Append simulator fills in one transaction.
+
+        Rows are ``(order_id, symbol, side, quantity, price, slippage_bps,
+        latency_ms, filled_at_ms)``.
+        """
+        with self._get_connection() as conn:
+            cursor = conn.executemany(
+                """
+                INSERT INTO paper_fills (
+                    order_id, symbol, side, quantity, price,
+                    slippage_bps, latency_ms, filled_at_ms
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                fills,
+            )
+            return int(cursor.rowcount)
+
+    def get_paper_fills(self, order_id: str) -> list[sqlite3.Row]:
+        with self._get_connection() as conn:
+            return conn.execute(
+                """
+                SELECT *
+                FROM paper_fills
+                WHERE order_id = ?
+                ORDER BY id ASC
+                """,
+                (order_id,),
+            ).fetchall()
+
+    def enqueue_cycle_tasks(
+        self,
+        *,
+        timeframe: str,
+        candle_timestamp_ms: int,
+        symbols: Sequence[str],
+    ) -> int:
+        """Create the cycle's tasks once; any worker may call this.
+
+        Tasks of earlier candles are dropped, since their cycles are over.
+        """
+        updated_at = datetime.now(timezone.utc).isoformat()
+        with self._get_connection() as conn:
+            conn.execute(
+                """
+                DELETE FROM cycle_tasks
+                WHERE timeframe = ?
+                  AND candle_timestamp_ms < ?
+                """,
+                (timeframe, candle_timestamp_ms),
+            )
+            cursor = conn.executemany(
+                """
+                INSERT OR IGNORE INTO cycle_tasks (
+                    task_key, symbol, timeframe, candle_timestamp_ms, updated_at
+                )
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        f"{symbol}|{timeframe}|{candle_timestamp_ms}",
+                        symbol,
+                        timeframe,
+                        candle_timestamp_ms,
+                        updated_at,
+                    )
+                    for symbol in symbols
+                ],
+            )
+            return int(cursor.rowcount)
+
+    def claim_cycle_tasks(
+        self,
+        *,
+        timeframe: str,
+        candle_timestamp_ms: int,
+        worker_id: str,
+        lease_ms: int,
+        now_ms: int,
+        symbol_order: Sequence[str] = (),
+        limit: int = 1,
+        max_attempts: int = 3,
+    ) -> list[sqlite3.Row]:
+        """Lease up to ``limit`` pending or abandoned tasks to ``worker_id``.
+
+        ``symbol_order`` ranks candidates; unranked symbols come last. The
+        read and the lease update share one IMMEDIATE transaction, so two
+        workers can never lease the same task at the same time.
+        """
+        rank = {symbol: position for position, symbol in enumerate(symbol_order)}
+        conn = self._get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            candidates = conn.execute(
+                """
+                SELECT task_key, symbol
+                FROM cycle_tasks
+                WHERE timeframe = ?
+                  AND candle_timestamp_ms = ?
+                  AND attempts < ?
+                  AND (
+                      (status = 'PENDING' AND available_at_ms <= ?)
+                      OR (status = 'LEASED' AND lease_expires_at_ms <= ?)
+                  )
+                """,
+                (timeframe, candle_timestamp_ms, max_attempts, now_ms, now_ms),
+            ).fetchall()
+            chosen = sorted(
+                candidates,
+                key=lambda row: (rank.get(row["symbol"], len(rank)), row["task_key"]),
+            )[:limit]
+            keys = [row["task_key"] for row in chosen]
+            conn.executemany(
+                """
+                UPDATE cycle_tasks
+                SET status = 'LEASED',
+                    lease_owner = ?,
+                    lease_expires_at_ms = ?,
+                    attempts = attempts + 1,
+                    updated_at = ?
+                WHERE task_key = ?
+                """,
+                [
+                    (
+                        worker_id,
+                        now_ms + lease_ms,
+                        datetime.now(timezone.utc).isoformat(),
+                        key,
+                    )
+                    for key in keys
+                ],
+            )
+            claimed = [
+                conn.execute(
+                    "SELECT * FROM cycle_tasks WHERE task_key = ?", (key,)
+                ).fetchone()
+                for key in keys
+            ]
+            conn.commit()
+            return claimed
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def renew_cycle_leases(
+        self, *, worker_id: str, lease_ms: int, now_ms: int
+    ) -> int:
+        """Heartbeat: extend every lease still held by ``worker_id``."""
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE cycle_tasks
+                SET lease_expires_at_ms = ?,
+                    updated_at = ?
+                WHERE lease_owner = ?
+                  AND status = 'LEASED'
+                  AND lease_expires_at_ms > ?
+                """,
+                (
+                    now_ms + lease_ms,
+                    datetime.now(timezone.utc).isoformat(),
+                    worker_id,
+                    now_ms,
+                ),
+            )
+            return int(cursor.rowcount)
+
+    def finish_cycle_task(
+        self,
+        task_key: str,
+        *,
+        worker_id: str,
+        error: str | None = None,
+        retry_at_ms: int = 0,
+        max_attempts: int = 3,
+    ) -> bool:
+        """Mark a leased task DONE, or release it for a retry after ``error``.
+
+        A task that failed ``max_attempts`` times becomes FAILED. Returns
+        False when the lease was lost to another worker meanwhile.
+        """
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE cycle_tasks
+                SET status = CASE
+                        WHEN ? IS NULL THEN 'DONE'
+                        WHEN attempts >= ? THEN 'FAILED'
+                        ELSE 'PENDING'
+                    END,
+                    lease_owner = NULL,
+                    lease_expires_at_ms = NULL,
+                    available_at_ms = ?,
+                    last_error = ?,
+                    updated_at = ?
+                WHERE task_key = ?
+                  AND lease_owner = ?
+                  AND status = 'LEASED'
+                """,
+                (
+                    error,
+                    max_attempts,
+                    retry_at_ms,
+                    error,
+                    datetime.now(timezone.utc).isoformat(),
+                    task_key,
+                    worker_id,
+                ),
+            )
+            return cursor.rowcount == 1
+
+    def get_cycle_exposure(
+        self, *, timeframe: str, candle_timestamp_ms: int
+    ) -> list[sqlite3.Row]:
+        """ACTIVE, sized signals already persisted for one cycle candle."""
+        with self._get_connection() as conn:
+            return conn.execute(
+                """
+                SELECT symbol, signal_type, risk_amount_usdt
+                FROM signals
+                WHERE timeframe = ?
+                  AND candle_timestamp_ms = ?
+                  AND status = 'ACTIVE'
+                  AND risk_amount_usdt IS NOT NULL
+                """,
+                (timeframe, candle_timestamp_ms),
+            ).fetchall()
+
+    def get_cycle_task_counts(
+        self, *, timeframe: str, candle_timestamp_ms: int
+    ) -> dict[str, int]:
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT status, COUNT(*) AS tasks
+                FROM cycle_tasks
+                WHERE timeframe = ?
+                  AND candle_timestamp_ms = ?
+                GROUP BY status
+                """,
+                (timeframe, candle_timestamp_ms),
+            ).fetchall()
+            return {row["status"]: int(row["tasks"]) for row in rows}
@@ -43,3 +43,139 @@ CREATE INDEX IF NOT EXISTS idx_signals_created
 
 CREATE UNIQUE INDEX IF NOT EXISTS uq_signals_signal_key
     ON signals(signal_key);
+
+-- Append-only log of realized outcomes, written in the same transaction as
+-- the signal update. Consumers (drift monitoring) track their own cursor.
+CREATE TABLE IF NOT EXISTS signal_outcome_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    signal_id INTEGER NOT NULL,
+    strategy_id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    recorded_at TEXT NOT NULL
+);
+
+-- Opaque serialized state for components that must survive between the
+-- hourly processes (drift detectors, fitted baseline models, ...).
+CREATE TABLE IF NOT EXISTS component_state (
+    component TEXT NOT NULL,
+    state_key TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (component, state_key)
+);
+
+-- Closed candles seen by the live cycle. Research and backtests read from
+-- here; rows are immutable once closed, so inserts ignore duplicates.
+CREATE TABLE IF NOT EXISTS candles (
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    timestamp_ms INTEGER NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    volume REAL NOT NULL,
+    PRIMARY KEY (exchange, symbol, timeframe, timestamp_ms)
+) WITHOUT ROWID;
+
+-- Historical replays are kept apart from live signals.
+CREATE TABLE IF NOT EXISTS backtest_runs (
+    run_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    strategy_id TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    config_json TEXT NOT NULL,
+    summary_json TEXT
+);
+
+CREATE TABLE IF NOT EXISTS backtest_results (
+    run_id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    candle_timestamp_ms INTEGER NOT NULL,
+    signal_type TEXT NOT NULL,
+    entry REAL NOT NULL,
+    sl REAL NOT NULL,
+    tp REAL NOT NULL,
+    confidence REAL NOT NULL,
+    pred_move REAL NOT NULL,
+    status TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    outcome_price REAL,
+    outcome_timestamp_ms INTEGER,
+    risk_amount_usdt REAL,
+    position_size REAL,
+    PRIMARY KEY (run_id, symbol, candle_timestamp_ms)
+);
+
+-- Lease-based work queue that lets several workers share one cycle. A task
+-- is one (symbol, timeframe, candle); an expired lease makes it claimable
+-- again. signal_key uniqueness still guarantees one signal per candle even
+-- if two workers process the same task.
+CREATE TABLE IF NOT EXISTS cycle_tasks (
+    task_key TEXT PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    candle_timestamp_ms INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'PENDING',
+    lease_owner TEXT,
+    lease_expires_at_ms INTEGER,
+    available_at_ms INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    updated_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_cycle_tasks_claim
+ON cycle_tasks(timeframe, candle_timestamp_ms, status);
+
+-- Fills of the paper execution simulator, kept apart from live signals.
+CREATE TABLE IF NOT EXISTS paper_fills (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    quantity REAL NOT NULL,
+    price REAL NOT NULL,
+    slippage_bps REAL NOT NULL,
+    latency_ms REAL NOT NULL,
+    filled_at_ms INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_paper_fills_order
+ON paper_fills(order_id);
+
+-- Running outcome aggregates per (strategy, symbol, timeframe, outcome day),
+-- maintained in the same transaction as each first realized outcome so
+-- reports read O(groups) rows. Rebuildable from signals at any time.
+CREATE TABLE IF NOT EXISTS signal_analytics (
+    strategy_id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    day TEXT NOT NULL,
+    resolved INTEGER NOT NULL DEFAULT 0,
+    take_profit INTEGER NOT NULL DEFAULT 0,
+    stop_loss INTEGER NOT NULL DEFAULT 0,
+    ambiguous INTEGER NOT NULL DEFAULT 0,
+    expired INTEGER NOT NULL DEFAULT 0,
+    sum_r REAL NOT NULL DEFAULT 0,
+    sum_return REAL NOT NULL DEFAULT 0,
+    sum_seconds_to_outcome REAL NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (strategy_id, symbol, timeframe, day)
+) WITHOUT ROWID;
+
+-- One instrumentation record per trainer or monitor cycle: stage timings,
+-- counters and histograms as JSON, for per-stage latency over time.
+CREATE TABLE IF NOT EXISTS cycle_metrics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    process TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    duration_seconds REAL NOT NULL,
+    metrics_json TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_cycle_metrics_process
+ON cycle_metrics(process, started_at);
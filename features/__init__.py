@@ -0,0 +1 @@
+"""Feature engineering shared by ProfitForge models."""
@@ -0,0 +1,437 @@
+from __future__ import annotations
+
+"""Streaming technical indicators with O(1) state per closed candle.
+
+Every indicator has two paths over the same arithmetic:
+- ``update`` consumes one new value and returns the latest output;
+- ``bulk`` consumes an array (for backfill) and leaves the indicator in the
+  exact state it would have after streaming those values one by one.
+
+Recursive averages use the same coefficients in both paths, and rolling
+windows keep running sums that the bulk path reproduces with a sequential
+cumulative sum. Outputs are NaN until an indicator has seen ``period`` inputs.
+"""
+
+import json
+import math
+from collections import deque
+from typing import Any, Mapping
+
+import numpy as np
+
+from adapters.market_data import Candle, CandleArray
+
+NAN = float("nan")
+
+
+def _recursive_average(
+    values: np.ndarray, alpha: float, previous: float | None
+) -> np.ndarray:
+    """y[n] = alpha * x[n] + (1 - alpha) * y[n-1], seeded with x[0] if no previous."""
+    from scipy.signal import lfilter
+
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return values.copy()
+    if previous is None:
+        head, values, previous = values[:1].copy(), values[1:], float(values[0])
+    else:
+        head = np.empty(0)
+    if len(values) == 0:
+        return head
+    filtered, _ = lfilter(
+        [alpha], [1.0, -(1.0 - alpha)], values, zi=[(1.0 - alpha) * previous]
+    )
+    return np.concatenate([head, filtered])
+
+
+class _Indicator:
+    name: str
+
+    def state(self) -> dict[str, Any]:
+        return {
+            key: (list(value) if isinstance(value, deque) else value)
+            for key, value in vars(self).items()
+        }
+
+    def load_state(self, state: Mapping[str, Any]) -> None:
+        for key, value in state.items():
+            current = getattr(self, key)
+            setattr(
+                self,
+                key,
+                deque(value, maxlen=current.maxlen) if isinstance(current, deque) else value,
+            )
+
+
+class EMA(_Indicator):
+    def __init__(self, period: int) -> None:
+        if period < 1:
+            raise ValueError("period must be at least 1")
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.value: float | None = None
+        self.count = 0
+
+    def update(self, x: float) -> float:
+        if self.value is None:
+            self.value = float(x)
+        else:
+            self.value = self.alpha * x + (1.0 - self.alpha) * self.value
+        self.count += 1
+        return self.value if self.count >= self.period else NAN
+
+    def bulk(self, values: np.ndarray) -> np.ndarray:
+        out = _recursive_average(values, self.alpha, self.value)
+        if len(out):
+            self.value = float(out[-1])
+        ready = self.count + np.arange(1, len(out) + 1) >= self.period
+        self.count += len(out)
+        return np.where(ready, out, np.nan)
+
+
+class _WilderAverage(EMA):
+    """Wilder smoothing is an EMA with alpha = 1 / period."""
+
+    def __init__(self, period: int) -> None:
+        super().__init__(period)
+        self.alpha = 1.0 / period
+
+
+class LogReturn(_Indicator):
+    def __init__(self) -> None:
+        self.previous: float | None = None
+
+    def update(self, close: float) -> float:
+        previous, self.previous = self.previous, float(close)
+        return NAN if previous is None else float(np.log(close / previous))
+
+    def bulk(self, closes: np.ndarray) -> np.ndarray:
+        closes = np.asarray(closes, dtype=float)
+        if len(closes) == 0:
+            return closes.copy()
+        previous = np.empty(len(closes))
+        previous[0] = np.nan if self.previous is None else self.previous
+        previous[1:] = closes[:-1]
+        self.previous = float(closes[-1])
+        return np.log(closes / previous)
+
+
+class ATR(_Indicator):
+    """Average true range with Wilder smoothing."""
+
+    def __init__(self, period: int = 14) -> None:
+        self.previous_close: float | None = None
+        self.average = _WilderAverage(period)
+
+    def _true_range(self, high, low, previous_close):
+        if previous_close is None:
+            return high - low
+        return max(high - low, abs(high - previous_close), abs(low - previous_close))
+
+    def update(self, high: float, low: float, close: float) -> float:
+        true_range = self._true_range(high, low, self.previous_close)
+        self.previous_close = float(close)
+        return self.average.update(true_range)
+
+    def bulk(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+        high, low, close = (np.asarray(array, dtype=float) for array in (high, low, close))
+        if len(close) == 0:
+            return close.copy()
+        previous_close = np.empty(len(close))
+        previous_close[0] = np.nan if self.previous_close is None else self.previous_close
+        previous_close[1:] = close[:-1]
+        true_range = np.maximum(
+            high - low,
+            np.maximum(np.abs(high - previous_close), np.abs(low - previous_close)),
+        )
+        if self.previous_close is None:
+            true_range[0] = high[0] - low[0]
+        self.previous_close = float(close[-1])
+        return self.average.bulk(true_range)
+
+    def state(self) -> dict[str, Any]:
+        return {"previous_close": self.previous_close, "average": self.average.state()}
+
+    def load_state(self, state: Mapping[str, Any]) -> None:
+        self.previous_close = state["previous_close"]
+        self.average.load_state(state["average"])
+
+
+class RSI(_Indicator):
+    """Relative strength index with Wilder-smoothed gains and losses."""
+
+    def __init__(self, period: int = 14) -> None:
+        self.previous_close: float | None = None
+        self.gains = _WilderAverage(period)
+        self.losses = _WilderAverage(period)
+
+    @staticmethod
+    def _rsi(average_gain, average_loss):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100.0 - 100.0 / (1.0 + average_gain / average_loss)
+        rsi = np.where(average_loss == 0.0, np.where(average_gain == 0.0, 50.0, 100.0), rsi)
+        return np.where(np.isnan(average_gain) | np.isnan(average_loss), np.nan, rsi)
+
+    def update(self, close: float) -> float:
+        previous, self.previous_close = self.previous_close, float(close)
+        if previous is None:
+            return NAN
+        change = close - previous
+        gain = self.gains.update(max(change, 0.0))
+        loss = self.losses.update(max(-change, 0.0))
+        return float(self._rsi(np.float64(gain), np.float64(loss)))
+
+    def bulk(self, closes: np.ndarray) -> np.ndarray:
+        closes = np.asarray(closes, dtype=float)
+        if len(closes) == 0:
+            return closes.copy()
+        out = np.full(len(closes), np.nan)
+        if self.previous_close is None:
+            changes = np.diff(closes)
+            target = out[1:]
+        else:
+            changes = np.diff(np.concatenate([[self.previous_close], closes]))
+            target = out
+        self.previous_close = float(closes[-1])
+        gains = self.gains.bulk(np.maximum(changes, 0.0))
+        losses = self.losses.bulk(np.maximum(-changes, 0.0))
+        target[:] = self._rsi(gains, losses)
+        return out
+
+    def state(self) -> dict[str, Any]:
+        return {
+            "previous_close": self.previous_close,
+            "gains": self.gains.state(),
+            "losses": self.losses.state(),
+        }
+
+    def load_state(self, state: Mapping[str, Any]) -> None:
+        self.previous_close = state["previous_close"]
+        self.gains.load_state(state["gains"])
+        self.losses.load_state(state["losses"])
+
+
+class _RollingMoments(_Indicator):
+    """Running sum and sum of squares over the last ``window`` inputs."""
+
+    def __init__(self, window: int) -> None:
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        self.window = window
+        self.buffer: deque[float] = deque(maxlen=window)
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def push(self, x: float) -> tuple[float, float]:
+        evicted = self.buffer[0] if len(self.buffer) == self.window else 0.0
+        self.buffer.append(float(x))
+        self.total += x - evicted
+        self.total_sq += x * x - evicted * evicted
+        return self.mean_std()
+
+    def mean_std(self) -> tuple[float, float]:
+        n = len(self.buffer)
+        if n < self.window:
+            return NAN, NAN
+        mean = self.total / n
+        variance = (self.total_sq - self.total * self.total / n) / (n - 1)
+        return mean, math.sqrt(max(variance, 0.0))
+
+    def push_many(self, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        values = np.asarray(values, dtype=float)
+        if len(values) == 0:
+            return values.copy(), values.copy()
+        history = np.concatenate([np.asarray(self.buffer, dtype=float), values])
+        positions = len(self.buffer) + np.arange(len(values))
+        evicted_at = positions - self.window
+        evicted = np.where(evicted_at >= 0, history[np.maximum(evicted_at, 0)], 0.0)
+
+        totals = np.cumsum(np.concatenate([[self.total], values - evicted]))[1:]
+        totals_sq = np.cumsum(
+            np.concatenate([[self.total_sq], values * values - evicted * evicted])
+        )[1:]
+        counts = np.minimum(positions + 1, self.window)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = totals / counts
+            variances = (totals_sq - totals * totals / counts) / (counts - 1)
+        ready = counts >= self.window
+        means = np.where(ready, means, np.nan)
+        stds = np.where(ready, np.sqrt(np.maximum(variances, 0.0)), np.nan)
+
+        self.buffer.extend(values[-self.window:].tolist())
+        self.total = float(totals[-1])
+        self.total_sq = float(totals_sq[-1])
+        return means, stds
+
+
+class RollingVolatility(_Indicator):
+    """Sample standard deviation of log returns over ``window`` bars."""
+
+    def __init__(self, window: int = 24) -> None:
+        self.returns = LogReturn()
+        self.moments = _RollingMoments(window)
+
+    def update(self, close: float) -> float:
+        log_return = self.returns.update(close)
+        if math.isnan(log_return):
+            return NAN
+        return self.moments.push(log_return)[1]
+
+    def bulk(self, closes: np.ndarray) -> np.ndarray:
+        log_returns = self.returns.bulk(closes)
+        out = np.full(len(log_returns), np.nan)
+        valid = ~np.isnan(log_returns)
+        out[valid] = self.moments.push_many(log_returns[valid])[1]
+        return out
+
+    def state(self) -> dict[str, Any]:
+        return {"returns": self.returns.state(), "moments": self.moments.state()}
+
+    def load_state(self, state: Mapping[str, Any]) -> None:
+        self.returns.load_state(state["returns"])
+        self.moments.load_state(state["moments"])
+
+
+class ZScore(_Indicator):
+    """Distance of the latest value from its rolling mean in rolling stds."""
+
+    def __init__(self, window: int = 24) -> None:
+        self.moments = _RollingMoments(window)
+
+    def update(self, x: float) -> float:
+        mean, std = self.moments.push(x)
+        if math.isnan(std) or std == 0.0:
+            return NAN
+        return (x - mean) / std
+
+    def bulk(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=float)
+        means, stds = self.moments.push_many(values)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = (values - means) / stds
+        return np.where(stds == 0.0, np.nan, out)
+
+    def state(self) -> dict[str, Any]:
+        return {"moments": self.moments.state()}
+
+    def load_state(self, state: Mapping[str, Any]) -> None:
+        self.moments.load_state(state["moments"])
+
+
+INDICATOR_COMPONENT = "indicators"
+
+DEFAULT_PARAMS = {
+    "ema_fast": 12,
+    "ema_slow": 26,
+    "atr": 14,
+    "rsi": 14,
+    "volatility": 24,
+    "zscore": 24,
+}
+
+
+class IndicatorEngine:
+    """All indicators for one symbol/timeframe, fed closed candles in order.
+
+    Produces the ``log_return``, ``atr`` and ``volatility`` columns expected by
+    ``models.regime_hmm.detect_regimes`` plus EMAs, RSI and a close z-score.
+    """
+
+    COLUMNS = (
+        "log_return",
+        "ema_fast",
+        "ema_slow",
+        "atr",
+        "rsi",
+        "volatility",
+        "zscore",
+    )
+
+    def __init__(self, params: Mapping[str, int] | None = None) -> None:
+        self.params = {**DEFAULT_PARAMS, **(params or {})}
+        self.last_timestamp_ms = -1
+        self.indicators = {
+            "log_return": LogReturn(),
+            "ema_fast": EMA(self.params["ema_fast"]),
+            "ema_slow": EMA(self.params["ema_slow"]),
+            "atr": ATR(self.params["atr"]),
+            "rsi": RSI(self.params["rsi"]),
+            "volatility": RollingVolatility(self.params["volatility"]),
+            "zscore": ZScore(self.params["zscore"]),
+        }
+
+    def update(self, candle: Candle) -> dict[str, float] | None:
+        """Consume one closed candle; already-seen candles return None."""
+        if candle.timestamp_ms <= self.last_timestamp_ms:
+            return None
+        self.last_timestamp_ms = candle.timestamp_ms
+        indicators = self.indicators
+        return {
+            "log_return": indicators["log_return"].update(candle.close),
+            "ema_fast": indicators["ema_fast"].update(candle.close),
+            "ema_slow": indicators["ema_slow"].update(candle.close),
+            "atr": indicators["atr"].update(candle.high, candle.low, candle.close),
+            "rsi": indicators["rsi"].update(candle.close),
+            "volatility": indicators["volatility"].update(candle.close),
+            "zscore": indicators["zscore"].update(candle.close),
+        }
+
+    def bulk(self, candles: CandleArray) -> dict[str, np.ndarray]:
+        """Vectorized backfill; only candles newer than the state are consumed."""
+        start = int(np.searchsorted(candles.timestamp_ms, self.last_timestamp_ms, side="right"))
+        candles = candles[start:]
+        if len(candles):
+            self.last_timestamp_ms = int(candles.timestamp_ms[-1])
+        indicators = self.indicators
+        return {
+            "timestamp_ms": candles.timestamp_ms,
+            "log_return": indicators["log_return"].bulk(candles.close),
+            "ema_fast": indicators["ema_fast"].bulk(candles.close),
+            "ema_slow": indicators["ema_slow"].bulk(candles.close),
+            "atr": indicators["atr"].bulk(candles.high, candles.low, candles.close),
+            "rsi": indicators["rsi"].bulk(candles.close),
+            "volatility": indicators["volatility"].bulk(candles.close),
+            "zscore": indicators["zscore"].bulk(candles.close),
+        }
+
+    def to_bytes(self) -> bytes:
+        return json.dumps(
+            {
+                "params": self.params,
+                "last_timestamp_ms": self.last_timestamp_ms,
+                "indicators": {
+                    name: indicator.state() for name, indicator in self.indicators.items()
+                },
+            }
+        ).encode("utf-8")
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "IndicatorEngine":
+        state = json.loads(payload.decode("utf-8"))
+        engine = cls(state["params"])
+        engine.last_timestamp_ms = state["last_timestamp_ms"]
+        for name, indicator_state in state["indicators"].items():
+            engine.indicators[name].load_state(indicator_state)
+        return engine
+
+
+def indicator_state_key(exchange: str, symbol: str, timeframe: str) -> str:
+    return f"{exchange}|{symbol}|{timeframe}"
+
+
+def load_indicator_engines(db, keys) -> dict[str, IndicatorEngine]:
+    """Load persisted engines for ``keys``; unknown keys start empty."""
+    stored = db.load_component_states(INDICATOR_COMPONENT)
+    return {
+        key: IndicatorEngine.from_bytes(stored[key]) if key in stored else IndicatorEngine()
+        for key in keys
+    }
+
+
+def save_indicator_engines(db, engines: Mapping[str, IndicatorEngine]) -> None:
+    db.save_component_states(
+        INDICATOR_COMPONENT,
+        {key: engine.to_bytes() for key, engine in engines.items()},
+    )
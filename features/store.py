@@ -0,0 +1,382 @@
+from __future__ import annotations
+
+"""Columnar on-disk feature store shared by every model component.
+
+Layout, one directory per (feature set version, exchange, symbol, timeframe):
+
+    <root>/<feature_set>/<fingerprint>/<exchange>/<symbol>/<timeframe>/
+        timestamp_ms.i8      int64 column
+        <column>.f8          one float64 column per feature
+        meta.json            row count, last timestamp, streaming state
+
+Columns are raw little-endian arrays read through ``np.memmap``. Appends only
+add rows newer than the last stored timestamp, and ``meta.json`` is replaced
+atomically after the column files are written, so its row count is the
+commit point. A stored set is always one contiguous run of bars, so its
+streaming state matches a bulk recompute: bars that do not continue it (an
+outage longer than the fetched window, or bars another exchange served)
+restart the set from the contiguous tail of the appended candles. The
+fingerprint hashes the feature definitions, so changing a definition routes
+readers and writers to a fresh directory; ``purge_stale`` deletes the old
+ones.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Mapping, Sequence
+
+import numpy as np
+
+from adapters.market_data import CandleArray, timeframe_to_ms
+from features.indicators import DEFAULT_PARAMS, IndicatorEngine
+
+META_FILENAME = "meta.json"
+TIMESTAMP_FILENAME = "timestamp_ms.i8"
+
+
+@dataclass(frozen=True)
+class FeatureSet:
+    """A named, versioned feature definition with incremental computation.
+
+    ``compute(state, candles)`` returns ``(columns, new_state)`` for candles
+    strictly newer than those already folded into ``state``.
+    """
+
+    name: str
+    version: int
+    columns: tuple[str, ...]
+    params: Mapping[str, Any]
+    compute: Callable[[Any, CandleArray], tuple[dict[str, np.ndarray], Any]]
+
+    @property
+    def fingerprint(self) -> str:
+        raw = json.dumps(
+            {
+                "name": self.name,
+                "version": self.version,
+                "columns": self.columns,
+                "params": dict(self.params),
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _baseline_compute(state, candles: CandleArray):
+    """Per-bar ``ret``/``vol`` as in models.baseline, over the whole history."""
+    close = candles.close
+    previous = np.empty(len(close))
+    if len(close):
+        previous[0] = close[0] if state is None else state["previous_close"]
+        previous[1:] = close[:-1]
+    columns = {
+        "ret": close / previous - 1,
+        "vol": (candles.high - candles.low) / close,
+    }
+    if len(close):
+        state = {"previous_close": float(close[-1])}
+    return columns, state
+
+
+def _indicator_compute(state, candles: CandleArray):
+    engine = IndicatorEngine() if state is None else IndicatorEngine.from_bytes(
+        state.encode("utf-8")
+    )
+    computed = engine.bulk(candles)
+    columns = {name: computed[name] for name in IndicatorEngine.COLUMNS}
+    return columns, engine.to_bytes().decode("utf-8")
+
+
+BASELINE_FEATURES = FeatureSet(
+    name="baseline",
+    version=1,
+    columns=("ret", "vol"),
+    params={},
+    compute=_baseline_compute,
+)
+
+INDICATOR_FEATURES = FeatureSet(
+    name="indicators",
+    version=1,
+    columns=IndicatorEngine.COLUMNS,
+    params=DEFAULT_PARAMS,
+    compute=_indicator_compute,
+)
+
+FEATURE_SETS = {
+    feature_set.name: feature_set
+    for feature_set in (BASELINE_FEATURES, INDICATOR_FEATURES)
+}
+
+
+@dataclass(frozen=True)
+class FeatureFrame:
+    """Aligned feature columns; arrays are memory-mapped views where possible."""
+
+    timestamp_ms: np.ndarray
+    columns: dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.timestamp_ms)
+
+    def matrix(self, names: Sequence[str] | None = None) -> np.ndarray:
+        names = list(names or self.columns)
+        return np.column_stack([self.columns[name] for name in names])
+
+    def to_dataframe(self):
+        import pandas as pd
+
+        return pd.DataFrame(
+            {name: np.asarray(values) for name, values in self.columns.items()},
+            index=pd.Index(np.asarray(self.timestamp_ms), name="timestamp_ms"),
+        )
+
+
+def _safe(part: str) -> str:
+    return part.replace("/", "_").replace(":", "_")
+
+
+class FeatureStore:
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def _directory(
+        self, feature_set: FeatureSet, exchange: str, symbol: str, timeframe: str
+    ) -> Path:
+        return (
+            self.root
+            / feature_set.name
+            / feature_set.fingerprint
+            / _safe(exchange)
+            / _safe(symbol)
+            / _safe(timeframe)
+        )
+
+    @staticmethod
+    def _read_meta(directory: Path) -> dict[str, Any]:
+        path = directory / META_FILENAME
+        if not path.exists():
+            return {"rows": 0, "last_timestamp_ms": -1, "state": None}
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    @staticmethod
+    def _write_meta(directory: Path, meta: Mapping[str, Any]) -> None:
+        staging = directory / f".{META_FILENAME}.{os.getpid()}"
+        staging.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(staging, directory / META_FILENAME)
+
+    def append(
+        self,
+        feature_set: FeatureSet,
+        *,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        candles: CandleArray,
+    ) -> int:
+        """Compute and append features for candles newer than the stored ones.
+
+        Returns the rows written. After a gap the set is rebuilt from the
+        candles following the last gap, so the count can exceed the new bars.
+        """
+        directory = self._directory(feature_set, exchange, symbol, timeframe)
+        directory.mkdir(parents=True, exist_ok=True)
+        meta = self._read_meta(directory)
+
+        start = int(
+            np.searchsorted(candles.timestamp_ms, meta["last_timestamp_ms"], side="right")
+        )
+        candles = candles[start:]
+        if len(candles) == 0:
+            return 0
+
+        timeframe_ms = timeframe_to_ms(timeframe)
+        gaps = np.flatnonzero(np.diff(candles.timestamp_ms) != timeframe_ms) + 1
+        continues = (
+            meta["rows"] == 0
+            or int(candles.timestamp_ms[0]) == meta["last_timestamp_ms"] + timeframe_ms
+        )
+        if not continues or len(gaps):
+            if len(gaps):
+                candles = candles[int(gaps[-1]) :]
+            print(
+                f"⚠️ Gap in {feature_set.name} features for {exchange} {symbol} "
+                f"{timeframe}; rebuilding from {len(candles)} contiguous bars"
+            )
+            meta = {"rows": 0, "last_timestamp_ms": -1, "state": None}
+
+        columns, state = feature_set.compute(meta["state"], candles)
+        rows = meta["rows"]
+        files = [(TIMESTAMP_FILENAME, candles.timestamp_ms.astype("<i8"))] + [
+            (f"{name}.f8", np.asarray(columns[name], dtype="<f8"))
+            for name in feature_set.columns
+        ]
+        for filename, values in files:
+            path = directory / filename
+            with open(path, "ab") as handle:
+                # Drop bytes from an append that crashed before meta.json
+                # committed it.
+                handle.truncate(rows * 8)
+                handle.write(values.tobytes())
+
+        self._write_meta(
+            directory,
+            {
+                "fingerprint": feature_set.fingerprint,
+                "columns": list(feature_set.columns),
+                "rows": rows + len(candles),
+                "last_timestamp_ms": int(candles.timestamp_ms[-1]),
+                "state": state,
+            },
+        )
+        return len(candles)
+
+    def read(
+        self,
+        feature_set: FeatureSet,
+        *,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start_ms: int | None = None,
+        end_ms: int | None = None,
+        columns: Sequence[str] | None = None,
+    ) -> FeatureFrame:
+        directory = self._directory(feature_set, exchange, symbol, timeframe)
+        rows = self._read_meta(directory)["rows"]
+        names = tuple(columns or feature_set.columns)
+        if rows == 0:
+            return FeatureFrame(
+                np.empty(0, dtype=np.int64), {name: np.empty(0) for name in names}
+            )
+
+        timestamps = np.memmap(
+            directory / TIMESTAMP_FILENAME, dtype="<i8", mode="r", shape=(rows,)
+        )
+        lo = 0 if start_ms is None else int(np.searchsorted(timestamps, start_ms, "left"))
+        hi = rows if end_ms is None else int(np.searchsorted(timestamps, end_ms, "right"))
+        return FeatureFrame(
+            timestamp_ms=timestamps[lo:hi],
+            columns={
+                name: np.memmap(
+                    directory / f"{name}.f8", dtype="<f8", mode="r", shape=(rows,)
+                )[lo:hi]
+                for name in names
+            },
+        )
+
+    def read_window(
+        self,
+        feature_set: FeatureSet,
+        *,
+        exchanges: Sequence[str],
+        symbol: str,
+        timeframe: str,
+        timestamp_ms: np.ndarray,
+    ) -> FeatureFrame | None:
+        """Stored rows for exactly the bars ``timestamp_ms``, or None.
+
+        Sets are read in ``exchanges`` order; the first one holding every bar
+        wins. A fetched window's latest bar is only stored under the exchange
+        that served it, so that set is the one matching the window.
+        """
+        if len(timestamp_ms) == 0:
+            return None
+        for exchange in exchanges:
+            frame = self.read(
+                feature_set,
+                exchange=exchange,
+                symbol=symbol,
+                timeframe=timeframe,
+                start_ms=int(timestamp_ms[0]),
+                end_ms=int(timestamp_ms[-1]),
+            )
+            if np.array_equal(frame.timestamp_ms, timestamp_ms):
+                return frame
+        return None
+
+    def purge_stale(self) -> list[Path]:
+        """Delete directories written by feature definitions that no longer exist."""
+        removed = []
+        if not self.root.exists():
+            return removed
+        for set_dir in self.root.iterdir():
+            if not set_dir.is_dir():
+                continue
+            current = FEATURE_SETS.get(set_dir.name)
+            for version_dir in set_dir.iterdir():
+                if current is None or version_dir.name != current.fingerprint:
+                    shutil.rmtree(version_dir)
+                    removed.append(version_dir)
+        return removed
+
+
+def update_feature_store(
+    store: FeatureStore,
+    *,
+    exchange: str,
+    symbol: str,
+    timeframe: str,
+    candles: CandleArray,
+    feature_sets: Sequence[FeatureSet] = tuple(FEATURE_SETS.values()),
+) -> int:
+    return sum(
+        store.append(
+            feature_set,
+            exchange=exchange,
+            symbol=symbol,
+            timeframe=timeframe,
+            candles=candles,
+        )
+        for feature_set in feature_sets
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    from config import CONFIG
+    from db.db_handler import TradingDatabaseHandler
+
+    parser = argparse.ArgumentParser(
+        description="Backfill the feature store from stored candle history."
+    )
+    parser.add_argument("--root", default=CONFIG.feature_store_dir)
+    parser.add_argument("--symbols", help="Comma-separated symbols (default: SYMBOLS)")
+    parser.add_argument("--db", default=str(CONFIG.db_path))
+    args = parser.parse_args(argv)
+    if not args.root:
+        parser.error("--root is required when FEATURE_STORE_DIR is not set")
+
+    db = TradingDatabaseHandler(args.db)
+    store = FeatureStore(args.root)
+    removed = store.purge_stale()
+    symbols = (
+        tuple(symbol.strip() for symbol in args.symbols.split(",") if symbol.strip())
+        if args.symbols
+        else CONFIG.symbols
+    )
+    appended = 0
+    for symbol in symbols:
+        appended += update_feature_store(
+            store,
+            exchange=CONFIG.market_data_exchange_id,
+            symbol=symbol,
+            timeframe=CONFIG.timeframe,
+            candles=db.get_candle_array(
+                exchange=CONFIG.market_data_exchange_id,
+                symbol=symbol,
+                timeframe=CONFIG.timeframe,
+            ),
+        )
+    print(
+        f"✅ Feature store updated: rows_appended={appended}, "
+        f"stale_versions_removed={len(removed)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
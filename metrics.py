@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+"""Per-cycle stage timings, counters and histograms.
+
+Code anywhere in a cycle reports through the module-level ``span``,
+``count`` and ``observe`` functions. They record into the ``CycleMetrics``
+activated for the cycle and return immediately when none is active, so
+instrumented library code (adapters, strategies) costs one global lookup
+when metrics are disabled.
+
+Spans may nest (an OHLCV fetch includes the first ``load_markets``), so
+stage times are inclusive and need not add up to the cycle duration. At the
+end of a cycle the record is stored in the ``cycle_metrics`` table and,
+when an output directory is configured, written as JSON and as a
+Prometheus textfile-collector file.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    __slots__ = ("bounds", "buckets", "count", "total", "max")
+
+    def __init__(self, bounds: tuple[float, ...] = BUCKETS_SECONDS) -> None:
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile (max if beyond)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, bucket in zip(self.bounds, self.buckets):
+            seen += bucket
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": self.buckets,
+        }
+
+
+class _Span:
+    __slots__ = ("metrics", "stage", "symbol", "started")
+
+    def __init__(self, metrics: CycleMetrics, stage: str, symbol: str | None) -> None:
+        self.metrics = metrics
+        self.stage = stage
+        self.symbol = symbol
+
+    def __enter__(self) -> _Span:
+        self.started = self.metrics.clock()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.metrics.add_time(self.stage, self.metrics.clock() - self.started, self.symbol)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+_active: CycleMetrics | None = None
+
+
+class CycleMetrics:
+    def __init__(
+        self, process: str, *, clock: Callable[[], float] = time.perf_counter
+    ) -> None:
+        self.process = process
+        self.clock = clock
+        self.started_at = datetime.now(timezone.utc)
+        self._started = clock()
+        self.duration_seconds: float | None = None
+        self.stages: dict[str, Histogram] = {}
+        self.symbol_seconds: dict[str, dict[str, float]] = {}
+        self.counters: dict[str, float] = {}
+        self.histograms: dict[str, Histogram] = {}
+        # Hedged fetches report from worker threads.
+        self._lock = threading.Lock()
+
+    def span(self, stage: str, symbol: str | None = None) -> _Span:
+        return _Span(self, stage, symbol)
+
+    def add_time(self, stage: str, seconds: float, symbol: str | None = None) -> None:
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram()
+            histogram.observe(seconds)
+            if symbol is not None:
+                per_symbol = self.symbol_seconds.setdefault(symbol, {})
+                per_symbol[stage] = per_symbol.get(stage, 0.0) + seconds
+
+    def count(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def activate(self) -> Iterator[CycleMetrics]:
+        """Route the module-level helpers here for the duration of a cycle."""
+        global _active
+        previous, _active = _active, self
+        try:
+            yield self
+        finally:
+            _active = previous
+            self.duration_seconds = self.clock() - self._started
+
+    def record(self) -> dict[str, Any]:
+        duration = (
+            self.duration_seconds
+            if self.duration_seconds is not None
+            else self.clock() - self._started
+        )
+        with self._lock:
+            return {
+                "process": self.process,
+                "started_at": self.started_at.isoformat(),
+                "duration_seconds": duration,
+                "stages": {name: h.to_dict() for name, h in sorted(self.stages.items())},
+                "symbols": {
+                    symbol: dict(sorted(stages.items()))
+                    for symbol, stages in sorted(self.symbol_seconds.items())
+                },
+                "counters": dict(sorted(self.counters.items())),
+                "histograms": {
+                    name: h.to_dict() for name, h in sorted(self.histograms.items())
+                },
+            }
+
+    def write(self, db, *, output_dir: str | Path | None = None) -> dict[str, Any]:
+        """Store the record in ``cycle_metrics`` and optional JSON/Prometheus files."""
+        record = self.record()
+        db.insert_cycle_metrics(
+            process=self.process,
+            started_at=record["started_at"],
+            duration_seconds=record["duration_seconds"],
+            metrics_json=json.dumps(record, sort_keys=True),
+        )
+        if output_dir is not None:
+            directory = Path(output_dir)
+            directory.mkdir(parents=True, exist_ok=True)
+            _write_atomic(directory / f"{self.process}.json", json.dumps(record, indent=2))
+            _write_atomic(directory / f"{self.process}.prom", self.prometheus_text(record))
+        return record
+
+    def prometheus_text(self, record: dict[str, Any] | None = None) -> str:
+        record = record or self.record()
+        process = _label(self.process)
+        lines = [
+            "# TYPE profitforge_cycle_duration_seconds gauge",
+            f'profitforge_cycle_duration_seconds{{process="{process}"}} '
+            f"{record['duration_seconds']:.6f}",
+            "# TYPE profitforge_cycle_started_timestamp_seconds gauge",
+            f'profitforge_cycle_started_timestamp_seconds{{process="{process}"}} '
+            f"{self.started_at.timestamp():.3f}",
+            "# TYPE profitforge_cycle_count gauge",
+        ]
+        for name, value in record["counters"].items():
+            lines.append(
+                f'profitforge_cycle_count{{process="{process}",name="{_label(name)}"}} {value}'
+            )
+        for family, label, histograms in (
+            ("profitforge_stage_seconds", "stage", self.stages),
+            ("profitforge_observation", "name", self.histograms),
+        ):
+            lines.append(f"# TYPE {family} histogram")
+            for name, histogram in sorted(histograms.items()):
+                labels = f'process="{process}",{label}="{_label(name)}"'
+                cumulative = 0
+                for bound, bucket in zip(
+                    (*histogram.bounds, "+Inf"), histogram.buckets
+                ):
+                    cumulative += bucket
+                    lines.append(f'{family}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{family}_sum{{{labels}}} {histogram.total:.6f}")
+                lines.append(f"{family}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def span(stage: str, symbol: str | None = None) -> _Span | _NullSpan:
+    metrics = _active
+    if metrics is None:
+        return _NULL_SPAN
+    return _Span(metrics, stage, symbol)
+
+
+def count(name: str, value: float = 1) -> None:
+    metrics = _active
+    if metrics is not None:
+        metrics.count(name, value)
+
+
+def observe(name: str, value: float) -> None:
+    metrics = _active
+    if metrics is not None:
+        metrics.observe(name, value)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    # The textfile collector may read at any moment; never expose a partial file.
+    temporary = path.with_suffix(path.suffix + ".tmp")
+    temporary.write_text(text, encoding="utf-8")
+    os.replace(temporary, path)
+
+
+@contextmanager
+def instrumented(
+    process: str,
+    *,
+    enabled: bool,
+    db_path: str | Path,
+    output_dir: str | Path | None = None,
+) -> Iterator[CycleMetrics | None]:
+    """Record one cycle and write it afterwards, even if the cycle raised."""
+    if not enabled:
+        yield None
+        return
+
+    from db.db_handler import TradingDatabaseHandler
+
+    metrics = CycleMetrics(process)
+    try:
+        with metrics.activate():
+            yield metrics
+    finally:
+        try:
+            metrics.write(TradingDatabaseHandler(db_path), output_dir=output_dir)
+        except Exception as exc:
+            # Losing a metrics record must never fail the cycle.
+            print(f"⚠️ Cycle metrics not written: {exc}")
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+"""Baseline strategy core shared by the live cycle and historical backtests.
+
+Everything here operates on plain NumPy arrays so the trainer and the
+backtest engine build identical features, fits, stops and expiries.
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from sklearn.linear_model import SGDClassifier, SGDRegressor
+    from sklearn.preprocessing import StandardScaler
+
+MIN_SUPERVISED_ROWS = 20
+
+# Identify a fit for the model cache: bump FEATURE_SET whenever
+# baseline_features changes meaning.
+FEATURE_SET = "baseline_ret_vol_v1"
+CLASSIFIER_PARAMS = {"loss": "log_loss", "random_state": 42}
+REGRESSOR_PARAMS = {
+    "loss": "epsilon_insensitive",
+    "learning_rate": "pa1",
+    "eta0": 1.0,
+    "epsilon": 0.01,
+    "random_state": 42,
+}
+
+
+@dataclass(frozen=True)
+class BaselineModels:
+    scaler: StandardScaler
+    classifier: SGDClassifier
+    regressor: SGDRegressor
+
+
+def baseline_features(
+    close: np.ndarray, high: np.ndarray, low: np.ndarray
+) -> np.ndarray:
+    """Return the ``[ret, vol]`` feature matrix for one candle window.
+
+    ``ret`` is the close-to-close return inside the window, so the first row
+    is 0.0 exactly like ``pct_change().fillna(0.0)`` on the window.
+    """
+    close = np.asarray(close, dtype=float)
+    features = np.empty((len(close), 2), dtype=float)
+    features[0, 0] = 0.0
+    features[1:, 0] = close[1:] / close[:-1] - 1
+    features[:, 1] = (np.asarray(high, dtype=float) - np.asarray(low, dtype=float)) / close
+    return features
+
+
+def fit_baseline_models(features: np.ndarray) -> BaselineModels:
+    """Fit scaler, direction classifier and magnitude regressor on a window."""
+    if len(features) - 1 < MIN_SUPERVISED_ROWS:
+        raise ValueError("Insufficient closed-candle history for model training.")
+
+    from sklearn.linear_model import SGDClassifier, SGDRegressor
+    from sklearn.preprocessing import StandardScaler
+
+    X = features[:-1]
+    next_ret = features[1:, 0]
+    y_class = (next_ret > 0).astype(int)
+    y_reg = np.abs(next_ret)
+
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+
+    clf = SGDClassifier(**CLASSIFIER_PARAMS)
+    clf.fit(X_scaled, y_class)
+
+    reg = SGDRegressor(**REGRESSOR_PARAMS)
+    reg.fit(X_scaled, y_reg)
+
+    return BaselineModels(scaler=scaler, classifier=clf, regressor=reg)
+
+
+def baseline_hyperparameters() -> dict[str, object]:
+    """Everything besides the window that determines a fit's outcome."""
+    import sklearn
+
+    return {
+        "min_supervised_rows": MIN_SUPERVISED_ROWS,
+        "classifier": CLASSIFIER_PARAMS,
+        "regressor": REGRESSOR_PARAMS,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def predict_baseline(
+    models: BaselineModels, latest_features: np.ndarray
+) -> tuple[float, float]:
+    """Return ``(probability_up, predicted_magnitude)`` for the latest row."""
+    scaled = models.scaler.transform(np.asarray(latest_features, dtype=float).reshape(1, -1))
+    probability_up = float(models.classifier.predict_proba(scaled)[0][1])
+    predicted_magnitude = float(models.regressor.predict(scaled)[0])
+    return probability_up, predicted_magnitude
+
+
+def signal_levels(
+    entry,
+    probability_up,
+    predicted_magnitude,
+    *,
+    min_stop_distance_pct: float,
+    reward_risk_ratio: float,
+):
+    """Return ``(is_long, confidence, stop_loss, take_profit)``.
+
+    Accepts scalars or arrays; the arithmetic is the baseline stop model used
+    by the live cycle.
+    """
+    entry = np.asarray(entry, dtype=float)
+    probability_up = np.asarray(probability_up, dtype=float)
+    is_long = probability_up > 0.5
+    confidence = np.where(is_long, probability_up, 1.0 - probability_up)
+    move = entry * np.maximum(
+        np.abs(np.asarray(predicted_magnitude, dtype=float)), min_stop_distance_pct
+    )
+    stop_loss = np.where(is_long, entry - move, entry + move)
+    take_profit = np.where(
+        is_long,
+        entry + move * reward_risk_ratio,
+        entry - move * reward_risk_ratio,
+    )
+    return is_long, confidence, stop_loss, take_profit
+
+
+def signal_expiry_ms(candle_timestamp_ms, timeframe_ms: int, validity_bars: int):
+    """Expiry is ``validity_bars`` after the signal candle has closed."""
+    candle_close_ms = candle_timestamp_ms + timeframe_ms
+    return candle_close_ms + timeframe_ms * validity_bars
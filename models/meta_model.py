@@ -1,11 +1,226 @@
-from sklearn.ensemble import RandomForestClassifier
+from __future__ import annotations
+
+"""Meta-labeling model over raw baseline signals.
+
+The forest is fitted with scikit-learn, then flattened into plain node arrays.
+Inference walks those arrays for every tree and every candidate at once, so a
+whole cycle's candidates are scored in one vectorized call. Saved artifacts are
+raw ``.npy`` arrays plus a JSON manifest; loading memory-maps the arrays
+instead of unpickling 200 estimator objects, so scoring never imports
+scikit-learn.
+
+Each save writes a new version subdirectory and then switches the
+``CURRENT`` pointer file to it with one ``os.replace``, so a trainer loading
+the artifact while it is being replaced sees either the old or the new
+version, never a partial one. The previous version is kept for loaders that
+read the pointer just before the switch; older ones are removed.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from sklearn.ensemble import RandomForestClassifier
+
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_FILENAME = "manifest.json"
+POINTER_FILENAME = "CURRENT"
+KEEP_VERSIONS = 2
+_ARRAY_NAMES = ("left", "right", "feature", "threshold", "positive_value", "roots")
+
+
+class MetaModelArtifactError(RuntimeError):
+    """Raised when a meta-model artifact is missing, stale or inconsistent."""
+
 
 class MetaModel:
-    def __init__(self):
-        self.model = RandomForestClassifier(n_estimators=200)
+    def __init__(
+        self,
+        n_estimators: int = 200,
+        *,
+        n_jobs: int | None = None,
+        random_state: int | None = None,
+    ) -> None:
+        self.n_estimators = n_estimators
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.model: RandomForestClassifier | None = None
+        self.n_features: int | None = None
+        self._arrays: dict[str, np.ndarray] | None = None
+        self._max_depth = 0
 
-    def fit(self, X, y):
+    def fit(self, X, y) -> "MetaModel":
+        from sklearn.ensemble import RandomForestClassifier
+
+        X = np.asarray(X, dtype=float)
+        self.model = RandomForestClassifier(
+            n_estimators=self.n_estimators,
+            n_jobs=self.n_jobs,
+            random_state=self.random_state,
+        )
         self.model.fit(X, y)
+        self.n_features = X.shape[1]
+        self._arrays, self._max_depth = _flatten_forest(self.model)
+        return self
+
+    def probability(self, X) -> np.ndarray:
+        """Return P(label == 1) for every row of ``X`` in one pass."""
+        if self._arrays is None:
+            raise MetaModelArtifactError("MetaModel has not been fitted or loaded.")
+
+        # scikit-learn compares float32 features against float64 thresholds;
+        # casting the same way keeps split decisions identical.
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(
+                f"Expected a 2-D feature matrix with {self.n_features} columns."
+            )
+        if len(X) == 0:
+            return np.empty(0, dtype=float)
+
+        arrays = self._arrays
+        left = arrays["left"]
+        rows = np.arange(len(X))[None, :]
+        node = np.repeat(arrays["roots"][:, None], len(X), axis=1)
+
+        for _ in range(self._max_depth):
+            child_left = left[node]
+            is_leaf = child_left < 0
+            if is_leaf.all():
+                break
+            feature = np.where(is_leaf, 0, arrays["feature"][node])
+            go_left = X[rows, feature] <= arrays["threshold"][node]
+            node = np.where(
+                is_leaf,
+                node,
+                np.where(go_left, child_left, arrays["right"][node]),
+            )
+
+        return arrays["positive_value"][node].mean(axis=0)
+
+    def save(self, directory: str | Path) -> Path:
+        """Write a new artifact version, point ``CURRENT`` at it, return its path."""
+        if self._arrays is None:
+            raise MetaModelArtifactError("Cannot save an unfitted MetaModel.")
+
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        created_at = datetime.now(timezone.utc)
+        version = f"v{created_at:%Y%m%dT%H%M%S%fZ}-{os.getpid()}"
+        staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=directory))
+        try:
+            for name in _ARRAY_NAMES:
+                np.save(staging / f"{name}.npy", np.ascontiguousarray(self._arrays[name]))
+
+            manifest = {
+                "format_version": ARTIFACT_FORMAT_VERSION,
+                "n_features": self.n_features,
+                "n_estimators": int(len(self._arrays["roots"])),
+                "max_depth": self._max_depth,
+                "created_at": created_at.isoformat(),
+            }
+            (staging / MANIFEST_FILENAME).write_text(
+                json.dumps(manifest, indent=2), encoding="utf-8"
+            )
+            os.replace(staging, directory / version)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        pointer = directory / f".{POINTER_FILENAME}.{os.getpid()}.tmp"
+        pointer.write_text(version, encoding="utf-8")
+        os.replace(pointer, directory / POINTER_FILENAME)
+
+        versions = sorted(path for path in directory.glob("v*") if path.is_dir())
+        for stale in versions[:-KEEP_VERSIONS]:
+            if stale.name != version:
+                shutil.rmtree(stale, ignore_errors=True)
+        return directory / version
+
+    @classmethod
+    def load(cls, directory: str | Path, *, mmap: bool = True) -> "MetaModel":
+        """Load an artifact for inference; arrays are memory-mapped by default.
+
+        ``directory`` is either a saved root, resolved through its ``CURRENT``
+        pointer, or one version directory.
+        """
+        directory = Path(directory)
+        pointer = directory / POINTER_FILENAME
+        if pointer.exists():
+            directory = directory / pointer.read_text(encoding="utf-8").strip()
+        manifest_path = directory / MANIFEST_FILENAME
+        if not manifest_path.exists():
+            raise MetaModelArtifactError(f"Meta-model manifest not found: {manifest_path}")
+
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("format_version") != ARTIFACT_FORMAT_VERSION:
+            raise MetaModelArtifactError(
+                f"Unsupported meta-model artifact version "
+                f"{manifest.get('format_version')}; expected {ARTIFACT_FORMAT_VERSION}."
+            )
+
+        mmap_mode = "r" if mmap else None
+        arrays = {
+            name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode)
+            for name in _ARRAY_NAMES
+        }
+        if len(arrays["roots"]) != manifest["n_estimators"]:
+            raise MetaModelArtifactError(
+                f"Meta-model artifact is inconsistent: {directory}"
+            )
+
+        instance = cls(n_estimators=manifest["n_estimators"])
+        instance.n_features = int(manifest["n_features"])
+        instance._arrays = arrays
+        instance._max_depth = int(manifest["max_depth"])
+        return instance
+
+
+def _flatten_forest(
+    forest: RandomForestClassifier,
+) -> tuple[dict[str, np.ndarray], int]:
+    """Concatenate every fitted tree into shared node arrays."""
+    classes = list(forest.classes_)
+    positive_index = classes.index(1) if 1 in classes else None
+
+    left, right, feature, threshold, positive_value, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left < 0
+        left.append(np.where(is_leaf, -1, tree.children_left + offset))
+        right.append(np.where(is_leaf, -1, tree.children_right + offset))
+        feature.append(tree.feature)
+        threshold.append(tree.threshold)
+
+        # Normalize leaf values exactly like DecisionTreeClassifier.predict_proba.
+        values = tree.value[:, 0, :]
+        totals = values.sum(axis=1)
+        totals[totals == 0.0] = 1.0
+        if positive_index is None:
+            positive_value.append(np.zeros(tree.node_count))
+        else:
+            positive_value.append(values[:, positive_index] / totals)
+
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, int(tree.max_depth))
 
-    def probability(self, X):
-        return self.model.predict_proba(X)[:, 1]
+    arrays = {
+        "left": np.concatenate(left).astype(np.int64),
+        "right": np.concatenate(right).astype(np.int64),
+        "feature": np.concatenate(feature).astype(np.int64),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "positive_value": np.concatenate(positive_value).astype(np.float64),
+        "roots": np.asarray(roots, dtype=np.int64),
+    }
+    return arrays, max_depth
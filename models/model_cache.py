@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+"""Content-addressed on-disk cache of fitted models and their outputs.
+
+Entries are keyed by a SHA-256 of the feature set, the hyperparameters and
+the exact bytes of the training window, so a rerun over an unchanged candle
+window finds the earlier fit instead of refitting. Every entry is one pickle
+file under ``<directory>/<key[:2]>/``; writes go through a temporary file and
+``os.replace``, so processes sharing the directory never read a partial
+entry. A hit refreshes the file's mtime, which makes mtime order LRU order.
+When the directory grows past ``max_bytes``, the least recently used
+entries are removed until it is back under ``EVICT_TO_FRACTION`` of the cap.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Mapping
+
+import numpy as np
+
+FORMAT_VERSION = 1
+EVICT_TO_FRACTION = 0.9
+SUFFIX = ".pkl"
+
+
+def window_key(
+    window: np.ndarray, *, feature_set: str, hyperparameters: Mapping[str, Any]
+) -> str:
+    window = np.ascontiguousarray(window)
+    header = json.dumps(
+        {
+            "format": FORMAT_VERSION,
+            "feature_set": feature_set,
+            "hyperparameters": hyperparameters,
+            "dtype": window.dtype.str,
+            "shape": window.shape,
+        },
+        sort_keys=True,
+    )
+    digest = hashlib.sha256(header.encode("utf-8"))
+    digest.update(window.tobytes())
+    return digest.hexdigest()
+
+
+class ModelCache:
+    def __init__(self, directory: str | Path, *, max_bytes: int) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be greater than zero")
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # Other processes write too; the total is re-measured before evicting.
+        self._estimated_bytes: int | None = None
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}{SUFFIX}"
+
+    def get(self, key: str) -> Any | None:
+        path = self._path(key)
+        try:
+            payload = path.read_bytes()
+            value = pickle.loads(payload)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as exc:
+            # A truncated or stale entry is just a miss; drop it.
+            print(f"⚠️ Discarding unreadable model cache entry {key}: {exc}")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # evicted by another process after the read
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        temporary.write_bytes(payload)
+        os.replace(temporary, path)
+
+        if self._estimated_bytes is None:
+            self._estimated_bytes = self.size_bytes()
+        else:
+            self._estimated_bytes += len(payload)
+        if self._estimated_bytes > self.max_bytes:
+            self.evict()
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.directory.glob(f"*/*{SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> int:
+        """Remove least recently used entries down to the low watermark."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_TO_FRACTION
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        self._estimated_bytes = total
+        return removed
@@ -1,17 +1,22 @@
 import numpy as np
 from hmmlearn.hmm import GaussianHMM
 
-def detect_regimes(df):
+def detect_regimes(df, *, random_state=None):
     X = np.column_stack([
         df["log_return"],
         df["atr"],
         df["volatility"]
     ])
+    # ATR is in price units, orders of magnitude above the returns; on the raw
+    # columns the fitted covariances often stop being positive definite.
+    scale = X.std(axis=0)
+    X = (X - X.mean(axis=0)) / np.where(scale > 0, scale, 1.0)
 
     hmm = GaussianHMM(
         n_components=3,
         covariance_type="full",
-        n_iter=200
+        n_iter=200,
+        random_state=random_state,
     )
     hmm.fit(X)
 
@@ -21,3 +26,24 @@ def detect_regimes(df):
     df["regime"] = regimes
     df["regime_prob"] = probs
     return df
+
+
+def detect_regimes_from_store(
+    store, *, exchange, symbol, timeframe, start_ms=None, end_ms=None, random_state=None
+):
+    """Run detect_regimes on indicator columns read from the feature store."""
+    from features.store import INDICATOR_FEATURES
+
+    frame = store.read(
+        INDICATOR_FEATURES,
+        exchange=exchange,
+        symbol=symbol,
+        timeframe=timeframe,
+        start_ms=start_ms,
+        end_ms=end_ms,
+        columns=("log_return", "atr", "volatility"),
+    )
+    df = frame.to_dataframe().dropna()
+    if df.empty:
+        return df.assign(regime=np.empty(0, dtype=int), regime_prob=np.empty(0))
+    return detect_regimes(df, random_state=random_state)
@@ -9,14 +9,27 @@ P0 requirements:
 - Expire due signals before making network requests.
 - Cache market-data requests within this cycle.
 - Never wait for the next scheduled cycle; return after one pass.
+- Feed realized outcomes into the persisted ADWIN drift detectors.
+- Stay within MONITOR_TIME_BUDGET_SECONDS; signals that would miss the
+  deadline are deferred to the next pass.
+- Record per-stage timings and counters of every pass; optionally profile
+  a pass, or one symbol's signals, with cProfile and tracemalloc.
+- With AMBIGUOUS_DRILLDOWN_TIMEFRAME, settle a bar touching both SL and TP
+  from the lower-timeframe candles inside just that bar.
 """
 
+from collections import Counter
 from datetime import datetime, timezone
 
+import metrics
+import profiling
 from adapters.market_data import Candle, MarketDataError, create_market_data_adapter
 from config import CONFIG
+from cycle_scheduler import CycleScheduler, WorkItem
 from db.db_handler import TradingDatabaseHandler
 from notifications.discord import send_discord_outcome
+from outcome_drilldown import AmbiguousBarResolver, level_hits
+from risk.drift_adwin import DriftMonitor
 
 
 def _parse_expiry(value: str) -> datetime:
@@ -32,6 +45,7 @@ def _evaluate_signal(
     signal: dict,
     candles: list[Candle],
     now: datetime,
+    resolver: AmbiguousBarResolver | None = None,
 ) -> str:
     """Evaluate one signal against closed post-entry candles."""
     expires_at = _parse_expiry(signal["expires_at"])
@@ -42,21 +56,25 @@ def _evaluate_signal(
         if candle.close_datetime > expires_at:
             continue
 
-        if signal["signal_type"] == "LONG":
-            hit_sl = candle.low <= signal["sl"]
-            hit_tp = candle.high >= signal["tp"]
-        else:
-            hit_sl = candle.high >= signal["sl"]
-            hit_tp = candle.low <= signal["tp"]
+        hit_sl, hit_tp = level_hits(signal, candle)
+        outcome_at = candle.close_datetime
 
         # OHLCV cannot establish whether SL or TP happened first inside one
-        # candle, so do not invent an ordering.
+        # candle, so do not invent an ordering; only the lower-timeframe
+        # candles of that bar may settle it.
+        if hit_sl and hit_tp and resolver is not None:
+            resolved = resolver.resolve(signal, candle)
+            if resolved is not None:
+                outcome, lower_candle = resolved
+                hit_sl, hit_tp = outcome == "STOP_LOSS", outcome == "TAKE_PROFIT"
+                outcome_at = lower_candle.close_datetime
+
         if hit_sl and hit_tp:
             db.mark_signal_outcome(
                 signal["id"],
                 outcome="AMBIGUOUS",
                 outcome_price=None,
-                outcome_at=candle.close_datetime.isoformat(),
+                outcome_at=outcome_at.isoformat(),
                 status="CLOSED_AMBIGUOUS",
             )
             return "ambiguous"
@@ -66,16 +84,17 @@ def _evaluate_signal(
                 signal["id"],
                 outcome="STOP_LOSS",
                 outcome_price=signal["sl"],
-                outcome_at=candle.close_datetime.isoformat(),
+                outcome_at=outcome_at.isoformat(),
                 status="CLOSED",
             )
             if CONFIG.discord_webhook:
-                send_discord_outcome(
-                    CONFIG.discord_webhook,
-                    signal,
-                    "STOP_LOSS",
-                    signal["sl"],
-                )
+                with metrics.span("discord", signal["symbol"]):
+                    send_discord_outcome(
+                        CONFIG.discord_webhook,
+                        signal,
+                        "STOP_LOSS",
+                        signal["sl"],
+                    )
             return "closed"
 
         if hit_tp:
@@ -83,16 +102,17 @@ def _evaluate_signal(
                 signal["id"],
                 outcome="TAKE_PROFIT",
                 outcome_price=signal["tp"],
-                outcome_at=candle.close_datetime.isoformat(),
+                outcome_at=outcome_at.isoformat(),
                 status="CLOSED",
             )
             if CONFIG.discord_webhook:
-                send_discord_outcome(
-                    CONFIG.discord_webhook,
-                    signal,
-                    "TAKE_PROFIT",
-                    signal["tp"],
-                )
+                with metrics.span("discord", signal["symbol"]):
+                    send_discord_outcome(
+                        CONFIG.discord_webhook,
+                        signal,
+                        "TAKE_PROFIT",
+                        signal["tp"],
+                    )
             return "closed"
 
     if now >= expires_at:
@@ -110,24 +130,57 @@ def _evaluate_signal(
 
 def check_outcomes() -> None:
     """Run exactly one bounded monitoring pass and then exit."""
+    with metrics.instrumented(
+        "monitor",
+        enabled=CONFIG.metrics_enabled,
+        db_path=CONFIG.db_path,
+        output_dir=CONFIG.metrics_dir,
+    ), profiling.profiled(
+        "monitor",
+        output_dir=CONFIG.profile_dir,
+        symbol=CONFIG.profile_symbol,
+        top_allocations=CONFIG.profile_top_allocations,
+        memory_budget_mb=CONFIG.profile_memory_budget_mb,
+    ):
+        _check_outcomes()
+
+
+def _check_outcomes() -> None:
+    scheduler = CycleScheduler(
+        CONFIG.monitor_time_budget_seconds,
+        reserve_seconds=CONFIG.cycle_reserve_seconds,
+    )
     db = TradingDatabaseHandler(CONFIG.db_path)
     now = datetime.now(timezone.utc)
 
     # Expire stale rows before reading active signals. This prevents old
     # signals from causing unnecessary exchange requests and makes expiry
     # deterministic even when no new scheduler cycle has run recently.
-    expired_before_fetch = db.expire_due_signals(now)
+    with metrics.span("expire"):
+        expired_before_fetch = db.expire_due_signals(now)
     active_signals = db.get_active_signals()
 
     if not active_signals:
+        metrics.count("expired", expired_before_fetch)
         print(
             "✅ Outcome monitor finished: no active signals to monitor; "
             f"expired_before_fetch={expired_before_fetch}"
         )
         return
 
-    adapter = create_market_data_adapter(CONFIG.market_data_exchange_id)
+    adapter = create_market_data_adapter(
+        CONFIG.market_data_exchange_id,
+        CONFIG.market_data_hedge_exchanges,
+        CONFIG.market_data_hedge_percentile,
+    )
     candle_cache: dict[tuple[str, str], list[Candle]] = {}
+    resolver = (
+        AmbiguousBarResolver(
+            adapter, timeframe=CONFIG.ambiguous_drilldown_timeframe, db=db
+        )
+        if CONFIG.ambiguous_drilldown_timeframe
+        else None
+    )
 
     closed_count = 0
     expired_count = expired_before_fetch
@@ -135,74 +188,124 @@ def check_outcomes() -> None:
     pending_count = 0
     errors = 0
 
-    for signal_row in active_signals:
-        signal = dict(signal_row)
-
-        try:
-            if not bool(signal["candle_closed"]):
-                db.mark_signal_outcome(
-                    signal["id"],
-                    outcome="REJECTED_DATA",
-                    outcome_price=None,
-                    outcome_at=now.isoformat(),
-                    status="REJECTED",
-                )
-                continue
-
-            expires_at = _parse_expiry(signal["expires_at"])
-            if now >= expires_at:
-                db.mark_signal_outcome(
-                    signal["id"],
-                    outcome="EXPIRED",
-                    outcome_price=None,
-                    outcome_at=now.isoformat(),
-                    status="EXPIRED",
+    signals = {str(row["id"]): dict(row) for row in active_signals}
+    open_signals = Counter(signal["symbol"] for signal in signals.values())
+    weights = dict(CONFIG.symbol_priority)
+    try:
+        activity = db.get_symbol_activity(
+            exchange=CONFIG.market_data_exchange_id, timeframe=CONFIG.timeframe
+        )
+    except Exception as exc:
+        activity = {}
+        print(f"⚠️ Symbol liquidity unavailable for scheduling: {exc}")
+    work = [
+        WorkItem(
+            key=key,
+            weight=weights.get(signal["symbol"], 1.0),
+            open_signals=open_signals[signal["symbol"]],
+            liquidity=activity.get(signal["symbol"], (0.0, 0))[0],
+        )
+        for key, signal in signals.items()
+    ]
+
+    for item in scheduler.schedule(work):
+        signal = signals[item.key]
+
+        with profiling.symbol(signal["symbol"]):
+            try:
+                if not bool(signal["candle_closed"]):
+                    db.mark_signal_outcome(
+                        signal["id"],
+                        outcome="REJECTED_DATA",
+                        outcome_price=None,
+                        outcome_at=now.isoformat(),
+                        status="REJECTED",
+                    )
+                    continue
+
+                expires_at = _parse_expiry(signal["expires_at"])
+                if now >= expires_at:
+                    db.mark_signal_outcome(
+                        signal["id"],
+                        outcome="EXPIRED",
+                        outcome_price=None,
+                        outcome_at=now.isoformat(),
+                        status="EXPIRED",
+                    )
+                    expired_count += 1
+                    continue
+
+                cache_key = (signal["symbol"], signal["timeframe"])
+                if cache_key not in candle_cache:
+                    with metrics.span("fetch", signal["symbol"]):
+                        candle_cache[cache_key] = adapter.fetch_closed_ohlcv(
+                            signal["symbol"],
+                            signal["timeframe"],
+                            CONFIG.ohlcv_limit,
+                        )
+
+                with metrics.span("evaluate", signal["symbol"]):
+                    result = _evaluate_signal(
+                        db,
+                        signal,
+                        candle_cache[cache_key],
+                        now,
+                        resolver,
+                    )
+
+                if result == "closed":
+                    closed_count += 1
+                elif result == "expired":
+                    expired_count += 1
+                elif result == "ambiguous":
+                    ambiguous_count += 1
+                elif result == "pending":
+                    pending_count += 1
+
+            except (MarketDataError, ValueError, TypeError, KeyError) as exc:
+                errors += 1
+                print(
+                    f"❌ Error monitoring signal {signal['id']} "
+                    f"{signal['symbol']}: {exc}"
                 )
-                expired_count += 1
-                continue
-
-            cache_key = (signal["symbol"], signal["timeframe"])
-            if cache_key not in candle_cache:
-                candle_cache[cache_key] = adapter.fetch_closed_ohlcv(
-                    signal["symbol"],
-                    signal["timeframe"],
-                    CONFIG.ohlcv_limit,
+            except Exception as exc:
+                errors += 1
+                print(
+                    f"❌ Unexpected error monitoring signal {signal['id']} "
+                    f"{signal['symbol']}: {exc}"
                 )
 
-            result = _evaluate_signal(
-                db,
-                signal,
-                candle_cache[cache_key],
-                now,
-            )
+    if scheduler.deferred:
+        print(
+            f"⚠️ Monitor budget reached; deferred {len(scheduler.deferred)} "
+            f"signal(s) to the next pass: {', '.join(scheduler.deferred)}"
+        )
 
-            if result == "closed":
-                closed_count += 1
-            elif result == "expired":
-                expired_count += 1
-            elif result == "ambiguous":
-                ambiguous_count += 1
-            elif result == "pending":
-                pending_count += 1
-
-        except (MarketDataError, ValueError, TypeError, KeyError) as exc:
-            errors += 1
-            print(
-                f"❌ Error monitoring signal {signal['id']} "
-                f"{signal['symbol']}: {exc}"
-            )
-        except Exception as exc:
-            errors += 1
-            print(
-                f"❌ Unexpected error monitoring signal {signal['id']} "
-                f"{signal['symbol']}: {exc}"
-            )
+    # Feed this pass's realized outcomes into the persisted drift detectors so
+    # the next trainer cycle knows which symbols need a full refit.
+    try:
+        with metrics.span("drift"):
+            drifted = DriftMonitor(db).ingest()
+    except Exception as exc:
+        drifted = set()
+        errors += 1
+        print(f"❌ Drift monitoring error: {exc}")
 
+    summary = {
+        "closed": closed_count,
+        "expired": expired_count,
+        "ambiguous": ambiguous_count,
+        "drilled_down": resolver.resolved if resolver else 0,
+        "pending": pending_count,
+        "deferred": len(scheduler.deferred),
+        "drifted": len(drifted),
+        "errors": errors,
+    }
+    for name, value in summary.items():
+        metrics.count(name, value)
     print(
         "✅ Outcome monitor finished: "
-        f"closed={closed_count}, expired={expired_count}, "
-        f"ambiguous={ambiguous_count}, pending={pending_count}, "
-        f"errors={errors}"
+        + ", ".join(f"{name}={value}" for name, value in summary.items())
     )
 
 
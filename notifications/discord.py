@@ -4,13 +4,13 @@ from __future__ import annotations
 
 from typing import Mapping, Any
 
-import requests
-
 
 REQUEST_TIMEOUT_SECONDS = 10
 
 
 def _post(webhook_url: str, payload: dict[str, Any]) -> None:
+    import requests
+
     response = requests.post(
         webhook_url,
         json=payload,
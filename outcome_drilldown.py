@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+"""Resolve ambiguous SL/TP bars from lower-timeframe candles.
+
+A signal-timeframe candle whose range covers both the stop and the target
+cannot say which was touched first. ``AmbiguousBarResolver`` looks inside just
+that bar: it reads the lower-timeframe candles spanning it from the local
+``candles`` table or fetches them in one range request, stores what it
+fetched, and walks them in order. The first lower candle touching exactly one
+level decides the outcome; a lower candle touching both, no candle touching
+either, or a gapped or partial set of lower candles leaves the bar ambiguous.
+
+Candles are cached per (symbol, bar), so signals sharing an ambiguous bar
+cost a single request per monitoring pass.
+"""
+
+from typing import TYPE_CHECKING, Any, Mapping
+
+import metrics
+from adapters.market_data import Candle, timeframe_to_ms
+
+if TYPE_CHECKING:
+    from adapters.market_data import MarketDataAdapter
+    from db.db_handler import TradingDatabaseHandler
+
+
+def level_hits(signal: Mapping[str, Any], candle: Candle) -> tuple[bool, bool]:
+    """Return ``(hit_sl, hit_tp)`` of one candle for a LONG or SHORT signal."""
+    if signal["signal_type"] == "LONG":
+        return candle.low <= signal["sl"], candle.high >= signal["tp"]
+    return candle.high >= signal["sl"], candle.low <= signal["tp"]
+
+
+class AmbiguousBarResolver:
+    def __init__(
+        self,
+        adapter: MarketDataAdapter,
+        *,
+        timeframe: str = "1m",
+        db: TradingDatabaseHandler | None = None,
+    ) -> None:
+        self.adapter = adapter
+        self.timeframe = timeframe
+        self.timeframe_ms = timeframe_to_ms(timeframe)
+        self.db = db
+        self.fetches = 0
+        self.store_reads = 0
+        self.resolved = 0
+        self._bars: dict[tuple[str, str, int], list[Candle] | None] = {}
+
+    def _complete(self, candles: list[Candle], start_ms: int, expected: int) -> bool:
+        """Every lower candle of the bar, in order: a missing one could hide
+        the minute that touched the other level first."""
+        return len(candles) == expected and all(
+            candle.timestamp_ms == start_ms + index * self.timeframe_ms
+            for index, candle in enumerate(candles)
+        )
+
+    def _stored(
+        self, exchange: str, symbol: str, start_ms: int, end_ms: int, expected: int
+    ) -> list[Candle] | None:
+        if self.db is None:
+            return None
+        candles = self.db.get_candle_array(
+            exchange=exchange,
+            symbol=symbol,
+            timeframe=self.timeframe,
+            start_ms=start_ms,
+            end_ms=end_ms - 1,
+        ).to_candles()
+        return candles if self._complete(candles, start_ms, expected) else None
+
+    def lower_candles(
+        self, symbol: str, timeframe: str, bar_ms: int, *, exchange: str = "bitget"
+    ) -> list[Candle] | None:
+        """Lower-timeframe candles inside one signal bar; None when unavailable."""
+        key = (symbol, timeframe, bar_ms)
+        if key in self._bars:
+            return self._bars[key]
+
+        bar_duration_ms = timeframe_to_ms(timeframe)
+        expected, remainder = divmod(bar_duration_ms, self.timeframe_ms)
+        if expected < 2 or remainder:
+            # Nothing finer to look at, or lower bars straddling the boundary.
+            self._bars[key] = None
+            return None
+
+        end_ms = bar_ms + bar_duration_ms
+        candles = self._stored(exchange, symbol, bar_ms, end_ms, expected)
+        if candles is not None:
+            self.store_reads += 1
+        else:
+            try:
+                with metrics.span("drilldown_fetch", symbol):
+                    candles = self.adapter.fetch_ohlcv_range(
+                        symbol, self.timeframe, bar_ms, end_ms
+                    )
+                # A hedged adapter may have failed over to a secondary.
+                served_by = self.adapter.provenance(symbol)
+                self.fetches += 1
+            except Exception as exc:
+                print(f"⚠️ {self.timeframe} drill-down unavailable for {symbol} @ {bar_ms}: {exc}")
+                candles = None
+            if candles and not self._complete(candles, bar_ms, expected):
+                print(
+                    f"⚠️ Incomplete {self.timeframe} candles for {symbol} @ {bar_ms}: "
+                    f"{len(candles)} of {expected}; bar stays ambiguous"
+                )
+                candles = None
+            if candles and self.db is not None:
+                try:
+                    self.db.store_candles(
+                        exchange=served_by,
+                        symbol=symbol,
+                        timeframe=self.timeframe,
+                        candles=candles,
+                    )
+                except Exception as exc:
+                    print(f"⚠️ {self.timeframe} candles not stored for {symbol}: {exc}")
+        self._bars[key] = candles or None
+        return self._bars[key]
+
+    def resolve(
+        self, signal: Mapping[str, Any], bar: Candle
+    ) -> tuple[str, Candle] | None:
+        """Return the first outcome inside ``bar`` and its lower candle, if any."""
+        candles = self.lower_candles(
+            signal["symbol"],
+            signal["timeframe"],
+            bar.timestamp_ms,
+            exchange=signal.get("exchange") or "bitget",
+        )
+        for candle in candles or ():
+            hit_sl, hit_tp = level_hits(signal, candle)
+            if hit_sl and hit_tp:
+                return None
+            if hit_sl or hit_tp:
+                self.resolved += 1
+                return ("STOP_LOSS" if hit_sl else "TAKE_PROFIT"), candle
+        return None
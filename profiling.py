@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+"""Opt-in cProfile and tracemalloc capture of one trainer or monitor cycle.
+
+With ``PROFILE_DIR`` set, a cycle runs under cProfile and tracemalloc and
+leaves its artifacts in ``<PROFILE_DIR>/<process>-<UTC start>/``:
+
+- ``<section>.pstats``: load with ``python -m pstats`` or snakeviz;
+- ``<section>.allocations.txt``: the top source lines by memory still
+  allocated when the section ended, attributed to the innermost line of
+  this repository (so numpy buffers point at the code that asked for them);
+- ``summary.json``: wall time, peak traced memory and the budget.
+
+``PROFILE_SYMBOL`` narrows the capture to the work of one symbol; every pass
+over it (one per signal in the monitor) accumulates into one section. Only
+the calling thread is profiled, so hedged fetches show up as waits.
+
+``PROFILE_MEMORY_BUDGET_MB`` turns the peak into a gate: after the artifacts
+are written, a section that exceeded it fails the run with
+``MemoryBudgetExceeded``.
+"""
+
+import cProfile
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Iterator
+
+CYCLE_SECTION = "cycle"
+TRACEBACK_FRAMES = 25
+ROOT_DIR = str(Path(__file__).resolve().parent)
+
+
+class MemoryBudgetExceeded(RuntimeError):
+    """Raised after a profiled section's peak traced memory exceeds the budget."""
+
+
+@dataclass
+class _Section:
+    profile: cProfile.Profile = field(default_factory=cProfile.Profile)
+    allocations: dict[str, list[int]] = field(default_factory=dict)
+    passes: int = 0
+    seconds: float = 0.0
+    peak_bytes: int = 0
+
+
+_active: CycleProfiler | None = None
+
+
+class CycleProfiler:
+    def __init__(
+        self,
+        process: str,
+        *,
+        output_dir: str | Path,
+        symbol: str | None = None,
+        top_allocations: int = 25,
+        memory_budget_mb: float | None = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.process = process
+        self.symbol = symbol
+        self.top_allocations = top_allocations
+        self.memory_budget_mb = memory_budget_mb
+        self.clock = clock
+        self.started_at = datetime.now(timezone.utc)
+        self.directory = Path(output_dir) / (
+            f"{process}-{self.started_at:%Y%m%dT%H%M%SZ}"
+        )
+        self.sections: dict[str, _Section] = {}
+
+    @contextmanager
+    def section(self, label: str) -> Iterator[None]:
+        section = self.sections.setdefault(label, _Section())
+        # Respect tracing started elsewhere (PYTHONTRACEMALLOC); only stop
+        # what this section started.
+        owns_tracing = not tracemalloc.is_tracing()
+        if owns_tracing:
+            tracemalloc.start(TRACEBACK_FRAMES)
+        else:
+            tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        started = self.clock()
+        section.profile.enable()
+        try:
+            yield
+        finally:
+            section.profile.disable()
+            section.seconds += self.clock() - started
+            section.passes += 1
+            section.peak_bytes = max(
+                section.peak_bytes, tracemalloc.get_traced_memory()[1] - baseline
+            )
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                (
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, __file__),
+                )
+            )
+            if owns_tracing:
+                tracemalloc.stop()
+            for statistic in snapshot.statistics("traceback"):
+                totals = section.allocations.setdefault(
+                    _allocation_site(statistic.traceback), [0, 0]
+                )
+                totals[0] += statistic.size
+                totals[1] += statistic.count
+
+    @contextmanager
+    def activate(self) -> Iterator[CycleProfiler]:
+        global _active
+        previous, _active = _active, self
+        try:
+            yield self
+        finally:
+            _active = previous
+
+    def over_budget(self) -> dict[str, float]:
+        """Peak MiB of every section above the memory budget."""
+        if not self.memory_budget_mb:
+            return {}
+        peaks = {
+            label: section.peak_bytes / 2**20 for label, section in self.sections.items()
+        }
+        return {
+            label: peak for label, peak in peaks.items() if peak > self.memory_budget_mb
+        }
+
+    def write(self) -> dict[str, Any]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        sections = {}
+        for label, section in self.sections.items():
+            name = _file_label(label)
+            section.profile.dump_stats(self.directory / f"{name}.pstats")
+            top = sorted(
+                section.allocations.items(), key=lambda item: item[1][0], reverse=True
+            )[: self.top_allocations]
+            lines = [
+                f"{site}: size={size / 1024:.1f} KiB, count={count}"
+                for site, (size, count) in top
+            ]
+            (self.directory / f"{name}.allocations.txt").write_text(
+                "\n".join(lines) + "\n", encoding="utf-8"
+            )
+            sections[label] = {
+                "passes": section.passes,
+                "seconds": section.seconds,
+                "peak_mb": section.peak_bytes / 2**20,
+            }
+        summary = {
+            "process": self.process,
+            "started_at": self.started_at.isoformat(),
+            "symbol": self.symbol,
+            "memory_budget_mb": self.memory_budget_mb,
+            "sections": sections,
+            "over_budget": sorted(self.over_budget()),
+        }
+        (self.directory / "summary.json").write_text(
+            json.dumps(summary, indent=2), encoding="utf-8"
+        )
+        return summary
+
+
+def symbol(name: str) -> ContextManager[None]:
+    """Profile this pass if it belongs to the configured ``PROFILE_SYMBOL``."""
+    profiler = _active
+    if profiler is None or profiler.symbol is None or profiler.symbol != name:
+        return nullcontext()
+    return profiler.section(name)
+
+
+def _allocation_site(traceback: tracemalloc.Traceback) -> str:
+    # Frames run oldest to newest; report the newest one in this repository.
+    for frame in reversed(traceback):
+        if frame.filename.startswith(ROOT_DIR):
+            return f"{frame.filename}:{frame.lineno}"
+    frame = traceback[-1]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+def _file_label(label: str) -> str:
+    return "".join(char if char.isalnum() or char in "-_." else "-" for char in label)
+
+
+@contextmanager
+def profiled(
+    process: str,
+    *,
+    output_dir: str | Path | None,
+    symbol: str | None = None,
+    top_allocations: int = 25,
+    memory_budget_mb: float | None = None,
+) -> Iterator[CycleProfiler | None]:
+    """Profile one cycle, or only ``symbol``'s passes, when a directory is set."""
+    if output_dir is None:
+        yield None
+        return
+
+    profiler = CycleProfiler(
+        process,
+        output_dir=output_dir,
+        symbol=symbol,
+        top_allocations=top_allocations,
+        memory_budget_mb=memory_budget_mb,
+    )
+    try:
+        with profiler.activate():
+            if symbol is None:
+                with profiler.section(CYCLE_SECTION):
+                    yield profiler
+            else:
+                yield profiler
+    finally:
+        try:
+            profiler.write()
+        except Exception as exc:
+            # Losing a profile must never fail the cycle.
+            print(f"⚠️ Profile not written: {exc}")
+        else:
+            if symbol is not None and symbol not in profiler.sections:
+                print(f"⚠️ Profiled symbol {symbol} was not processed this cycle")
+            print(f"ℹ️ Profile written to {profiler.directory}")
+
+    exceeded = profiler.over_budget()
+    if exceeded:
+        details = ", ".join(f"{label}={peak:.1f} MiB" for label, peak in exceeded.items())
+        raise MemoryBudgetExceeded(
+            f"Peak traced memory above the {memory_budget_mb:g} MiB budget: {details}"
+        )
@@ -1,4 +1,20 @@
-def fractional_kelly(p, avg_win, avg_loss, fraction=0.25):
-    b = avg_win / avg_loss
+import numpy as np
+
+
+def fractional_kelly_array(p, avg_win, avg_loss, fraction=0.25):
+    """Vectorized fractional Kelly; rows without positive win/loss stats get 0."""
+    p, avg_win, avg_loss = np.broadcast_arrays(
+        np.asarray(p, dtype=float),
+        np.asarray(avg_win, dtype=float),
+        np.asarray(avg_loss, dtype=float),
+    )
+    # Without both an observed average win and loss the payoff ratio is
+    # undefined, so no edge has been demonstrated and nothing is staked.
+    valid = (avg_win > 0) & (avg_loss > 0)
+    b = np.where(valid, avg_win / np.where(valid, avg_loss, 1.0), 1.0)
     kelly = (p * b - (1 - p)) / b
-    return max(0.0, kelly * fraction)
+    return np.where(valid, np.maximum(0.0, kelly * fraction), 0.0)
+
+
+def fractional_kelly(p, avg_win, avg_loss, fraction=0.25):
+    return float(fractional_kelly_array(p, avg_win, avg_loss, fraction))
@@ -1,9 +1,192 @@
-from river.drift import ADWIN
+from __future__ import annotations
+
+"""ADWIN drift monitoring over realized signal outcomes.
+
+Each (strategy, symbol, timeframe) owns one ADWIN detector fed with a binary
+error stream: 1.0 for STOP_LOSS, 0.0 for TAKE_PROFIT. Ambiguous, expired and
+rejected outcomes carry no directional information and are skipped.
+
+Detector states and the event cursor live in the canonical database, so the
+hourly monitor and trainer processes continue the same streams. Every
+read-modify-write of them is one database transaction, so sharded trainer
+workers ingesting at the same time never feed an event twice.
+"""
+
+import pickle
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+DRIFT_COMPONENT = "drift_adwin"
+CURSOR_KEY = "__cursor__"
+OUTCOME_ERRORS = {"STOP_LOSS": 1.0, "TAKE_PROFIT": 0.0}
+
+DriftKey = tuple[str, str, str]
+
 
 class DriftDetector:
-    def __init__(self):
-        self.adwin = ADWIN()
+    def __init__(self, delta: float = 0.002):
+        # river takes over a second to import; passes without new outcomes
+        # never build a detector.
+        from river.drift import ADWIN
+
+        self.adwin = ADWIN(delta=delta)
 
     def update(self, error):
         self.adwin.update(error)
         return self.adwin.drift_detected
+
+    def update_many(self, errors: Iterable[float]) -> bool:
+        """Feed a batch of errors; return True if any of them triggered drift."""
+        detected = False
+        for error in errors:
+            self.adwin.update(error)
+            detected = detected or self.adwin.drift_detected
+        return detected
+
+
+@dataclass
+class DriftState:
+    detector: DriftDetector = field(default_factory=DriftDetector)
+    needs_retrain: bool = False
+    observations: int = 0
+    detections: int = 0
+
+
+def _state_key(key: DriftKey) -> str:
+    return "|".join(key)
+
+
+def _parse_state_key(raw: str) -> DriftKey:
+    strategy_id, symbol, timeframe = raw.split("|", 2)
+    return strategy_id, symbol, timeframe
+
+
+class DriftMonitor:
+    """Persisted per-strategy/symbol drift detection with a retrain set."""
+
+    def __init__(self, db, *, delta: float = 0.002, batch_size: int = 1000) -> None:
+        if batch_size <= 0:
+            raise ValueError("batch_size must be greater than zero")
+        self.db = db
+        self.delta = delta
+        self.batch_size = batch_size
+        # Detections seen when needs_retrain last reported each key.
+        self._flagged: dict[DriftKey, int] = {}
+
+    @staticmethod
+    def _decode(raw_states: dict[str, bytes]) -> tuple[int, dict[DriftKey, DriftState]]:
+        cursor = int(raw_states.pop(CURSOR_KEY, b"0").decode("ascii"))
+        states = {
+            _parse_state_key(key): pickle.loads(payload)
+            for key, payload in raw_states.items()
+        }
+        return cursor, states
+
+    def _load(self) -> tuple[int, dict[DriftKey, DriftState]]:
+        return self._decode(self.db.load_component_states(DRIFT_COMPONENT))
+
+    def _update(
+        self,
+        change: Callable[
+            [int, dict[DriftKey, DriftState]], tuple[int, Iterable[DriftKey]]
+        ],
+    ) -> None:
+        """Apply ``change`` to the stored cursor and states under a write lock.
+
+        ``change`` mutates the states in place and returns the new cursor and
+        the keys it touched. Sharded workers run this concurrently; the
+        database serializes them, so no event is fed twice and no worker
+        overwrites another's states.
+        """
+
+        def apply(raw_states: dict[str, bytes]) -> dict[str, bytes]:
+            cursor, states = self._decode(raw_states)
+            new_cursor, keys = change(cursor, states)
+            payloads = {_state_key(key): pickle.dumps(states[key]) for key in keys}
+            if payloads or new_cursor != cursor:
+                payloads[CURSOR_KEY] = str(new_cursor).encode("ascii")
+            return payloads
+
+        self.db.update_component_states(DRIFT_COMPONENT, apply)
+
+    def ingest(self) -> set[DriftKey]:
+        """Consume all new outcome events; return keys that drifted now."""
+        drifted: set[DriftKey] = set()
+        consumed = 0
+
+        def feed_batch(
+            cursor: int, states: dict[DriftKey, DriftState]
+        ) -> tuple[int, Iterable[DriftKey]]:
+            nonlocal consumed
+            events = self.db.get_outcome_events(
+                after_id=cursor, limit=self.batch_size
+            )
+            consumed = len(events)
+
+            batches: dict[DriftKey, list[float]] = {}
+            for event in events:
+                error = OUTCOME_ERRORS.get(event["outcome"])
+                if error is not None:
+                    key = (event["strategy_id"], event["symbol"], event["timeframe"])
+                    batches.setdefault(key, []).append(error)
+                cursor = int(event["id"])
+
+            for key, errors in batches.items():
+                state = states.get(key)
+                if state is None:
+                    state = states[key] = DriftState(DriftDetector(self.delta))
+                state.observations += len(errors)
+                if state.detector.update_many(errors):
+                    state.needs_retrain = True
+                    state.detections += 1
+                    drifted.add(key)
+            return cursor, batches
+
+        # One transaction per batch so a crash never replays consumed events.
+        while True:
+            self._update(feed_batch)
+            if consumed < self.batch_size:
+                break
+
+        return drifted
+
+    def needs_retrain(self, strategy_id: str | None = None) -> set[DriftKey]:
+        _, states = self._load()
+        flagged = {
+            key: state.detections
+            for key, state in states.items()
+            if state.needs_retrain
+            and (strategy_id is None or key[0] == strategy_id)
+        }
+        self._flagged.update(flagged)
+        return set(flagged)
+
+    def acknowledge(self, keys: Iterable[DriftKey]) -> None:
+        """Clear the retrain flag and restart detection after a full refit.
+
+        A key another worker flagged again since ``needs_retrain`` returned
+        it keeps its flag: the refit predates that detection.
+        """
+        keys = set(keys)
+        if not keys:
+            return
+
+        def reset(
+            cursor: int, states: dict[DriftKey, DriftState]
+        ) -> tuple[int, Iterable[DriftKey]]:
+            reset_keys = []
+            for key in keys:
+                previous = states.get(key)
+                detections = previous.detections if previous else 0
+                if detections > self._flagged.get(key, detections):
+                    continue
+                states[key] = DriftState(
+                    DriftDetector(self.delta),
+                    needs_retrain=False,
+                    observations=0,
+                    detections=detections,
+                )
+                reset_keys.append(key)
+            return cursor, reset_keys
+
+        self._update(reset)
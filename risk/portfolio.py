@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+"""Portfolio-level exposure caps from a rolling return covariance.
+
+The covariance over the last ``window`` aligned bars is maintained from
+running sums. Adding a bar and evicting the oldest one costs O(k²) for k
+symbols, independent of the window length. The state is persisted between
+the hourly processes.
+"""
+
+import io
+import json
+from dataclasses import dataclass
+from typing import Mapping, Sequence
+
+import numpy as np
+
+PORTFOLIO_COMPONENT = "portfolio_risk"
+
+
+class RollingCovariance:
+    """Windowed covariance of k return streams with O(k²) updates."""
+
+    def __init__(self, k: int, window: int) -> None:
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        self.window = window
+        self.buffer = np.zeros((window, k))
+        self.position = 0
+        self.count = 0
+        self.total = np.zeros(k)
+        self.cross = np.zeros((k, k))
+        self._updates_since_rebuild = 0
+
+    def update(self, returns: np.ndarray) -> None:
+        returns = np.asarray(returns, dtype=float)
+        if self.count == self.window:
+            evicted = self.buffer[self.position]
+            self.total -= evicted
+            self.cross -= np.outer(evicted, evicted)
+        else:
+            self.count += 1
+
+        self.buffer[self.position] = returns
+        self.total += returns
+        self.cross += np.outer(returns, returns)
+        self.position = (self.position + 1) % self.window
+
+        # Re-derive the sums once per window so add/subtract rounding cannot
+        # accumulate; amortized this is still O(k²) per bar.
+        self._updates_since_rebuild += 1
+        if self._updates_since_rebuild >= self.window:
+            rows = self.buffer[: self.count] if self.count < self.window else self.buffer
+            self.total = rows.sum(axis=0)
+            self.cross = rows.T @ rows
+            self._updates_since_rebuild = 0
+
+    def covariance(self) -> np.ndarray:
+        n = self.count
+        if n < 2:
+            raise ValueError("At least two observations are required.")
+        mean = self.total / n
+        return (self.cross - n * np.outer(mean, mean)) / (n - 1)
+
+    def correlation(self) -> np.ndarray:
+        covariance = self.covariance()
+        std = np.sqrt(np.clip(np.diag(covariance), 0.0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            correlation = covariance / np.outer(std, std)
+        # A flat series has no defined correlation; treat it as fully
+        # correlated with everything so it never lowers the estimated risk.
+        correlation[~np.isfinite(correlation)] = 1.0
+        np.fill_diagonal(correlation, 1.0)
+        return np.clip(correlation, -1.0, 1.0)
+
+
+@dataclass(frozen=True)
+class PortfolioCap:
+    scale: float
+    portfolio_risk_usdt: float
+    cap_usdt: float
+
+
+class PortfolioRiskEngine:
+    """Rolling correlation of symbol log returns plus a cycle-wide risk cap."""
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        *,
+        window: int,
+        min_observations: int | None = None,
+    ) -> None:
+        self.symbols = tuple(symbols)
+        self.index = {symbol: position for position, symbol in enumerate(self.symbols)}
+        self.covariance = RollingCovariance(len(self.symbols), window)
+        # By default the correlation is trusted only over a full window.
+        self.min_observations = window if min_observations is None else min_observations
+        self.last_timestamp_ms = -1
+        self.last_closes = np.full(len(self.symbols), np.nan)
+
+    def ingest(self, closes_by_symbol: Mapping[str, Mapping[int, float]]) -> int:
+        """Add every new bar closed for all symbols; return the bars added.
+
+        ``closes_by_symbol`` maps symbol -> {timestamp_ms: close}. Only bars
+        newer than the last ingested one and present for every symbol count.
+        """
+        if set(closes_by_symbol) != set(self.symbols):
+            return 0
+
+        common = None
+        for closes in closes_by_symbol.values():
+            newer = {ts for ts in closes if ts > self.last_timestamp_ms}
+            common = newer if common is None else common & newer
+        added = 0
+        for timestamp_ms in sorted(common or ()):
+            closes = np.array(
+                [closes_by_symbol[symbol][timestamp_ms] for symbol in self.symbols],
+                dtype=float,
+            )
+            if np.isfinite(self.last_closes).all():
+                self.covariance.update(np.log(closes / self.last_closes))
+                added += 1
+            self.last_closes = closes
+            self.last_timestamp_ms = timestamp_ms
+        return added
+
+    def cap(
+        self,
+        symbols: Sequence[str],
+        directions: np.ndarray,
+        risk_amounts: np.ndarray,
+        cap_usdt: float,
+        *,
+        committed_symbols: Sequence[str] = (),
+        committed_directions: np.ndarray | None = None,
+        committed_risk_amounts: np.ndarray | None = None,
+    ) -> PortfolioCap:
+        """Return the common scale that keeps correlated risk within ``cap_usdt``.
+
+        Risk is ``sqrt(wᵀ C w)`` with ``w`` the signed per-trade risk amounts and
+        ``C`` the rolling correlation. Until ``min_observations`` returns (by
+        default the whole window) exist every trade is assumed to move
+        together, i.e. risk is the plain sum of |w|.
+
+        ``committed_*`` describe exposure that is already persisted (e.g. by
+        another worker of the same cycle) and cannot be rescaled; only the
+        new trades are scaled, so that committed plus scaled new risk fits.
+        """
+        new = np.asarray(directions, dtype=float) * np.asarray(risk_amounts, dtype=float)
+        if len(new) == 0:
+            return PortfolioCap(1.0, 0.0, cap_usdt)
+        committed = (
+            np.asarray(committed_directions, dtype=float)
+            * np.asarray(committed_risk_amounts, dtype=float)
+            if len(committed_symbols)
+            else np.zeros(0)
+        )
+        all_symbols = list(committed_symbols) + list(symbols)
+        old = np.concatenate([committed, np.zeros(len(new))])
+        added = np.concatenate([np.zeros(len(committed)), new])
+
+        known = all(symbol in self.index for symbol in all_symbols)
+        if known and self.covariance.count >= self.min_observations:
+            positions = [self.index[symbol] for symbol in all_symbols]
+            correlation = self.covariance.correlation()[np.ix_(positions, positions)]
+            a = float(added @ correlation @ added)
+            b = float(old @ correlation @ added)
+            c = float(old @ correlation @ old)
+            portfolio_risk = float(np.sqrt(max(a + 2 * b + c, 0.0)))
+            if portfolio_risk <= cap_usdt:
+                return PortfolioCap(1.0, portfolio_risk, cap_usdt)
+            if c >= cap_usdt**2 or a <= 0:
+                return PortfolioCap(0.0, portfolio_risk, cap_usdt)
+            # Largest s with a·s² + 2b·s + c = cap².
+            scale = (-b + np.sqrt(b * b - a * (c - cap_usdt**2))) / a
+        else:
+            committed_risk = float(np.abs(old).sum())
+            new_risk = float(np.abs(added).sum())
+            portfolio_risk = committed_risk + new_risk
+            if portfolio_risk <= cap_usdt:
+                return PortfolioCap(1.0, portfolio_risk, cap_usdt)
+            scale = (cap_usdt - committed_risk) / new_risk
+
+        return PortfolioCap(float(np.clip(scale, 0.0, 1.0)), portfolio_risk, cap_usdt)
+
+    def to_bytes(self) -> bytes:
+        state = self.covariance
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            meta=np.frombuffer(
+                json.dumps(
+                    {
+                        "symbols": self.symbols,
+                        "window": state.window,
+                        "position": state.position,
+                        "count": state.count,
+                        "updates_since_rebuild": state._updates_since_rebuild,
+                        "last_timestamp_ms": self.last_timestamp_ms,
+                    }
+                ).encode("utf-8"),
+                dtype=np.uint8,
+            ),
+            buffer_rows=state.buffer,
+            total=state.total,
+            cross=state.cross,
+            last_closes=self.last_closes,
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "PortfolioRiskEngine":
+        with np.load(io.BytesIO(payload)) as stored:
+            meta = json.loads(stored["meta"].tobytes().decode("utf-8"))
+            engine = cls(meta["symbols"], window=meta["window"])
+            state = engine.covariance
+            state.buffer = stored["buffer_rows"].copy()
+            state.total = stored["total"].copy()
+            state.cross = stored["cross"].copy()
+            state.position = meta["position"]
+            state.count = meta["count"]
+            state._updates_since_rebuild = meta["updates_since_rebuild"]
+            engine.last_timestamp_ms = meta["last_timestamp_ms"]
+            engine.last_closes = stored["last_closes"].copy()
+        return engine
+
+    @classmethod
+    def load(
+        cls,
+        db,
+        state_key: str,
+        symbols: Sequence[str],
+        *,
+        window: int,
+    ) -> "PortfolioRiskEngine":
+        """Load persisted state; a changed universe or window starts fresh."""
+        payload = db.load_component_states(PORTFOLIO_COMPONENT).get(state_key)
+        if payload is not None:
+            engine = cls.from_bytes(payload)
+            if engine.symbols == tuple(symbols) and engine.covariance.window == window:
+                return engine
+        return cls(symbols, window=window)
+
+    def save(self, db, state_key: str) -> None:
+        db.save_component_states(PORTFOLIO_COMPONENT, {state_key: self.to_bytes()})
@@ -1,14 +1,40 @@
 from __future__ import annotations
 
-"""Deterministic risk and position-sizing layer."""
+"""Deterministic risk and position-sizing layer.
+
+The array API is the single implementation of the sizing rules; the scalar
+``calculate_position_size`` is a thin wrapper that raises on rejection.
+"""
 
 from dataclasses import dataclass
 
+import numpy as np
+
 
 class RiskValidationError(ValueError):
     """Raised when a trade cannot satisfy risk constraints."""
 
 
+# Rejection reasons in rule order; the first failing rule wins.
+REJECT_NONE = 0
+REJECT_EQUITY = 1
+REJECT_RISK_FRACTION = 2
+REJECT_PRICES = 3
+REJECT_STOP_DISTANCE = 4
+REJECT_QUANTITY = 5
+
+REJECTION_MESSAGES = {
+    REJECT_EQUITY: (
+        "ACCOUNT_EQUITY_USDT must be greater than zero before a "
+        "position size can be calculated."
+    ),
+    REJECT_RISK_FRACTION: "risk_fraction must be greater than zero and less than one.",
+    REJECT_PRICES: "entry_price and stop_loss must be positive.",
+    REJECT_STOP_DISTANCE: "Entry and stop-loss prices must be different.",
+    REJECT_QUANTITY: "Calculated position quantity is not positive.",
+}
+
+
 @dataclass(frozen=True)
 class PositionSize:
     equity_usdt: float
@@ -20,6 +46,72 @@ class PositionSize:
     quantity: float
 
 
+@dataclass(frozen=True)
+class PositionSizeBatch:
+    """Column-wise sizing results; rejected rows hold NaN amounts."""
+
+    equity_usdt: np.ndarray
+    risk_fraction: np.ndarray
+    risk_amount_usdt: np.ndarray
+    entry_price: np.ndarray
+    stop_loss: np.ndarray
+    stop_distance: np.ndarray
+    quantity: np.ndarray
+    rejection: np.ndarray
+
+    @property
+    def accepted(self) -> np.ndarray:
+        return self.rejection == REJECT_NONE
+
+
+def calculate_position_sizes(
+    *,
+    equity_usdt,
+    risk_fraction,
+    entry_prices,
+    stop_losses,
+) -> PositionSizeBatch:
+    """Vectorized fixed fractional sizing for many hypothetical trades.
+
+    All inputs broadcast against each other. Each row gets the reason code
+    of the first rule it violates, in the same order as the scalar checks.
+    """
+    equity, fraction, entry, stop = np.broadcast_arrays(
+        np.asarray(equity_usdt, dtype=float),
+        np.asarray(risk_fraction, dtype=float),
+        np.asarray(entry_prices, dtype=float),
+        np.asarray(stop_losses, dtype=float),
+    )
+
+    stop_distance = np.abs(entry - stop)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        risk_amount = equity * fraction
+        quantity = risk_amount / stop_distance
+
+    rules = (
+        (REJECT_EQUITY, equity <= 0),
+        (REJECT_RISK_FRACTION, ~((0 < fraction) & (fraction < 1))),
+        (REJECT_PRICES, (entry <= 0) | (stop <= 0)),
+        (REJECT_STOP_DISTANCE, stop_distance <= 0),
+        (REJECT_QUANTITY, quantity <= 0),
+    )
+    rejection = np.zeros(equity.shape, dtype=np.int8)
+    for code, violated in rules:
+        rejection[(rejection == REJECT_NONE) & violated] = code
+
+    rejected = rejection != REJECT_NONE
+    return PositionSizeBatch(
+        equity_usdt=equity,
+        risk_fraction=fraction,
+        risk_amount_usdt=np.where(rejected, np.nan, risk_amount),
+        entry_price=entry,
+        stop_loss=stop,
+        stop_distance=stop_distance,
+        quantity=np.where(rejected, np.nan, quantity),
+        rejection=rejection,
+    )
+
+
 def calculate_position_size(
     *,
     equity_usdt: float,
@@ -36,36 +128,22 @@ def calculate_position_size(
     Leverage is intentionally not part of this calculation. It must never be
     used to increase the account-risk budget.
     """
-    if equity_usdt <= 0:
-        raise RiskValidationError(
-            "ACCOUNT_EQUITY_USDT must be greater than zero before a "
-            "position size can be calculated."
-        )
-
-    if not 0 < risk_fraction < 1:
-        raise RiskValidationError(
-            "risk_fraction must be greater than zero and less than one."
-        )
-
-    if entry_price <= 0 or stop_loss <= 0:
-        raise RiskValidationError("entry_price and stop_loss must be positive.")
-
-    stop_distance = abs(entry_price - stop_loss)
-    if stop_distance <= 0:
-        raise RiskValidationError("Entry and stop-loss prices must be different.")
-
-    risk_amount = equity_usdt * risk_fraction
-    quantity = risk_amount / stop_distance
-
-    if quantity <= 0:
-        raise RiskValidationError("Calculated position quantity is not positive.")
+    batch = calculate_position_sizes(
+        equity_usdt=equity_usdt,
+        risk_fraction=risk_fraction,
+        entry_prices=entry_price,
+        stop_losses=stop_loss,
+    )
+    code = int(batch.rejection)
+    if code != REJECT_NONE:
+        raise RiskValidationError(REJECTION_MESSAGES[code])
 
     return PositionSize(
         equity_usdt=equity_usdt,
         risk_fraction=risk_fraction,
-        risk_amount_usdt=risk_amount,
+        risk_amount_usdt=float(batch.risk_amount_usdt),
         entry_price=entry_price,
         stop_loss=stop_loss,
-        stop_distance=stop_distance,
-        quantity=quantity,
+        stop_distance=float(batch.stop_distance),
+        quantity=float(batch.quantity),
     )
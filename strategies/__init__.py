@@ -0,0 +1 @@
+"""Signal strategy plugins evaluated on shared closed-candle windows."""
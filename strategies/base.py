@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+"""Strategy plugin contract.
+
+A strategy turns one symbol's closed-candle window into at most one proposed
+signal. Market-data access, expiry, account-risk sizing, the cycle-wide
+filters and persistence belong to the cycle, so every strategy is evaluated
+on the same fetched candles and under the same risk rules.
+"""
+
+from dataclasses import dataclass
+from typing import Mapping
+
+from adapters.market_data import CandleArray
+from config import RuntimeConfig
+
+
+@dataclass(frozen=True)
+class StrategySignal:
+    """Direction and price levels proposed for the latest closed candle."""
+
+    side: str
+    confidence: float
+    entry: float
+    stop_loss: float
+    take_profit: float
+    predicted_magnitude: float
+    # Inputs for the optional meta-labeling filter; None skips the filter.
+    meta_features: tuple[float, ...] | None = None
+
+
+class Strategy:
+    """Base class for registered strategies.
+
+    ``begin_cycle`` and ``end_cycle`` run once per cycle around all
+    ``evaluate`` calls and are the place to load and persist model state.
+    """
+
+    strategy_id: str
+
+    def __init__(self, config: RuntimeConfig) -> None:
+        self.config = config
+
+    def begin_cycle(self, db) -> None:
+        pass
+
+    def evaluate(self, symbol: str, candles: CandleArray) -> StrategySignal | None:
+        raise NotImplementedError
+
+    def end_cycle(self, db) -> None:
+        pass
+
+    def cycle_stats(self) -> Mapping[str, int]:
+        """Strategy-specific counters for the cycle summary."""
+        return {}
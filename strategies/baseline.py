@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+"""The baseline ML strategy: SGD direction and magnitude models per symbol.
+
+Under ``RETRAIN_POLICY=drift`` each symbol's fitted models are persisted and
+reused until ADWIN flags a shift in its realized error stream (or no model
+exists yet); ``always`` refits every symbol on every cycle. With
+``MODEL_CACHE_DIR`` set, a refit over a window identical to an earlier one
+returns that fit's models and outputs from the shared on-disk cache. With
+``FEATURE_STORE_DIR`` set, window features are read from the ``baseline``
+feature set the cycle has just appended instead of being recomputed.
+"""
+
+import math
+import pickle
+
+import numpy as np
+
+import metrics
+from adapters.market_data import CandleArray
+from config import RuntimeConfig
+from features.store import BASELINE_FEATURES, FeatureStore
+from models.baseline import (
+    FEATURE_SET,
+    BaselineModels,
+    baseline_features,
+    baseline_hyperparameters,
+    fit_baseline_models,
+    predict_baseline,
+    signal_levels,
+)
+from models.model_cache import ModelCache, window_key
+from risk.drift_adwin import DriftMonitor
+from strategies.base import Strategy, StrategySignal
+from strategies.registry import register_strategy
+
+MODEL_COMPONENT = "baseline_models"
+
+
+@register_strategy
+class BaselineStrategy(Strategy):
+    strategy_id = "baseline_ml_v1"
+
+    def __init__(self, config: RuntimeConfig) -> None:
+        super().__init__(config)
+        # Registered as baseline_ml_v1, persisted under the STRATEGY_ID label.
+        self.strategy_id = config.strategy_id
+
+    def model_state_key(self, symbol: str) -> str:
+        return f"{self.strategy_id}|{symbol}|{self.config.timeframe}"
+
+    def _drift_key(self, symbol: str) -> tuple[str, str, str]:
+        return (self.strategy_id, symbol, self.config.timeframe)
+
+    def begin_cycle(self, db) -> None:
+        self.stored_models: dict[str, BaselineModels] = {}
+        self.retrain_keys: set[tuple[str, str, str]] = set()
+        self.refitted: dict[str, BaselineModels] = {}
+        self.state_errors = 0
+        self.drift_monitor = DriftMonitor(db)
+        self.model_cache = (
+            ModelCache(
+                self.config.model_cache_dir,
+                max_bytes=int(self.config.model_cache_max_mb * 2**20),
+            )
+            if self.config.model_cache_dir is not None
+            else None
+        )
+        self.cache_hits = 0
+        self.feature_store = (
+            FeatureStore(self.config.feature_store_dir)
+            if self.config.feature_store_dir is not None
+            else None
+        )
+        self.feature_store_reads = 0
+        if self.config.retrain_policy != "drift":
+            return
+        try:
+            self.drift_monitor.ingest()
+            self.retrain_keys = self.drift_monitor.needs_retrain(self.strategy_id)
+            self.stored_models = self._load_stored_models(db)
+        except Exception as exc:
+            self.state_errors += 1
+            self.stored_models = {}
+            print(f"❌ Drift state error; refitting all symbols: {exc}")
+
+    def _load_stored_models(self, db) -> dict[str, BaselineModels]:
+        """Load persisted per-symbol models; unreadable blobs are simply refitted."""
+        stored: dict[str, BaselineModels] = {}
+        for key, payload in db.load_component_states(MODEL_COMPONENT).items():
+            if not key.startswith(f"{self.strategy_id}|"):
+                continue
+            try:
+                stored[key] = BaselineModels(*pickle.loads(payload))
+            except Exception as exc:
+                print(f"⚠️ Discarding unreadable model state {key}: {exc}")
+        return stored
+
+    def window_features(self, symbol: str, candles: CandleArray) -> np.ndarray:
+        """The window's ``[ret, vol]`` matrix, from the feature store if it has it."""
+        if self.feature_store is not None:
+            frame = self.feature_store.read_window(
+                BASELINE_FEATURES,
+                exchanges=(
+                    self.config.market_data_exchange_id,
+                    *self.config.market_data_hedge_exchanges,
+                ),
+                symbol=symbol,
+                timeframe=self.config.timeframe,
+                timestamp_ms=candles.timestamp_ms,
+            )
+            if frame is not None:
+                self.feature_store_reads += 1
+                features = frame.matrix(BASELINE_FEATURES.columns)
+                # Inside the window the first candle has no previous close.
+                features[0, 0] = 0.0
+                return features
+        return baseline_features(candles.close, candles.high, candles.low)
+
+    def predict(
+        self, symbol: str, candles: CandleArray
+    ) -> tuple[float, float, np.ndarray]:
+        """Return ``(probability_up, predicted_magnitude, latest_features)``."""
+        features = self.window_features(symbol, candles)
+        models = None
+        if self._drift_key(symbol) not in self.retrain_keys:
+            models = self.stored_models.get(self.model_state_key(symbol))
+        refit = models is None
+        if refit:
+            models, probability_up, predicted_magnitude = self._fit(symbol, features)
+        else:
+            probability_up, predicted_magnitude = predict_baseline(models, features[-1])
+
+        if not (
+            math.isfinite(probability_up)
+            and math.isfinite(predicted_magnitude)
+            and 0.0 <= probability_up <= 1.0
+        ):
+            raise ValueError(
+                f"Non-finite model output for {symbol}: "
+                f"probability={probability_up}, magnitude={predicted_magnitude}"
+            )
+        if refit:
+            self.refitted[symbol] = models
+        return probability_up, predicted_magnitude, features[-1]
+
+    def _fit(
+        self, symbol: str, features: np.ndarray
+    ) -> tuple[BaselineModels, float, float]:
+        """Fit on the window, or reuse the cached fit of an identical window."""
+        cache = self.model_cache
+        if cache is not None:
+            key = window_key(
+                features,
+                feature_set=FEATURE_SET,
+                hyperparameters=baseline_hyperparameters(),
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                self.cache_hits += 1
+                metrics.count("model_cache_hits")
+                scaler, classifier, regressor, probability_up, magnitude = cached
+                return BaselineModels(scaler, classifier, regressor), probability_up, magnitude
+
+        with metrics.span("model_fit", symbol):
+            models = fit_baseline_models(features)
+        probability_up, predicted_magnitude = predict_baseline(models, features[-1])
+        if cache is not None:
+            try:
+                cache.put(
+                    key,
+                    (
+                        models.scaler,
+                        models.classifier,
+                        models.regressor,
+                        probability_up,
+                        predicted_magnitude,
+                    ),
+                )
+            except OSError as exc:
+                print(f"⚠️ Model cache write failed for {symbol}: {exc}")
+        return models, probability_up, predicted_magnitude
+
+    def evaluate(self, symbol: str, candles: CandleArray) -> StrategySignal:
+        probability_up, predicted_magnitude, latest = self.predict(symbol, candles)
+        entry = float(candles.close[-1])
+        is_long, confidence, stop_loss, take_profit = signal_levels(
+            entry,
+            probability_up,
+            predicted_magnitude,
+            min_stop_distance_pct=self.config.min_stop_distance_pct,
+            reward_risk_ratio=self.config.reward_risk_ratio,
+        )
+        ret, vol = latest
+        return StrategySignal(
+            side="LONG" if is_long else "SHORT",
+            confidence=float(confidence),
+            entry=entry,
+            stop_loss=float(stop_loss),
+            take_profit=float(take_profit),
+            predicted_magnitude=predicted_magnitude,
+            meta_features=(probability_up, predicted_magnitude, float(ret), float(vol)),
+        )
+
+    def end_cycle(self, db) -> None:
+        if self.config.retrain_policy != "drift" or not self.refitted:
+            return
+        db.save_component_states(
+            MODEL_COMPONENT,
+            {
+                self.model_state_key(symbol): pickle.dumps(
+                    (models.scaler, models.classifier, models.regressor)
+                )
+                for symbol, models in self.refitted.items()
+            },
+        )
+        self.drift_monitor.acknowledge(
+            self._drift_key(symbol)
+            for symbol in self.refitted
+            if self._drift_key(symbol) in self.retrain_keys
+        )
+
+    def cycle_stats(self) -> dict[str, int]:
+        stats = {"refitted": len(self.refitted), "errors": self.state_errors}
+        if self.model_cache is not None:
+            stats["model_cache_hits"] = self.cache_hits
+        if self.feature_store is not None:
+            stats["feature_store_reads"] = self.feature_store_reads
+        return stats
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+"""Registry mapping strategy ids to plugin classes."""
+
+import importlib
+
+from config import RuntimeConfig
+from strategies.base import Strategy
+
+BUILTIN_STRATEGY_MODULES = ("strategies.baseline",)
+
+_REGISTRY: dict[str, type[Strategy]] = {}
+
+
+def register_strategy(cls: type[Strategy]) -> type[Strategy]:
+    """Class decorator adding a strategy under its ``strategy_id``."""
+    existing = _REGISTRY.get(cls.strategy_id)
+    if existing is not None and existing is not cls:
+        raise ValueError(f"Strategy '{cls.strategy_id}' is already registered.")
+    _REGISTRY[cls.strategy_id] = cls
+    return cls
+
+
+def registered_strategies() -> tuple[str, ...]:
+    for module in BUILTIN_STRATEGY_MODULES:
+        importlib.import_module(module)
+    return tuple(sorted(_REGISTRY))
+
+
+def create_strategies(config: RuntimeConfig) -> list[Strategy]:
+    """Instantiate every strategy named in ``config.strategy_ids``."""
+    available = registered_strategies()
+    unknown = [
+        strategy_id for strategy_id in config.strategy_ids
+        if strategy_id not in _REGISTRY
+    ]
+    if unknown:
+        raise ValueError(
+            f"Unknown strategy id(s) {', '.join(unknown)}. "
+            f"Registered: {', '.join(available)}"
+        )
+    return [_REGISTRY[strategy_id](config) for strategy_id in config.strategy_ids]
@@ -0,0 +1,9 @@
+import pytest
+
+from tests.helpers import register_test_strategies
+
+
+@pytest.fixture
+def test_strategies():
+    """Register the ``test_fixed_long`` and ``test_broken`` strategies."""
+    register_test_strategies()
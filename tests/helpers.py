@@ -0,0 +1,122 @@
+"""Fakes and data builders shared by several test modules."""
+
+import math
+import time
+
+import numpy as np
+
+from adapters.market_data import Candle, CandleArray, MarketDataAdapter
+from strategies.base import Strategy, StrategySignal
+from strategies.registry import register_strategy
+
+HOUR_MS = 3_600_000
+
+
+class FixedLongStrategy(Strategy):
+    strategy_id = "test_fixed_long"
+
+    def evaluate(self, symbol, candles):
+        entry = float(candles.close[-1])
+        return StrategySignal(
+            side="LONG",
+            confidence=0.6,
+            entry=entry,
+            stop_loss=entry * 0.99,
+            take_profit=entry * 1.02,
+            predicted_magnitude=0.01,
+        )
+
+
+class BrokenStrategy(Strategy):
+    strategy_id = "test_broken"
+
+    def evaluate(self, symbol, candles):
+        raise RuntimeError("boom")
+
+
+def register_test_strategies():
+    """Make ``test_fixed_long`` and ``test_broken`` available to the registry."""
+    register_strategy(FixedLongStrategy)
+    register_strategy(BrokenStrategy)
+
+
+class CountingAdapter(MarketDataAdapter):
+    """Closed 1h candles ending at the last closed hour; records every fetch."""
+
+    exchange_id = "bitget"
+
+    def __init__(self):
+        self.fetches = []
+
+    def fetch_closed_ohlcv(self, symbol, timeframe, limit):
+        self.fetches.append(symbol)
+        latest = int(time.time() * 1000) // HOUR_MS * HOUR_MS - HOUR_MS
+        closes = [100 * (1 + 0.01 * math.sin(i * 1.7)) for i in range(limit + 1)]
+        return [
+            Candle(
+                latest - (limit - 1 - i) * HOUR_MS,
+                closes[i],
+                max(closes[i], closes[i + 1]) * 1.003,
+                min(closes[i], closes[i + 1]) * 0.997,
+                closes[i + 1],
+                1.0,
+            )
+            for i in range(limit)
+        ]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def synthetic_candles(count=80, seed=11):
+    """Hour-aligned random walk with realistic intrabar ranges."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(scale=0.01, size=count))
+    open_ = np.concatenate([[100.0], close[:-1]])
+    high = np.maximum(open_, close) * (1 + rng.uniform(0.0005, 0.012, size=count))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0.0005, 0.012, size=count))
+    timestamps = 1_700_000_000_000 // HOUR_MS * HOUR_MS + np.arange(count) * HOUR_MS
+    return CandleArray.from_rows(
+        zip(timestamps, open_, high, low, close, np.ones(count))
+    )
+
+
+def indicator_candles(count=240, seed=3):
+    """Random walk with fixed 0.2% wicks, for indicator comparisons."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(scale=0.01, size=count))
+    open_ = np.concatenate([[100.0], close[:-1]])
+    high = np.maximum(open_, close) * 1.002
+    low = np.minimum(open_, close) * 0.998
+    timestamps = 1_700_000_000_000 + np.arange(count) * 3_600_000
+    return CandleArray.from_rows(zip(timestamps, open_, high, low, close, np.ones(count)))
+
+
+def insert_signal(db, index, status="ACTIVE"):
+    """Insert signal ``index`` on its own symbol ``S<index>/USDT``."""
+    return db.insert_signal(
+        {
+            "signal_key": f"key-{index}",
+            "timestamp": f"2026-01-01T00:{index:02d}:00+00:00",
+            "symbol": f"S{index}/USDT",
+            "signal_type": "LONG",
+            "timeframe": "1h",
+            "strategy_id": "baseline_ml_v1",
+            "candle_timestamp_ms": index,
+            "candle_closed": 1,
+            "entry": 100.0,
+            "sl": 99.0,
+            "tp": 102.0,
+            "confidence": 0.6,
+            "outcome": "PENDING",
+            "created_at": "2026-01-01T00:00:00+00:00",
+            "expires_at": "2026-01-01T05:00:00+00:00",
+            "status": status,
+            "exchange": "bitget",
+        }
+    )
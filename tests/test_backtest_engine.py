@@ -0,0 +1,110 @@
+from dataclasses import replace
+from datetime import datetime, timezone
+
+import pytest
+
+import monitor_trades
+import trainer_daemon
+from backtest.engine import (
+    OUTCOME_LABELS,
+    backtest_symbol,
+    predict_series,
+    run_backtest,
+)
+from config import CONFIG
+from db.db_handler import TradingDatabaseHandler
+from strategies.baseline import BaselineStrategy
+from tests.helpers import HOUR_MS, synthetic_candles
+
+
+class _RecordingDb:
+    def __init__(self):
+        self.outcomes = []
+
+    def mark_signal_outcome(self, signal_id, **kwargs):
+        self.outcomes.append(kwargs)
+
+
+def test_predictions_match_live_training_windows():
+    candles = synthetic_candles()
+    predictions = predict_series(candles, ohlcv_limit=30)
+    strategy = BaselineStrategy(replace(CONFIG, retrain_policy="always"))
+    strategy.begin_cycle(db=None)
+
+    for position in (0, 17, len(predictions.index) - 1):
+        end = int(predictions.index[position])
+        expected = strategy.predict("BTC/USDT", candles[end - 29 : end + 1])
+
+        assert predictions.probability_up[position] == pytest.approx(expected[0])
+        assert predictions.predicted_magnitude[position] == pytest.approx(expected[1])
+
+
+def test_outcomes_match_monitor_evaluation():
+    candles = synthetic_candles()
+    config = replace(
+        CONFIG,
+        ohlcv_limit=30,
+        signal_validity_bars=2,
+        min_stop_distance_pct=0.004,
+        account_equity_usdt=10_000,
+    )
+    result = backtest_symbol("BTC/USDT", candles, config)
+    now = datetime.fromtimestamp(
+        (int(candles.timestamp_ms[-1]) + HOUR_MS) / 1000, tz=timezone.utc
+    )
+
+    seen = set()
+    for row in range(len(result.candle_timestamp_ms)):
+        signal_ts = int(result.candle_timestamp_ms[row])
+        db = _RecordingDb()
+        status = monitor_trades._evaluate_signal(
+            db,
+            {
+                "id": row,
+                "symbol": "BTC/USDT",
+                "signal_type": "LONG" if result.is_long[row] else "SHORT",
+                "candle_timestamp_ms": signal_ts,
+                "entry": float(result.entry[row]),
+                "sl": float(result.stop_loss[row]),
+                "tp": float(result.take_profit[row]),
+                "expires_at": trainer_daemon._signal_expiry(
+                    signal_ts, HOUR_MS, config.signal_validity_bars
+                ).isoformat(),
+            },
+            candles.to_candles(),
+            now,
+        )
+
+        expected = db.outcomes[0]["outcome"] if db.outcomes else "PENDING"
+        assert OUTCOME_LABELS[int(result.outcome[row])][0] == expected, status
+        seen.add(expected)
+
+    assert {"TAKE_PROFIT", "STOP_LOSS"} <= seen
+
+
+def test_run_backtest_writes_separate_results_table(tmp_path):
+    db = TradingDatabaseHandler(tmp_path / "trading.db")
+    candles = synthetic_candles(count=50)
+    for symbol in ("BTC/USDT", "ETH/USDT"):
+        db.store_candles(
+            exchange="bitget",
+            symbol=symbol,
+            timeframe="1h",
+            candles=candles.to_candles(),
+        )
+
+    run_id, summary = run_backtest(
+        db,
+        replace(CONFIG, ohlcv_limit=30, market_data_exchange_id="bitget"),
+        symbols=("BTC/USDT", "ETH/USDT"),
+        workers=2,
+    )
+
+    assert summary["signals"] == 2 * (50 - 29)
+    with db._get_connection() as conn:
+        stored = conn.execute(
+            "SELECT COUNT(*) FROM backtest_results WHERE run_id = ?", (run_id,)
+        ).fetchone()[0]
+        live = conn.execute("SELECT COUNT(*) FROM signals").fetchone()[0]
+    assert stored == summary["signals"]
+    assert live == 0
@@ -0,0 +1,59 @@
+import json
+from dataclasses import replace
+
+import pytest
+
+from backtest.engine import backtest_symbol, summarize
+from backtest.sweep import grid, run_sweep, validate_params
+from config import CONFIG
+from db.db_handler import TradingDatabaseHandler
+from tests.helpers import synthetic_candles
+
+
+def test_sweep_matches_engine_and_resumes(tmp_path):
+    db = TradingDatabaseHandler(tmp_path / "trading.db")
+    candles = synthetic_candles(count=60)
+    db.store_candles(
+        exchange="bitget", symbol="BTC/USDT", timeframe="1h", candles=candles.to_candles()
+    )
+    base = replace(CONFIG, market_data_exchange_id="bitget", symbols=("BTC/USDT",))
+    space = {"ohlcv_limit": [25, 30], "reward_risk_ratio": [1.5]}
+
+    results_path = run_sweep(db, grid(space), tmp_path / "sweep", base_config=base, workers=2)
+    first = [json.loads(line) for line in results_path.read_text().splitlines()]
+    assert len(first) == 2
+
+    expected = summarize(
+        [backtest_symbol("BTC/USDT", candles, replace(base, ohlcv_limit=30))]
+    )
+    by_limit = {record["params"]["ohlcv_limit"]: record for record in first}
+    assert by_limit[30]["take_profit"] == expected["take_profit"]
+    assert by_limit[30]["signals"] == expected["signals"]
+
+    space["reward_risk_ratio"].append(2.0)
+    run_sweep(db, grid(space), tmp_path / "sweep", base_config=base, workers=2)
+    keys = [json.loads(line)["key"] for line in results_path.read_text().splitlines()]
+    assert len(keys) == 4
+    assert len(set(keys)) == 4
+
+    # A changed base config or a corrected candle mid-history refuses to resume.
+    space["reward_risk_ratio"].append(3.0)
+    with pytest.raises(ValueError, match="base config changed"):
+        run_sweep(
+            db, grid(space), tmp_path / "sweep",
+            base_config=replace(base, account_equity_usdt=1.0), workers=2,
+        )
+    with db._get_connection() as conn:
+        conn.execute(
+            "UPDATE candles SET close = close * 1.01 WHERE timestamp_ms = ?",
+            (int(candles.timestamp_ms[30]),),
+        )
+    with pytest.raises(ValueError, match="Candle history"):
+        run_sweep(db, grid(space), tmp_path / "sweep", base_config=base, workers=2)
+
+
+def test_sweep_rejects_unknown_or_invalid_fields():
+    with pytest.raises(ValueError):
+        validate_params({"risk_per_trade": 0.5})
+    with pytest.raises(ValueError):
+        validate_params({"ohlcv_limit": 5})
@@ -0,0 +1,47 @@
+import json
+
+import numpy as np
+import pytest
+
+from benchmarks.suite import CASES, compare_to_baseline, main, run_suite
+from benchmarks.synthetic import synthetic_signals, synthetic_universe
+
+
+def test_synthetic_data_is_deterministic_and_well_formed():
+    first = synthetic_universe(3, 200, seed=5)
+    again = synthetic_universe(4, 200, seed=5)
+    for symbol, candles in first.items():
+        np.testing.assert_array_equal(candles.close, again[symbol].close)
+        assert np.all(candles.high >= np.maximum(candles.open, candles.close))
+        assert np.all(candles.low <= np.minimum(candles.open, candles.close))
+        assert np.all(np.diff(candles.timestamp_ms) == 3_600_000)
+
+    signals = synthetic_signals(first, seed=5)
+    assert signals == synthetic_signals(first, seed=5)
+    for signal in signals:
+        low, high = sorted((signal["sl"], signal["tp"]))
+        assert low < signal["entry"] < high
+
+
+def test_suite_reports_every_case_and_flags_throughput_regressions(tmp_path, capsys):
+    run = run_suite(tuple(CASES), (10,))
+    assert [row["case"] for row in run["results"]] == list(CASES)
+    for row in run["results"]:
+        assert row["throughput"] > 0
+        assert row["p50_ms"] <= row["p95_ms"] <= row["p99_ms"]
+
+    faster = json.loads(json.dumps(run))
+    faster["results"][0]["throughput"] *= 2
+    [regression] = compare_to_baseline(run, faster, tolerance=0.25)
+    assert regression.startswith("baseline_models @ 10")
+    assert compare_to_baseline(run, run, tolerance=0.0) == []
+
+    baseline = tmp_path / "baseline.json"
+    args = ["--cases", "insert_signal", "--scales", "10", "--baseline", str(baseline)]
+    main([*args, "--write-baseline"])
+    stored = json.loads(baseline.read_text())
+    stored["results"][0]["throughput"] *= 1_000
+    baseline.write_text(json.dumps(stored))
+    with pytest.raises(SystemExit):
+        main(args)
+    assert "❌ Regression: insert_signal @ 10" in capsys.readouterr().out
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from adapters.candle_archive import (
+    MIN_CAPACITY,
+    CandleArchive,
+    CandleArchiveError,
+    CandleArchiveFile,
+)
+from adapters.market_data import CandleArray
+from tests.helpers import HOUR_MS, synthetic_candles
+
+KEY = dict(exchange="bitget", symbol="BTC/USDT", timeframe="1h")
+
+
+def _assert_same(left: CandleArray, right: CandleArray) -> None:
+    for name in CandleArray.FIELDS:
+        assert np.array_equal(getattr(left, name), getattr(right, name))
+
+
+def test_appends_grow_in_place_and_ranges_use_offsets(tmp_path):
+    candles = synthetic_candles(count=MIN_CAPACITY + 200)
+    archive = CandleArchive(tmp_path / "archive")
+
+    assert archive.append(candles=candles[:600], **KEY) == 600
+    # Overlapping fetch windows only add the bars past the archived tail.
+    assert archive.append(candles=candles[500:900], **KEY) == 300
+    assert archive.append(candles=candles[900:], **KEY) == len(candles) - 900
+
+    archive_file = archive.file(**KEY)
+    header = archive_file.header()
+    assert header.gap_free
+    assert header.capacity == 2 * MIN_CAPACITY
+    _assert_same(archive.read(**KEY), candles)
+
+    start, end = int(candles.timestamp_ms[100]), int(candles.timestamp_ms[199])
+    window = archive.read(start_ms=start - 1, end_ms=end + 1, **KEY)
+    assert isinstance(window.close, np.memmap)
+    _assert_same(window, candles[100:200])
+    assert len(archive.read(start_ms=int(candles.timestamp_ms[-1]) + 1, **KEY)) == 0
+
+
+def test_gaps_fall_back_to_search_and_compaction_merges(tmp_path):
+    candles = synthetic_candles(count=60)
+    gapped = CandleArray(
+        *(
+            np.concatenate([getattr(candles, name)[:20], getattr(candles, name)[30:]])
+            for name in CandleArray.FIELDS
+        )
+    )
+    archive_file = CandleArchiveFile(tmp_path / "btc.candles")
+    archive_file.append(gapped, timeframe_ms=HOUR_MS)
+    assert not archive_file.header().gap_free
+
+    start = int(candles.timestamp_ms[25])
+    _assert_same(archive_file.read(start_ms=start), candles[30:])
+
+    # A backfill of the missing bars restores a gap-free series.
+    rows = archive_file.compact(timeframe_ms=HOUR_MS, merge=candles[15:35], reserve=8)
+    header = archive_file.header()
+    assert rows == 60 and header.gap_free and header.capacity == 68
+    _assert_same(archive_file.read(), candles)
+
+    with pytest.raises(CandleArchiveError):
+        archive_file.append(candles, timeframe_ms=60_000)
@@ -0,0 +1,79 @@
+import numpy as np
+
+from adapters.market_data import CandleArray
+from charts import candle_figure, lttb, ohlc_buckets
+from db.dashboard_data import DashboardDataSource
+from db.db_handler import TradingDatabaseHandler
+from tests.helpers import insert_signal
+
+HOUR_MS = 3_600_000
+
+
+def _history(n):
+    rng = np.random.default_rng(3)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    close[n // 3] *= 1.5  # one spike that must survive downsampling
+    return CandleArray(
+        timestamp_ms=np.arange(n, dtype=np.int64) * HOUR_MS,
+        open=close * 0.999,
+        high=close * 1.01,
+        low=close * 0.99,
+        close=close,
+        volume=np.ones(n),
+    )
+
+
+def test_downsampling_keeps_the_budget_endpoints_and_extremes():
+    candles = _history(50_000)
+
+    keep = lttb(candles.timestamp_ms, candles.close, 800)
+    assert len(keep) == 800
+    assert keep[0] == 0 and keep[-1] == len(candles) - 1
+    assert np.all(np.diff(keep) > 0)
+    assert len(candles) // 3 in keep
+
+    bars = ohlc_buckets(candles, 800)
+    assert len(bars) <= 800
+    assert bars.high.max() == candles.high.max()
+    assert bars.low.min() == candles.low.min()
+    assert bars.open[0] == candles.open[0] and bars.close[-1] == candles.close[-1]
+    assert bars.volume.sum() == candles.volume.sum()
+    assert len(ohlc_buckets(candles[:10], 800)) == 10
+    assert len(lttb(candles.timestamp_ms[:10], candles.close[:10], 800)) == 10
+
+
+def test_chart_reads_a_range_and_overlays_signal_markers(tmp_path):
+    db = TradingDatabaseHandler(tmp_path / "trading.db")
+    candles = _history(5_000)
+    db.store_candles(
+        exchange="bitget", symbol="S1/USDT", timeframe="1h", candles=candles.to_candles()
+    )
+    signal_id = insert_signal(db, 1)
+    db.mark_signal_outcome(
+        signal_id,
+        outcome="TAKE_PROFIT",
+        outcome_price=102.0,
+        outcome_at="2026-01-01T02:00:00+00:00",
+        status="CLOSED",
+    )
+
+    source = DashboardDataSource(db.db_path)
+    assert source.candle_span(exchange="bitget", symbol="S1/USDT", timeframe="1h") == (
+        0,
+        4_999 * HOUR_MS,
+    )
+    window = source.candles(
+        exchange="bitget", symbol="S1/USDT", timeframe="1h", start_ms=0, end_ms=999 * HOUR_MS
+    )
+    assert len(window) == 1_000
+    signals = source.chart_signals(
+        symbol="S1/USDT", timeframe="1h", start_ms=0, end_ms=999 * HOUR_MS
+    )
+    assert [signal["outcome"] for signal in signals] == ["TAKE_PROFIT"]
+
+    figure = candle_figure(window, signals, timeframe_ms=HOUR_MS, max_points=200)
+    names = [trace.name for trace in figure.data]
+    assert names == ["price", "long entry", "SL", "TP", "take_profit"]
+    assert len(figure.data[0].x) <= 200
+    line = candle_figure(window, signals, timeframe_ms=HOUR_MS, max_points=200, style="line")
+    assert len(line.data[0].x) == 200
@@ -0,0 +1,148 @@
+import threading
+import time
+from dataclasses import replace
+
+import pytest
+
+import trainer_daemon
+from cycle_pipeline import staged
+from db.db_handler import TradingDatabaseHandler
+from strategies.registry import register_strategy
+from tests.helpers import CountingAdapter, FixedLongStrategy
+
+
+def test_stages_overlap_under_a_bounded_queue():
+    produced = []
+    lead = []
+
+    def slow_fetch(item):
+        time.sleep(0.05)
+        produced.append(item)
+        return item * 10
+
+    started = time.perf_counter()
+    consumed = []
+    for result in staged(range(6), slow_fetch, depth=2, name="test"):
+        lead.append(len(produced) - len(consumed))
+        time.sleep(0.05)
+        consumed.append(result)
+    elapsed = time.perf_counter() - started
+
+    assert consumed == [0, 10, 20, 30, 40, 50]
+    # Six items through two 50 ms stages: ~0.35 s overlapped, 0.6 s in sequence.
+    assert elapsed < 0.5
+    # Backpressure: the worker never gets further ahead than the queue allows.
+    assert max(lead) <= 2 + 1
+
+    callers = set()
+    inline = staged(
+        range(3), lambda item: callers.add(threading.get_ident()), depth=0, name="test"
+    )
+    assert list(inline) == [None, None, None]
+    assert callers == {threading.get_ident()}
+
+    def broken(item):
+        raise RuntimeError(f"stage failed on {item}")
+
+    with pytest.raises(RuntimeError, match="stage failed on 0"):
+        list(staged(range(3), broken, depth=2, name="test"))
+
+
+class _FlakyAdapter(CountingAdapter):
+    def fetch_closed_ohlcv(self, symbol, timeframe, limit):
+        if symbol == "SOL/USDT":
+            raise TimeoutError("exchange timed out")
+        return super().fetch_closed_ohlcv(symbol, timeframe, limit)
+
+
+@pytest.mark.usefixtures("test_strategies")
+@pytest.mark.parametrize("depth", [0, 2])
+def test_pipelined_cycle_keeps_the_sequential_counters(
+    depth, tmp_path, monkeypatch, capsys
+):
+    config = replace(
+        trainer_daemon.CONFIG,
+        db_path=tmp_path / "trading.db",
+        symbols=("BTC/USDT", "SOL/USDT", "ETH/USDT"),
+        strategy_ids=("test_fixed_long", "test_broken"),
+        ohlcv_limit=30,
+        meta_model_path=None,
+        feature_store_dir=None,
+        discord_webhook=None,
+        portfolio_risk_cap=0.0,
+        cycle_mode="single",
+        profile_dir=None,
+        pipeline_depth=depth,
+    )
+    monkeypatch.setattr(trainer_daemon, "CONFIG", config)
+    monkeypatch.setattr(
+        trainer_daemon, "create_market_data_adapter", lambda *_: _FlakyAdapter()
+    )
+
+    trainer_daemon.run_nexus_cycle()
+
+    output = capsys.readouterr().out
+    assert "❌ Error SOL/USDT: exchange timed out" in output
+    assert (
+        "Strategy test_fixed_long: evaluated=2, no_signal=0, generated=2" in output
+    )
+    assert "Strategy test_broken: evaluated=0" in output
+    # One failed fetch plus the broken strategy on the two fetched symbols.
+    assert output.rstrip().endswith("deferred=0, errors=3")
+    with TradingDatabaseHandler(config.db_path)._get_connection() as conn:
+        symbols = [row[0] for row in conn.execute("SELECT symbol FROM signals")]
+    assert sorted(symbols) == ["BTC/USDT", "ETH/USDT"]
+
+
+class _BusyFetchAdapter(CountingAdapter):
+    def fetch_closed_ohlcv(self, symbol, timeframe, limit):
+        started = time.thread_time()
+        while time.thread_time() - started < 0.2:
+            pass
+        return super().fetch_closed_ohlcv(symbol, timeframe, limit)
+
+
+class _WaitingStrategy(FixedLongStrategy):
+    strategy_id = "test_waiting"
+
+    def evaluate(self, symbol, candles):
+        time.sleep(0.3)
+        return None
+
+
+def test_strategy_cpu_excludes_the_concurrent_fetch_stage(
+    tmp_path, monkeypatch, capsys
+):
+    register_strategy(_WaitingStrategy)
+    config = replace(
+        trainer_daemon.CONFIG,
+        db_path=tmp_path / "trading.db",
+        symbols=("BTC/USDT", "ETH/USDT", "SOL/USDT"),
+        strategy_ids=("test_waiting",),
+        ohlcv_limit=30,
+        meta_model_path=None,
+        feature_store_dir=None,
+        discord_webhook=None,
+        portfolio_risk_cap=0.0,
+        cycle_mode="single",
+        profile_dir=None,
+        pipeline_depth=2,
+        strategy_cpu_budget_seconds=0.1,
+    )
+    monkeypatch.setattr(trainer_daemon, "CONFIG", config)
+    monkeypatch.setattr(
+        trainer_daemon, "create_market_data_adapter", lambda *_: _BusyFetchAdapter()
+    )
+
+    trainer_daemon.run_nexus_cycle()
+
+    # The fetches of ETH and SOL spin 0.4 s of CPU while BTC and ETH are
+    # evaluated; none of it may count against the strategy's budget.
+    [line] = [
+        line
+        for line in capsys.readouterr().out.splitlines()
+        if line.startswith("ℹ️ Strategy test_waiting:")
+    ]
+    assert "evaluated=3," in line
+    assert "cpu_skipped=0," in line
+    assert float(line.rsplit("cpu_seconds=", 1)[1]) < 0.1
@@ -0,0 +1,212 @@
+from dataclasses import replace
+from functools import partial
+
+import pytest
+
+import trainer_daemon
+from cycle_queue import CycleWorkQueue, cycle_candle_ms
+from cycle_scheduler import CycleScheduler
+from db.db_handler import TradingDatabaseHandler
+from tests.helpers import HOUR_MS, CountingAdapter, FakeClock, synthetic_candles
+
+
+def _queue(db, worker_id, clock_ms):
+    return CycleWorkQueue(
+        db,
+        timeframe="1h",
+        candle_timestamp_ms=10 * HOUR_MS,
+        worker_id=worker_id,
+        lease_seconds=60,
+        max_attempts=2,
+        clock_ms=clock_ms,
+    )
+
+
+def test_leases_are_exclusive_renewed_and_reclaimed_after_expiry(tmp_path):
+    db = TradingDatabaseHandler(tmp_path / "trading.db")
+    now = {"ms": 0}
+    first = _queue(db, "worker-a", lambda: now["ms"])
+    second = _queue(db, "worker-b", lambda: now["ms"])
+
+    assert first.enqueue(["BTC/USDT", "ETH/USDT"]) == 2
+    assert second.enqueue(["BTC/USDT", "ETH/USDT"]) == 0
+    assert first.claim(["ETH/USDT"]) == "ETH/USDT"
+    assert second.claim(["ETH/USDT"]) == "BTC/USDT"
+    assert second.claim() is None
+
+    # worker-a heartbeats past its original expiry; worker-b goes silent.
+    now["ms"] = 40_000
+    first.heartbeat()
+    now["ms"] = 61_000
+    assert first.claim() == "BTC/USDT"
+    assert second.complete("BTC/USDT") is False
+    assert second.lost == ["BTC/USDT"]
+
+    assert first.complete("ETH/USDT") is True
+    assert first.fail("BTC/USDT", "timeout") is True
+    # The failure used the last attempt, so the task is not retried again.
+    now["ms"] = 200_000
+    assert second.claim() is None
+    assert first.counts() == {"DONE": 1, "FAILED": 1}
+
+
+@pytest.mark.usefixtures("test_strategies")
+def test_two_workers_split_a_cycle_with_one_signal_per_candle(tmp_path, monkeypatch):
+    clock = FakeClock()
+    adapter = CountingAdapter()
+    original_fetch = adapter.fetch_closed_ohlcv
+
+    def slow_fetch(*args):
+        clock.now += 20.0
+        return original_fetch(*args)
+
+    adapter.fetch_closed_ohlcv = slow_fetch
+    symbols = ("BTC/USDT", "ETH/USDT", "SOL/USDT", "XRP/USDT")
+    config = replace(
+        trainer_daemon.CONFIG,
+        db_path=tmp_path / "trading.db",
+        symbols=symbols,
+        strategy_ids=("test_fixed_long",),
+        ohlcv_limit=30,
+        meta_model_path=None,
+        feature_store_dir=None,
+        discord_webhook=None,
+        portfolio_risk_cap=0.0,
+        cycle_time_budget_seconds=65.0,
+        cycle_reserve_seconds=10.0,
+        cycle_mode="sharded",
+    )
+    monkeypatch.setattr(trainer_daemon, "create_market_data_adapter", lambda *_: adapter)
+    monkeypatch.setattr(trainer_daemon, "CycleScheduler", partial(CycleScheduler, clock=clock))
+
+    # A worker that died mid-cycle left an expired lease behind.
+    db = TradingDatabaseHandler(config.db_path)
+    candle_ms = cycle_candle_ms(HOUR_MS, int(trainer_daemon.time.time() * 1000))
+    dead = CycleWorkQueue(
+        db, timeframe="1h", candle_timestamp_ms=candle_ms,
+        worker_id="dead", lease_seconds=1, clock_ms=lambda: 0,
+    )
+    dead.enqueue(symbols)
+    assert dead.claim(["XRP/USDT"]) == "XRP/USDT"
+
+    for worker_id in ("worker-a", "worker-b", "worker-c"):
+        clock.now = 0.0
+        monkeypatch.setattr(
+            trainer_daemon, "CONFIG", replace(config, worker_id=worker_id)
+        )
+        trainer_daemon.run_nexus_cycle()
+
+    # Each worker fits two 20s symbols into its budget; the third finds the
+    # queue drained, including the reclaimed XRP task.
+    assert sorted(adapter.fetches) == sorted(symbols)
+    with db._get_connection() as conn:
+        rows = conn.execute("SELECT symbol FROM signals").fetchall()
+    assert sorted(row["symbol"] for row in rows) == sorted(symbols)
+    assert db.get_cycle_task_counts(timeframe="1h", candle_timestamp_ms=candle_ms) == {
+        "DONE": 4
+    }
+
+
+@pytest.mark.usefixtures("test_strategies")
+def test_an_exhausted_shared_cap_risk_blocks_new_signals(tmp_path, monkeypatch, capsys):
+    config = replace(
+        trainer_daemon.CONFIG,
+        db_path=tmp_path / "trading.db",
+        symbols=("BTC/USDT", "ETH/USDT", "SOL/USDT"),
+        strategy_ids=("test_fixed_long",),
+        ohlcv_limit=30,
+        meta_model_path=None,
+        feature_store_dir=None,
+        discord_webhook=None,
+        account_equity_usdt=10_000.0,
+        portfolio_risk_cap=0.03,
+        cycle_mode="sharded",
+        worker_id="worker-b",
+    )
+    monkeypatch.setattr(trainer_daemon, "CONFIG", config)
+    monkeypatch.setattr(
+        trainer_daemon, "create_market_data_adapter", lambda *_: CountingAdapter()
+    )
+
+    # Another worker already committed more than the whole 300 USDT cap.
+    db = TradingDatabaseHandler(config.db_path)
+    candle_ms = cycle_candle_ms(HOUR_MS, int(trainer_daemon.time.time() * 1000))
+    other = CycleWorkQueue(
+        db, timeframe="1h", candle_timestamp_ms=candle_ms, worker_id="worker-a",
+        lease_seconds=60,
+    )
+    other.enqueue(config.symbols)
+    assert other.claim(["SOL/USDT"]) == "SOL/USDT"
+    db.insert_signal(
+        {
+            "signal_key": "worker-a-sol",
+            "timestamp": "2026-01-01T00:00:00+00:00",
+            "symbol": "SOL/USDT",
+            "signal_type": "LONG",
+            "timeframe": "1h",
+            "strategy_id": "test_fixed_long",
+            "candle_timestamp_ms": candle_ms,
+            "candle_closed": 1,
+            "entry": 100,
+            "sl": 99,
+            "tp": 102,
+            "confidence": 0.6,
+            "outcome": "PENDING",
+            "pred_move": 0.01,
+            "created_at": "2026-01-01T00:00:00+00:00",
+            "expires_at": "2099-01-01T00:00:00+00:00",
+            "status": "ACTIVE",
+            "exchange": "bitget",
+            "risk_per_trade": 0.0075,
+            "risk_amount_usdt": 400.0,
+            "position_size": 400.0,
+        }
+    )
+    other.complete("SOL/USDT")
+
+    trainer_daemon.run_nexus_cycle()
+
+    with db._get_connection() as conn:
+        rows = conn.execute(
+            "SELECT symbol, status, outcome, position_size FROM signals "
+            "WHERE signal_key != 'worker-a-sol' ORDER BY symbol"
+        ).fetchall()
+    assert [tuple(row) for row in rows] == [
+        ("BTC/USDT", "RISK_BLOCKED", "REJECTED_RISK", None),
+        ("ETH/USDT", "RISK_BLOCKED", "REJECTED_RISK", None),
+    ]
+    assert "risk_blocked=2" in capsys.readouterr().out
+
+
+def test_stored_history_reads_candles_where_a_hedge_exchange_stored_them(
+    tmp_path, monkeypatch
+):
+    config = replace(
+        trainer_daemon.CONFIG,
+        db_path=tmp_path / "trading.db",
+        symbols=("BTC/USDT", "ETH/USDT", "SOL/USDT"),
+        market_data_hedge_exchanges=("okx",),
+        ohlcv_limit=30,
+    )
+    monkeypatch.setattr(trainer_daemon, "CONFIG", config)
+    db = TradingDatabaseHandler(config.db_path)
+    candles = synthetic_candles(40)
+    latest_ms = int(candles.timestamp_ms[-1])
+    # SOL has stale bitget rows but this cycle's bars came from okx.
+    db.store_candles(
+        exchange="bitget", symbol="SOL/USDT", timeframe="1h",
+        candles=candles[:20].to_candles(),
+    )
+    for symbol, exchange in (("ETH/USDT", "okx"), ("SOL/USDT", "okx")):
+        db.store_candles(
+            exchange=exchange, symbol=symbol, timeframe="1h",
+            candles=candles.to_candles(),
+        )
+
+    history = trainer_daemon._stored_history(
+        db, {"BTC/USDT": candles}, HOUR_MS, latest_ms
+    )
+
+    assert set(history) == set(config.symbols)
+    for symbol in ("ETH/USDT", "SOL/USDT"):
+        assert history[symbol].timestamp_ms[-1] == latest_ms
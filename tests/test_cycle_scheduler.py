@@ -0,0 +1,71 @@
+from dataclasses import replace
+from functools import partial
+
+import pytest
+
+import trainer_daemon
+from cycle_scheduler import CycleScheduler, build_work_items, load_deferred
+from db.db_handler import TradingDatabaseHandler
+from tests.helpers import CountingAdapter, FakeClock
+
+
+def test_items_run_by_priority_until_the_deadline():
+    clock = FakeClock()
+    scheduler = CycleScheduler(11.0, reserve_seconds=3.0, clock=clock)
+    items = build_work_items(
+        ["A", "B", "C", "D", "E"],
+        weights={"C": 2.0},
+        activity={"A": (5.0, 0), "B": (1.0, 2), "D": (50.0, 0)},
+        deferred_before=["E"],
+    )
+
+    started = []
+    for item in scheduler.schedule(items):
+        started.append(item.key)
+        clock.now += 2.5
+
+    # E was deferred last cycle, C has the highest weight, B open signals,
+    # then liquidity. After three 2.5s items only 0.5s remain before the 3s
+    # reserve, which no longer fits the observed 2.5s cost.
+    assert started == ["E", "C", "B"]
+    assert scheduler.deferred == ["D", "A"]
+
+
+@pytest.mark.usefixtures("test_strategies")
+def test_trainer_defers_symbols_and_promotes_them_next_cycle(tmp_path, monkeypatch, capsys):
+    clock = FakeClock()
+    adapter = CountingAdapter()
+    original_fetch = adapter.fetch_closed_ohlcv
+
+    def slow_fetch(*args):
+        clock.now += 20.0
+        return original_fetch(*args)
+
+    adapter.fetch_closed_ohlcv = slow_fetch
+    config = replace(
+        trainer_daemon.CONFIG,
+        db_path=tmp_path / "trading.db",
+        symbols=("BTC/USDT", "ETH/USDT", "SOL/USDT", "XRP/USDT"),
+        strategy_ids=("test_fixed_long",),
+        ohlcv_limit=30,
+        meta_model_path=None,
+        feature_store_dir=None,
+        discord_webhook=None,
+        portfolio_risk_cap=0.0,
+        cycle_time_budget_seconds=65.0,
+        cycle_reserve_seconds=10.0,
+    )
+    monkeypatch.setattr(trainer_daemon, "CONFIG", config)
+    monkeypatch.setattr(trainer_daemon, "create_market_data_adapter", lambda *_: adapter)
+    monkeypatch.setattr(trainer_daemon, "CycleScheduler", partial(CycleScheduler, clock=clock))
+
+    trainer_daemon.run_nexus_cycle()
+    db = TradingDatabaseHandler(config.db_path)
+    assert adapter.fetches == ["BTC/USDT", "ETH/USDT"]
+    assert load_deferred(db, "trainer|1h") == ["SOL/USDT", "XRP/USDT"]
+    assert "deferred=2" in capsys.readouterr().out
+
+    clock.now = 0.0
+    adapter.fetches.clear()
+    trainer_daemon.run_nexus_cycle()
+    assert adapter.fetches[:2] == ["SOL/USDT", "XRP/USDT"]
@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from db.dashboard_data import DashboardDataSource
+from db.db_handler import TradingDatabaseHandler
+from tests.helpers import FakeClock, insert_signal
+
+
+def test_reads_are_cached_until_the_database_changes(tmp_path):
+    db = TradingDatabaseHandler(tmp_path / "trading.db")
+    ids = [insert_signal(db, index) for index in range(5)]
+    clock = FakeClock()
+    source = DashboardDataSource(db.db_path, window=3, clock=clock)
+
+    assert [row["id"] for row in source.recent_signals(3)] == ids[::-1][:3]
+    queries = source.queries
+    for _ in range(20):
+        clock.now += 10
+        source.recent_signals(3)
+    assert source.queries == queries
+
+    # Beyond the window pages come from the database and are cached too.
+    assert [row["id"] for row in source.signals_page(1, page_size=2)] == ids[2::-1][:2]
+    source.signals_page(1, page_size=2)
+    assert source.queries == queries + 1
+
+    # An outcome on a cached open row and a new signal: one incremental read.
+    db.mark_signal_outcome(
+        ids[4], outcome="TP_HIT", outcome_price=102.0,
+        outcome_at="2026-01-01T02:00:00+00:00", status="CLOSED",
+    )
+    new_id = insert_signal(db, 5)
+    clock.now += 10
+    rows = source.recent_signals(3)
+    assert [row["id"] for row in rows] == [new_id, ids[4], ids[3]]
+    assert rows[1]["status"] != "ACTIVE"
+    assert source.total_signals() == 6
+
+
+def test_connection_is_read_only_and_follows_a_replaced_file(tmp_path):
+    db = TradingDatabaseHandler(tmp_path / "trading.db")
+    insert_signal(db, 1)
+    source = DashboardDataSource(db.db_path, poll_seconds=0)
+    assert source.total_signals() == 1
+    with pytest.raises(Exception, match="readonly"):
+        source._conn.execute("DELETE FROM signals")
+
+    replacement = TradingDatabaseHandler(tmp_path / "pulled.db")
+    insert_signal(replacement, 1)
+    insert_signal(replacement, 2)
+    os.replace(replacement.db_path, db.db_path)
+    assert source.total_signals() == 2
+    assert len(source.recent_signals(10)) == 2
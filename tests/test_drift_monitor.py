@@ -0,0 +1,114 @@
+import threading
+
+from db.db_handler import TradingDatabaseHandler
+from risk.drift_adwin import DriftMonitor
+
+
+def _insert_signal(db, key, symbol="BTC/USDT"):
+    return db.insert_signal(
+        {
+            "signal_key": key,
+            "timestamp": "2026-08-20T08:00:00+00:00",
+            "symbol": symbol,
+            "signal_type": "LONG",
+            "timeframe": "1h",
+            "strategy_id": "baseline_ml_v1",
+            "candle_timestamp_ms": 123,
+            "candle_closed": 1,
+            "entry": 100,
+            "sl": 99,
+            "tp": 101.5,
+            "confidence": 0.75,
+            "outcome": "PENDING",
+            "created_at": "2026-08-20T08:00:00+00:00",
+            "expires_at": "2026-08-20T09:00:00+00:00",
+            "status": "ACTIVE",
+            "exchange": "bitget",
+        }
+    )
+
+
+def _close(db, signal_id, outcome):
+    db.mark_signal_outcome(
+        signal_id,
+        outcome=outcome,
+        outcome_price=100.0,
+        outcome_at="2026-08-20T09:00:00+00:00",
+        status="CLOSED",
+    )
+
+
+def test_outcome_event_is_logged_once_per_signal(tmp_path):
+    db = TradingDatabaseHandler(tmp_path / "trading.db")
+    signal_id = _insert_signal(db, "event-once")
+
+    _close(db, signal_id, "STOP_LOSS")
+    _close(db, signal_id, "TAKE_PROFIT")
+
+    events = db.get_outcome_events(after_id=0)
+    assert [event["outcome"] for event in events] == ["STOP_LOSS"]
+
+
+def test_error_shift_flags_symbol_for_retrain_and_persists(tmp_path):
+    db = TradingDatabaseHandler(tmp_path / "trading.db")
+    key = ("baseline_ml_v1", "BTC/USDT", "1h")
+
+    for index in range(300):
+        _close(db, _insert_signal(db, f"calm-{index}"), "TAKE_PROFIT")
+    for index in range(300):
+        _close(db, _insert_signal(db, f"shift-{index}"), "STOP_LOSS")
+    _close(db, _insert_signal(db, "other", symbol="ETH/USDT"), "TAKE_PROFIT")
+
+    assert DriftMonitor(db, batch_size=128).ingest() == {key}
+
+    # A fresh process sees the same flag and does not replay consumed events.
+    monitor = DriftMonitor(db)
+    assert monitor.needs_retrain("baseline_ml_v1") == {key}
+    assert monitor.ingest() == set()
+
+    monitor.acknowledge([key])
+    assert monitor.needs_retrain() == set()
+
+
+def test_concurrent_workers_feed_every_event_once(tmp_path):
+    db = TradingDatabaseHandler(tmp_path / "trading.db")
+    key = ("baseline_ml_v1", "BTC/USDT", "1h")
+    for index in range(200):
+        _close(db, _insert_signal(db, f"calm-{index}"), "TAKE_PROFIT")
+
+    # Sharded workers all start their cycle by ingesting the same events.
+    start = threading.Barrier(4)
+
+    def worker():
+        start.wait()
+        DriftMonitor(db, batch_size=16).ingest()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    _, states = DriftMonitor(db)._load()
+    assert states[key].observations == 200
+
+
+def test_acknowledge_keeps_a_detection_made_after_the_refit_started(tmp_path):
+    db = TradingDatabaseHandler(tmp_path / "trading.db")
+    key = ("baseline_ml_v1", "BTC/USDT", "1h")
+    for outcome in ("TAKE_PROFIT", "STOP_LOSS"):
+        for index in range(300):
+            _close(db, _insert_signal(db, f"{outcome}-a-{index}"), outcome)
+
+    refitting = DriftMonitor(db)
+    refitting.ingest()
+    assert refitting.needs_retrain() == {key}
+
+    # Another worker detects a new shift while this one refits.
+    for outcome in ("TAKE_PROFIT", "STOP_LOSS"):
+        for index in range(300):
+            _close(db, _insert_signal(db, f"{outcome}-b-{index}"), outcome)
+    assert DriftMonitor(db).ingest() == {key}
+
+    refitting.acknowledge([key])
+    assert DriftMonitor(db).needs_retrain() == {key}
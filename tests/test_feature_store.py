@@ -0,0 +1,121 @@
+from dataclasses import replace
+
+import numpy as np
+
+from adapters.market_data import CandleArray
+from backtest.engine import predict_series, stored_features
+from config import CONFIG
+from features.indicators import IndicatorEngine
+from features.store import BASELINE_FEATURES, INDICATOR_FEATURES, FeatureStore
+from models.baseline import baseline_features
+from models.regime_hmm import detect_regimes_from_store
+from strategies.baseline import BaselineStrategy
+from tests.helpers import indicator_candles
+
+KEY = dict(exchange="bitget", symbol="BTC/USDT", timeframe="1h")
+
+
+def test_incremental_appends_match_full_computation(tmp_path):
+    candles = indicator_candles(count=150)
+    store = FeatureStore(tmp_path / "features")
+
+    assert store.append(INDICATOR_FEATURES, candles=candles[:100], **KEY) == 100
+    # Overlapping windows (as fetched every hour) only add the new bars.
+    assert store.append(INDICATOR_FEATURES, candles=candles[50:150], **KEY) == 50
+    store.append(BASELINE_FEATURES, candles=candles[:70], **KEY)
+    store.append(BASELINE_FEATURES, candles=candles[60:], **KEY)
+
+    indicators = store.read(INDICATOR_FEATURES, **KEY)
+    expected = IndicatorEngine().bulk(candles)
+    assert isinstance(indicators.columns["atr"], np.memmap)
+    for column in IndicatorEngine.COLUMNS:
+        assert np.array_equal(indicators.columns[column], expected[column], equal_nan=True)
+
+    baseline = store.read(BASELINE_FEATURES, start_ms=int(candles.timestamp_ms[10]), **KEY)
+    full = baseline_features(candles.close, candles.high, candles.low)
+    assert np.array_equal(baseline.matrix(["ret", "vol"]), full[10:])
+
+
+def test_a_gap_rebuilds_the_set_from_the_contiguous_tail(tmp_path):
+    candles = indicator_candles(count=150)
+    store = FeatureStore(tmp_path / "features")
+    store.append(INDICATOR_FEATURES, candles=candles[:100], **KEY)
+
+    # Bars 100-109 went to another exchange's set; this window resumes at 110.
+    assert store.append(INDICATOR_FEATURES, candles=candles[110:150], **KEY) == 40
+    stored = store.read(INDICATOR_FEATURES, **KEY)
+    assert np.array_equal(stored.timestamp_ms, candles.timestamp_ms[110:])
+    expected = IndicatorEngine().bulk(candles[110:])
+    for column in IndicatorEngine.COLUMNS:
+        assert np.array_equal(stored.columns[column], expected[column], equal_nan=True)
+
+    # A hole inside one window keeps only the bars after it.
+    holed = CandleArray.from_candles(
+        candles[:40].to_candles() + candles[45:60].to_candles()
+    )
+    assert store.append(BASELINE_FEATURES, candles=holed, **KEY) == 15
+    assert np.array_equal(
+        store.read(BASELINE_FEATURES, **KEY).timestamp_ms, candles.timestamp_ms[45:60]
+    )
+
+
+def test_strategy_and_backtest_read_stored_baseline_features(tmp_path):
+    candles = indicator_candles(count=80)
+    config = replace(
+        CONFIG,
+        feature_store_dir=tmp_path / "features",
+        market_data_exchange_id="bitget",
+        market_data_hedge_exchanges=("okx",),
+        retrain_policy="always",
+        timeframe="1h",
+    )
+    store = FeatureStore(config.feature_store_dir)
+    # The latest bars came from the hedge exchange.
+    store.append(BASELINE_FEATURES, candles=candles[:70], **KEY)
+    store.append(BASELINE_FEATURES, candles=candles, **{**KEY, "exchange": "okx"})
+
+    window = candles[40:80]
+    computed = baseline_features(window.close, window.high, window.low)
+    strategy = BaselineStrategy(config)
+    strategy.begin_cycle(db=None)
+    assert np.array_equal(strategy.window_features("BTC/USDT", window), computed)
+    assert strategy.cycle_stats()["feature_store_reads"] == 1
+    # Bars the store does not hold are computed from the candles.
+    outside = indicator_candles(count=90)[50:90]
+    strategy.window_features("BTC/USDT", outside)
+    assert strategy.cycle_stats()["feature_store_reads"] == 1
+
+    history = candles[:70]
+    stored = stored_features(config, "BTC/USDT", history)
+    assert stored is not None
+    from_store = predict_series(history, 30, features=stored)
+    recomputed = predict_series(history, 30)
+    assert np.array_equal(from_store.index, recomputed.index)
+    assert np.array_equal(from_store.probability_up, recomputed.probability_up)
+    assert stored_features(config, "ETH/USDT", history) is None
+
+
+def test_regimes_are_detected_from_stored_indicator_columns(tmp_path):
+    store = FeatureStore(tmp_path / "features")
+    assert detect_regimes_from_store(store, **KEY).empty
+
+    store.append(INDICATOR_FEATURES, candles=indicator_candles(), **KEY)
+    regimes = detect_regimes_from_store(store, random_state=0, **KEY)
+    stored = store.read(INDICATOR_FEATURES, **KEY).to_dataframe()
+    assert len(regimes) == len(stored[["log_return", "atr", "volatility"]].dropna())
+    assert set(regimes["regime"]) <= {0, 1, 2}
+    assert ((regimes["regime_prob"] > 0) & (regimes["regime_prob"] <= 1)).all()
+
+
+def test_definition_change_invalidates_stored_features(tmp_path):
+    store = FeatureStore(tmp_path / "features")
+    store.append(BASELINE_FEATURES, candles=indicator_candles(count=30), **KEY)
+    changed = replace(BASELINE_FEATURES, version=2)
+
+    assert len(store.read(changed, **KEY)) == 0
+    assert len(store.purge_stale()) == 0
+
+    (tmp_path / "features" / "baseline" / changed.fingerprint).mkdir()
+    removed = store.purge_stale()
+    assert [path.name for path in removed] == [changed.fingerprint]
+    assert len(store.read(BASELINE_FEATURES, **KEY)) == 30
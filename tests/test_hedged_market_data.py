@@ -0,0 +1,111 @@
+import time
+from dataclasses import replace
+
+import pytest
+
+import trainer_daemon
+from adapters.hedged import HedgedMarketDataAdapter
+from adapters.market_data import Candle, MarketDataAdapter, MarketDataError
+from db.db_handler import TradingDatabaseHandler
+
+HOUR_MS = 3_600_000
+
+
+def _closed_candles(limit, lag_bars=0):
+    latest = int(time.time() * 1000) // HOUR_MS * HOUR_MS - (1 + lag_bars) * HOUR_MS
+    return [
+        Candle(latest - (limit - 1 - i) * HOUR_MS, 100, 101, 99, 100.5 + (i % 3), 1)
+        for i in range(limit)
+    ]
+
+
+class _ScriptedSource(MarketDataAdapter):
+    def __init__(self, exchange_id, latency_s, *, fail=False, lag_bars=0):
+        self.exchange_id = exchange_id
+        self.latency_s = latency_s
+        self.fail = fail
+        self.lag_bars = lag_bars
+        self.calls = 0
+
+    def fetch_closed_ohlcv(self, symbol, timeframe, limit):
+        self.calls += 1
+        time.sleep(self.latency_s)
+        if self.fail:
+            raise MarketDataError(f"{self.exchange_id} unavailable")
+        return _closed_candles(limit, self.lag_bars)
+
+    def fetch_ohlcv_range(self, symbol, timeframe, start_ms, end_ms):
+        self.calls += 1
+        if self.fail:
+            raise MarketDataError(f"{self.exchange_id} unavailable")
+        return [
+            Candle(ms, 100, 101, 99, 100.5, 1)
+            for ms in range(start_ms, end_ms, 60_000)
+        ]
+
+
+def test_slow_primary_is_hedged_and_first_valid_result_wins():
+    primary = _ScriptedSource("bitget", 0.6)
+    secondary = _ScriptedSource("okx", 0.01)
+    adapter = HedgedMarketDataAdapter([primary, secondary], default_delay_s=0.05)
+
+    started = time.monotonic()
+    candles = adapter.fetch_closed_ohlcv("BTC/USDT", "1h", 30)
+    elapsed = time.monotonic() - started
+
+    assert len(candles) == 30
+    assert elapsed < 0.4
+    assert adapter.hedges == 1
+    assert adapter.provenance("BTC/USDT") == "okx"
+    # The primary is still busy with the losing request and is skipped.
+    with pytest.raises(MarketDataError, match="still serving"):
+        adapter._fetch(0, "ETH/USDT", "1h", 30)
+    adapter.close()
+
+
+def test_failures_fail_over_and_stale_results_are_rejected():
+    primary = _ScriptedSource("bitget", 0.0, fail=True)
+    stale = _ScriptedSource("okx", 0.0, lag_bars=3)
+    backup = _ScriptedSource("kraken", 0.0)
+    adapter = HedgedMarketDataAdapter([primary, stale, backup], default_delay_s=5.0)
+
+    started = time.monotonic()
+    adapter.fetch_closed_ohlcv("BTC/USDT", "1h", 30)
+    assert time.monotonic() - started < 1.0
+    assert adapter.provenance("BTC/USDT") == "kraken"
+    assert adapter.hedges == 0
+
+    backup.fail = True
+    with pytest.raises(MarketDataError, match="okx candles for BTC/USDT are stale"):
+        adapter.fetch_closed_ohlcv("BTC/USDT", "1h", 30)
+
+    # Range requests fail over in rank order and record who served them.
+    assert len(adapter.fetch_ohlcv_range("ETH/USDT", "1m", 0, HOUR_MS)) == 60
+    assert adapter.provenance("ETH/USDT") == "okx"
+    adapter.close()
+
+
+@pytest.mark.usefixtures("test_strategies")
+def test_trainer_records_the_serving_exchange(tmp_path, monkeypatch):
+    adapter = HedgedMarketDataAdapter(
+        [_ScriptedSource("bitget", 0.0, fail=True), _ScriptedSource("okx", 0.0)]
+    )
+    config = replace(
+        trainer_daemon.CONFIG,
+        db_path=tmp_path / "trading.db",
+        symbols=("BTC/USDT",),
+        strategy_ids=("test_fixed_long",),
+        ohlcv_limit=30,
+        meta_model_path=None,
+        feature_store_dir=None,
+        discord_webhook=None,
+        portfolio_risk_cap=0.0,
+    )
+    monkeypatch.setattr(trainer_daemon, "CONFIG", config)
+    monkeypatch.setattr(trainer_daemon, "create_market_data_adapter", lambda *_: adapter)
+    trainer_daemon.run_nexus_cycle()
+
+    with TradingDatabaseHandler(config.db_path)._get_connection() as conn:
+        assert conn.execute("SELECT DISTINCT exchange FROM signals").fetchall()[0][0] == "okx"
+        assert conn.execute("SELECT DISTINCT exchange FROM candles").fetchall()[0][0] == "okx"
+    adapter.close()
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from db.db_handler import TradingDatabaseHandler
+from features.indicators import (
+    EMA,
+    IndicatorEngine,
+    load_indicator_engines,
+    save_indicator_engines,
+)
+from tests.helpers import indicator_candles
+
+
+def test_streaming_and_bulk_paths_are_identical():
+    candles = indicator_candles()
+
+    streamed = IndicatorEngine()
+    rows = [streamed.update(candle) for candle in candles.to_candles()]
+    bulk = IndicatorEngine().bulk(candles)
+
+    for column in IndicatorEngine.COLUMNS:
+        values = np.array([row[column] for row in rows])
+        assert np.array_equal(values, bulk[column], equal_nan=True), column
+
+
+def test_backfill_then_stream_resumes_from_persisted_state(tmp_path):
+    candles = indicator_candles()
+    db = TradingDatabaseHandler(tmp_path / "trading.db")
+    key = "bitget|BTC/USDT|1h"
+
+    engines = load_indicator_engines(db, [key])
+    engines[key].bulk(candles[:200])
+    save_indicator_engines(db, engines)
+
+    resumed = load_indicator_engines(db, [key])[key]
+    assert resumed.update(candles[:200].to_candles()[-1]) is None
+    last = [resumed.update(candle) for candle in candles[200:].to_candles()][-1]
+
+    reference = IndicatorEngine().bulk(candles)
+    for column in IndicatorEngine.COLUMNS:
+        assert last[column] == reference[column][-1]
+
+
+def test_ema_matches_pandas_convention():
+    pd = pytest.importorskip("pandas")
+    values = np.linspace(1, 30, 30)
+    ema = EMA(5)
+
+    out = ema.bulk(values)
+
+    expected = pd.Series(values).ewm(span=5, adjust=False).mean().to_numpy()
+    assert out[4:] == pytest.approx(expected[4:])
+    assert np.isnan(out[:4]).all()
@@ -0,0 +1,104 @@
+import ccxt
+import pytest
+
+from adapters.market_data import BitgetMarketDataAdapter, CircuitOpenError, MarketDataError
+
+HOUR_MS = 3_600_000
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _FaultyExchange:
+    """Minimal ccxt stand-in whose responses follow a scripted fault plan."""
+
+    has = {"fetchOHLCV": True}
+
+    def __init__(self, clock, faults=None, latency=0.2):
+        self.clock = clock
+        self.faults = faults or {}
+        self.latency = latency
+        self.rateLimit = 50
+        self.timeout = 10_000
+        self.calls = []
+
+    def milliseconds(self):
+        return 1_800_000_000_000
+
+    def load_markets(self):
+        return {}
+
+    def fetch_ohlcv(self, symbol, timeframe, limit=None):
+        self.calls.append(symbol)
+        fault = self.faults.get(symbol, self.faults.get("*"))
+        if isinstance(fault, list):
+            fault = fault.pop(0) if fault else None
+        if fault is ccxt.RequestTimeout:
+            self.clock.now += self.timeout / 1000
+            raise ccxt.RequestTimeout("timed out")
+        self.clock.now += self.latency
+        if fault is not None:
+            raise fault("injected")
+        latest = self.milliseconds() // HOUR_MS * HOUR_MS - 2 * HOUR_MS
+        return [
+            [latest - (limit - 1 - i) * HOUR_MS, 100, 101, 99, 100.5, 1]
+            for i in range(limit)
+        ]
+
+
+def test_open_circuit_fails_fast_and_half_open_probe_recovers():
+    clock = _FakeClock()
+    exchange = _FaultyExchange(clock, faults={"*": ccxt.RequestTimeout})
+    adapter = BitgetMarketDataAdapter(exchange=exchange, clock=clock)
+    symbols = [f"S{i}/USDT" for i in range(10)]
+
+    failures = []
+    for symbol in symbols:
+        with pytest.raises(MarketDataError) as excinfo:
+            adapter.fetch_closed_ohlcv(symbol, "1h", 20)
+        failures.append(type(excinfo.value))
+
+    # Three timeouts open the endpoint circuit; the other seven never reach
+    # the exchange, so a dead exchange costs 30s instead of 100s.
+    assert len(exchange.calls) == 3
+    assert failures.count(CircuitOpenError) == 7
+    assert clock.now == pytest.approx(30.0)
+
+    exchange.faults = {}
+    clock.now += BitgetMarketDataAdapter.CIRCUIT_RESET_S
+    assert len(adapter.fetch_closed_ohlcv("S9/USDT", "1h", 20)) == 20
+    assert adapter.breakers["fetch_ohlcv"].state == "closed"
+    assert len(adapter.fetch_closed_ohlcv("S8/USDT", "1h", 20)) == 20
+
+
+def test_symbol_faults_stay_isolated_and_rate_limits_slow_pacing():
+    clock = _FakeClock()
+    exchange = _FaultyExchange(
+        clock,
+        faults={"BAD/USDT": ccxt.BadSymbol, "BTC/USDT": [ccxt.RateLimitExceeded]},
+    )
+    adapter = BitgetMarketDataAdapter(exchange=exchange, clock=clock)
+
+    for _ in range(2):
+        with pytest.raises(MarketDataError):
+            adapter.fetch_closed_ohlcv("BAD/USDT", "1h", 20)
+    with pytest.raises(CircuitOpenError):
+        adapter.fetch_closed_ohlcv("BAD/USDT", "1h", 20)
+    assert exchange.calls.count("BAD/USDT") == 2
+
+    with pytest.raises(MarketDataError):
+        adapter.fetch_closed_ohlcv("BTC/USDT", "1h", 20)
+    assert adapter.pacer.interval_ms == pytest.approx(100)
+    adapter.fetch_closed_ohlcv("BTC/USDT", "1h", 20)
+    assert exchange.rateLimit == pytest.approx(100)
+    assert adapter.pacer.interval_ms == pytest.approx(90)
+
+    for _ in range(BitgetMarketDataAdapter.MIN_LATENCY_SAMPLES):
+        adapter.fetch_closed_ohlcv("ETH/USDT", "1h", 20)
+    # With 0.2s responses the timeout drops to the 2s floor instead of 10s.
+    assert exchange.timeout == BitgetMarketDataAdapter.MIN_TIMEOUT_MS
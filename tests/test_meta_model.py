@@ -0,0 +1,67 @@
+import json
+
+import numpy as np
+import pytest
+
+from models.meta_model import MetaModel, MetaModelArtifactError
+
+
+def _training_data(rows=400, seed=7):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, 4))
+    y = (X[:, 0] + 0.5 * X[:, 1] + rng.normal(scale=0.5, size=rows) > 0).astype(int)
+    return X, y
+
+
+def test_batch_probability_matches_sklearn():
+    X, y = _training_data()
+    model = MetaModel(n_estimators=25, n_jobs=2, random_state=1).fit(X, y)
+
+    expected = model.model.predict_proba(X)[:, 1]
+
+    assert model.probability(X) == pytest.approx(expected, abs=1e-12)
+
+
+def test_saved_artifact_is_memory_mapped_and_equivalent(tmp_path):
+    X, y = _training_data()
+    model = MetaModel(n_estimators=10, random_state=3).fit(X, y)
+    artifact = model.save(tmp_path / "meta")
+
+    loaded = MetaModel.load(artifact)
+
+    assert isinstance(loaded._arrays["threshold"], np.memmap)
+    assert loaded.probability(X[:5]) == pytest.approx(model.probability(X[:5]))
+
+
+def test_load_rejects_unknown_artifact_version(tmp_path):
+    X, y = _training_data(rows=60)
+    artifact = MetaModel(n_estimators=2, random_state=0).fit(X, y).save(
+        tmp_path / "meta"
+    )
+    manifest_path = artifact / "manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest["format_version"] = 999
+    manifest_path.write_text(json.dumps(manifest))
+
+    with pytest.raises(MetaModelArtifactError):
+        MetaModel.load(artifact)
+
+
+def test_saving_over_an_artifact_switches_versions_through_the_pointer(tmp_path):
+    X, y = _training_data(rows=60)
+    first = MetaModel(n_estimators=2, random_state=0).fit(X, y)
+    second = MetaModel(n_estimators=3, random_state=1).fit(X, y)
+    root = tmp_path / "meta"
+
+    old = first.save(root)
+    # A loader that resolved the old version before the switch still works.
+    stale_reader = MetaModel.load(old)
+    new = second.save(root)
+    assert MetaModel.load(root).probability(X[:5]) == pytest.approx(
+        second.probability(X[:5])
+    )
+    assert stale_reader.probability(X[:5]) == pytest.approx(first.probability(X[:5]))
+
+    newest = MetaModel(n_estimators=4, random_state=2).fit(X, y).save(root)
+    assert sorted(path.name for path in root.glob("v*")) == [new.name, newest.name]
+    assert (root / "CURRENT").read_text() == newest.name
@@ -0,0 +1,71 @@
+import json
+from dataclasses import replace
+
+import pytest
+
+import metrics
+import trainer_daemon
+from db.db_handler import TradingDatabaseHandler
+from tests.helpers import CountingAdapter
+
+
+def test_helpers_are_no_ops_without_an_active_cycle_and_nest_when_active():
+    assert metrics.span("fetch") is metrics._NULL_SPAN
+    metrics.count("generated")
+    metrics.observe("exchange_fetch_ohlcv_seconds", 0.2)
+
+    now = {"t": 0.0}
+    cycle = metrics.CycleMetrics("trainer", clock=lambda: now["t"])
+    with cycle.activate():
+        with metrics.span("fetch", "BTC/USDT"):
+            now["t"] += 0.25
+            with metrics.span("load_markets"):
+                now["t"] += 2.0
+        metrics.count("generated", 2)
+        metrics.observe("exchange_fetch_ohlcv_seconds", 0.2)
+    assert metrics.span("fetch") is metrics._NULL_SPAN
+
+    record = cycle.record()
+    assert record["duration_seconds"] == 2.25
+    assert record["stages"]["fetch"]["total"] == 2.25
+    assert record["stages"]["load_markets"]["p50"] == 2.0
+    assert record["symbols"] == {"BTC/USDT": {"fetch": 2.25}}
+    assert record["counters"] == {"generated": 2}
+    text = cycle.prometheus_text(record)
+    assert 'profitforge_stage_seconds_bucket{process="trainer",stage="fetch",le="2.5"} 1' in text
+    assert 'profitforge_stage_seconds_bucket{process="trainer",stage="fetch",le="1.0"} 0' in text
+
+
+@pytest.mark.usefixtures("test_strategies")
+def test_a_trainer_cycle_writes_its_record_to_sqlite_and_files(tmp_path, monkeypatch):
+    config = replace(
+        trainer_daemon.CONFIG,
+        db_path=tmp_path / "trading.db",
+        symbols=("BTC/USDT", "ETH/USDT"),
+        strategy_ids=("test_fixed_long",),
+        ohlcv_limit=30,
+        meta_model_path=None,
+        feature_store_dir=None,
+        discord_webhook=None,
+        portfolio_risk_cap=0.0,
+        cycle_mode="single",
+        metrics_enabled=True,
+        metrics_dir=tmp_path / "metrics",
+    )
+    monkeypatch.setattr(trainer_daemon, "CONFIG", config)
+    monkeypatch.setattr(
+        trainer_daemon, "create_market_data_adapter", lambda *_: CountingAdapter()
+    )
+
+    trainer_daemon.run_nexus_cycle()
+
+    [row] = TradingDatabaseHandler(config.db_path).get_cycle_metrics(process="trainer")
+    record = json.loads(row["metrics_json"])
+    assert {"fetch", "strategy:test_fixed_long", "persist"} <= set(record["stages"])
+    assert record["stages"]["fetch"]["count"] == 2
+    assert set(record["symbols"]) == {"BTC/USDT", "ETH/USDT"}
+    assert record["counters"]["generated"] == 2
+    assert json.loads((tmp_path / "metrics" / "trainer.json").read_text()) == record
+    prom = (tmp_path / "metrics" / "trainer.prom").read_text()
+    assert 'stage="strategy:test_fixed_long"' in prom
+    assert not list((tmp_path / "metrics").glob("*.tmp"))
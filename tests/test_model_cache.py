@@ -0,0 +1,63 @@
+import os
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+import strategies.baseline as baseline_strategy
+from config import CONFIG
+from models.model_cache import ModelCache, window_key
+from strategies.baseline import BaselineStrategy
+from tests.helpers import synthetic_candles
+
+
+def _strategy(cache_dir):
+    strategy = BaselineStrategy(
+        replace(CONFIG, retrain_policy="always", model_cache_dir=cache_dir)
+    )
+    strategy.begin_cycle(db=None)
+    return strategy
+
+
+def test_identical_windows_reuse_the_cached_fit_across_instances(tmp_path, monkeypatch):
+    candles = synthetic_candles(count=60)
+    first = _strategy(tmp_path)
+    expected = first.predict("BTC/USDT", candles[:40])
+    assert first.cycle_stats()["model_cache_hits"] == 0
+
+    def no_fit(features):
+        raise AssertionError("an identical window must not be refitted")
+
+    monkeypatch.setattr(baseline_strategy, "fit_baseline_models", no_fit)
+    second = _strategy(tmp_path)
+    probability_up, magnitude, latest = second.predict("ETH/USDT", candles[:40])
+    assert (probability_up, magnitude) == expected[:2]
+    np.testing.assert_array_equal(latest, expected[2])
+    assert second.cycle_stats() == {"refitted": 1, "errors": 0, "model_cache_hits": 1}
+    assert "ETH/USDT" in second.refitted
+
+    with pytest.raises(AssertionError, match="must not be refitted"):
+        second.predict("BTC/USDT", candles[1:41])
+
+
+def test_entries_are_evicted_least_recently_used_first(tmp_path):
+    window = np.arange(8.0).reshape(4, 2)
+    key = window_key(window, feature_set="f", hyperparameters={"a": 1})
+    assert key == window_key(window.copy(), feature_set="f", hyperparameters={"a": 1})
+    assert key != window_key(window, feature_set="f", hyperparameters={"a": 2})
+    assert key != window_key(window + 1e-12, feature_set="f", hyperparameters={"a": 1})
+
+    payload = b"x" * 1_000
+    cache = ModelCache(tmp_path, max_bytes=3_500)
+    keys = [f"{index:02d}" + "0" * 62 for index in range(3)]
+    for age, entry in enumerate(keys):
+        cache.put(entry, payload)
+        stamp = 1_000_000 + age
+        os.utime(cache._path(entry), (stamp, stamp))
+
+    assert cache.get(keys[0]) == payload  # now the most recently used
+    cache.put("ff" + "0" * 62, payload)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == payload and cache.get(keys[2]) == payload
+    assert cache.size_bytes() <= 3_500 * 0.9
+    assert (cache.hits, cache.misses) == (3, 1)
@@ -0,0 +1,164 @@
+import sqlite3
+from dataclasses import replace
+
+from adapters.market_data import Candle, MarketDataAdapter
+from db.db_handler import TradingDatabaseHandler
+from outcome_drilldown import AmbiguousBarResolver
+
+ENTRY_MS = 1_767_225_600_000  # 2026-01-01T00:00:00Z
+HOUR_MS = 3_600_000
+MINUTE_MS = 60_000
+
+
+class _DrilldownAdapter(MarketDataAdapter):
+    """1h bars touching both levels; 1m bars decided by ``first_touch``."""
+
+    exchange_id = "bitget"
+
+    def __init__(self, first_touch):
+        self.first_touch = first_touch
+        self.range_calls = []
+        self.missing_minutes = ()
+
+    def fetch_closed_ohlcv(self, symbol, timeframe, limit):
+        return [
+            Candle(ENTRY_MS, 100, 100.5, 99.5, 100, 1),
+            Candle(ENTRY_MS + HOUR_MS, 100, 102, 98, 100, 1),
+        ]
+
+    def fetch_ohlcv_range(self, symbol, timeframe, start_ms, end_ms):
+        self.range_calls.append((symbol, timeframe, start_ms, end_ms))
+        candles = [
+            Candle(ms, 100, 100.2, 99.8, 100, 1)
+            for ms in range(start_ms, end_ms, MINUTE_MS)
+        ]
+        high, low = {
+            "tp": (102, 99.8),
+            "sl": (100.2, 98),
+            "both": (102, 98),
+        }[self.first_touch[symbol]]
+        candles[7] = Candle(start_ms + 7 * MINUTE_MS, 100, high, low, 100, 1)
+        return [c for i, c in enumerate(candles) if i not in self.missing_minutes]
+
+
+def _signal(key, symbol):
+    return {
+        "signal_key": key,
+        "timestamp": "2026-01-01T00:00:00+00:00",
+        "symbol": symbol,
+        "signal_type": "LONG",
+        "timeframe": "1h",
+        "strategy_id": "baseline_ml_v1",
+        "candle_timestamp_ms": ENTRY_MS,
+        "candle_closed": 1,
+        "entry": 100,
+        "sl": 99,
+        "tp": 101.5,
+        "confidence": 0.75,
+        "outcome": "PENDING",
+        "pred_move": 0.01,
+        "created_at": "2026-01-01T00:00:00+00:00",
+        "expires_at": "2099-01-01T00:00:00+00:00",
+        "status": "ACTIVE",
+        "exchange": "bitget",
+        "risk_per_trade": 0.0075,
+        "risk_amount_usdt": 75,
+        "position_size": 75,
+    }
+
+
+def test_monitor_resolves_ambiguous_bars_with_one_fetch_per_bar(
+    tmp_path, monkeypatch
+):
+    import monitor_trades
+
+    db_path = tmp_path / "trading.db"
+    db = TradingDatabaseHandler(db_path)
+    db.insert_signal(_signal("btc-a", "BTC/USDT"))
+    db.insert_signal(_signal("btc-b", "BTC/USDT"))
+    db.insert_signal(_signal("eth", "ETH/USDT"))
+    db.insert_signal(_signal("sol", "SOL/USDT"))
+    adapter = _DrilldownAdapter(
+        {"BTC/USDT": "tp", "ETH/USDT": "sl", "SOL/USDT": "both"}
+    )
+
+    monkeypatch.setattr(
+        monitor_trades,
+        "CONFIG",
+        replace(
+            monitor_trades.CONFIG,
+            db_path=db_path,
+            discord_webhook=None,
+            metrics_enabled=False,
+            ambiguous_drilldown_timeframe="1m",
+        ),
+    )
+    monkeypatch.setattr(
+        monitor_trades, "create_market_data_adapter", lambda *_: adapter
+    )
+
+    monitor_trades.check_outcomes()
+
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute(
+            "SELECT signal_key, outcome, outcome_at FROM signals ORDER BY signal_key"
+        ).fetchall()
+    minute = "2026-01-01T01:07:00+00:00"
+    assert rows == [
+        ("btc-a", "TAKE_PROFIT", minute),
+        ("btc-b", "TAKE_PROFIT", minute),
+        ("eth", "STOP_LOSS", minute),
+        # Still ambiguous at 1m: stays AMBIGUOUS at the signal bar.
+        ("sol", "AMBIGUOUS", "2026-01-01T01:00:00+00:00"),
+    ]
+    # The two BTC signals share their ambiguous bar: one request for both.
+    assert sorted(call[0] for call in adapter.range_calls) == [
+        "BTC/USDT",
+        "ETH/USDT",
+        "SOL/USDT",
+    ]
+    assert adapter.range_calls[0][1:] == (
+        "1m",
+        ENTRY_MS + HOUR_MS,
+        ENTRY_MS + 2 * HOUR_MS,
+    )
+
+
+def test_resolver_reads_stored_lower_candles_before_fetching(tmp_path):
+    db = TradingDatabaseHandler(tmp_path / "trading.db")
+    adapter = _DrilldownAdapter({"BTC/USDT": "sl"})
+    signal = _signal("btc", "BTC/USDT")
+    bar = adapter.fetch_closed_ohlcv("BTC/USDT", "1h", 2)[-1]
+
+    first = AmbiguousBarResolver(adapter, timeframe="1m", db=db)
+    assert first.resolve(signal, bar)[0] == "STOP_LOSS"
+    assert (first.fetches, first.store_reads) == (1, 0)
+
+    second = AmbiguousBarResolver(adapter, timeframe="1m", db=db)
+    outcome, minute = second.resolve(signal, bar)
+    assert outcome == "STOP_LOSS"
+    assert minute.timestamp_ms == bar.timestamp_ms + 7 * MINUTE_MS
+    assert (second.fetches, second.store_reads) == (0, 1)
+    assert len(adapter.range_calls) == 1
+
+    # A gapped response may hide the minute that touched the other level
+    # first: the bar stays ambiguous and nothing is stored.
+    gapped = _DrilldownAdapter({"ETH/USDT": "tp"})
+    gapped.missing_minutes = (3,)
+    resolver = AmbiguousBarResolver(gapped, timeframe="1m", db=db)
+    assert resolver.resolve(_signal("eth", "ETH/USDT"), bar) is None
+    assert len(db.get_candle_array(exchange="bitget", symbol="ETH/USDT", timeframe="1m")) == 0
+
+    # Candles a secondary served are stored under that exchange.
+    failed_over = _DrilldownAdapter({"SOL/USDT": "tp"})
+    failed_over.provenance = lambda symbol: "okx"
+    resolver = AmbiguousBarResolver(failed_over, timeframe="1m", db=db)
+    assert resolver.resolve(_signal("sol", "SOL/USDT"), bar)[0] == "TAKE_PROFIT"
+    stored = {
+        exchange: len(db.get_candle_array(exchange=exchange, symbol="SOL/USDT", timeframe="1m"))
+        for exchange in ("bitget", "okx")
+    }
+    assert stored == {"bitget": 0, "okx": 60}
+
+    # A signal timeframe no finer than the drill-down one has nothing to open.
+    assert AmbiguousBarResolver(adapter, timeframe="1h").resolve(signal, bar) is None
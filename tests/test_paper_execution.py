@@ -0,0 +1,87 @@
+import pytest
+
+from adapters.execution import OrderRequest
+from adapters.paper_execution import (
+    OrderRejectedError,
+    PaperExecutionAdapter,
+    SyntheticOrderBook,
+)
+from db.db_handler import TradingDatabaseHandler
+
+
+def _order(symbol="BTC/USDT", side="LONG", quantity=1.0, entry=100.0):
+    return OrderRequest(symbol, side, quantity, entry, entry * 0.99, entry * 1.02)
+
+
+def test_orders_walk_the_book_rest_and_fill_on_price_updates(tmp_path):
+    db = TradingDatabaseHandler(tmp_path / "trading.db")
+    now = {"ms": 1_000.0}
+    book = SyntheticOrderBook(
+        {"BTC/USDT": 100.0}, spread_bps=2.0, level_bps=1.0, level_quantity=1.0, levels=5
+    )
+    adapter = PaperExecutionAdapter(book, db=db, clock_ms=lambda: now["ms"])
+
+    # Levels at 100.01 and 100.02 fit the limit; the rest of the order rests.
+    order_id = adapter.submit_order(_order(quantity=3.0, entry=100.025))
+    state = adapter.reconcile_order(order_id)
+    assert state["status"] == "PARTIALLY_FILLED"
+    assert state["filled_quantity"] == pytest.approx(2.0)
+    assert state["average_price"] == pytest.approx(100.015)
+    assert state["slippage_bps"] == pytest.approx(1.5)
+    assert [order.order_id for order in adapter.open_orders("BTC/USDT")] == [order_id]
+
+    now["ms"] += 250
+    assert adapter.on_price("BTC/USDT", 99.9) == 1
+    state = adapter.reconcile_order(order_id)
+    assert state["status"] == "FILLED"
+    assert state["fills"] == 2
+    assert adapter.open_orders("BTC/USDT") == []
+    with pytest.raises(OrderRejectedError, match="FILLED"):
+        adapter.cancel_order(order_id)
+
+    resting = adapter.submit_order(_order(side="SHORT", entry=101.0))
+    adapter.cancel_order(resting)
+    assert adapter.reconcile_order(resting)["status"] == "CANCELED"
+
+    assert adapter.flush() == 2
+    fills = db.get_paper_fills(order_id)
+    assert [fill["latency_ms"] for fill in fills] == [0.0, 250.0]
+    assert sum(fill["quantity"] for fill in fills) == pytest.approx(3.0)
+
+
+def test_batches_reject_invalid_orders_and_flush_fills_in_chunks(tmp_path):
+    symbols = [f"SYM{i}/USDT" for i in range(10)]
+    book = SyntheticOrderBook({symbol: 100.0 for symbol in symbols}, level_quantity=1e9)
+    db = TradingDatabaseHandler(tmp_path / "trading.db")
+    adapter = PaperExecutionAdapter(book, db=db, flush_every=5_000)
+
+    ids = adapter.submit_orders(
+        [
+            _order(symbol="SYM0/USDT", entry=101.0),
+            _order(symbol="NOPE/USDT"),
+            _order(symbol="SYM0/USDT", quantity=0.0),
+        ]
+    )
+    assert [adapter.reconcile_order(i)["status"] for i in ids] == [
+        "FILLED",
+        "REJECTED",
+        "REJECTED",
+    ]
+    with pytest.raises(OrderRejectedError, match="No paper book"):
+        adapter.submit_order(_order(symbol="NOPE/USDT"))
+
+    # Marketable limits on both sides: every order fills on submission.
+    requests = [
+        _order(symbol=symbols[i % 10], side=side, entry=101.0 if side == "LONG" else 99.0)
+        for i, side in enumerate(("LONG", "SHORT") * 10_000)
+    ]
+    ids = []
+    for offset in range(0, len(requests), 1_000):
+        ids.extend(adapter.submit_orders(requests[offset : offset + 1_000]))
+    assert {adapter.reconcile_order(i)["status"] for i in ids} == {"FILLED"}
+
+    # 20,001 fills: four automatic flushes of 5,000, one fill still pending.
+    assert len(adapter.pending_fills) == 1
+    assert adapter.flush() == 1
+    with db._get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM paper_fills").fetchone()[0] == 20_001
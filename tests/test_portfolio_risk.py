@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from db.db_handler import TradingDatabaseHandler
+from risk.portfolio import PortfolioRiskEngine, RollingCovariance
+
+
+def test_rolling_covariance_matches_full_recompute():
+    rng = np.random.default_rng(5)
+    returns = rng.normal(size=(250, 4))
+    rolling = RollingCovariance(4, window=60)
+
+    for row in returns:
+        rolling.update(row)
+
+    expected = np.cov(returns[-60:], rowvar=False)
+    assert rolling.covariance() == pytest.approx(expected, abs=1e-12)
+
+
+def _closes(series, start_ms=0):
+    return {start_ms + index * 3_600_000: float(value) for index, value in enumerate(series)}
+
+
+def test_cap_penalizes_correlated_same_side_exposure_and_persists(tmp_path):
+    rng = np.random.default_rng(9)
+    common = np.cumsum(rng.normal(scale=0.01, size=80))
+    a = 100 * np.exp(common)
+    b = 50 * np.exp(common + rng.normal(scale=0.0005, size=80))
+
+    engine = PortfolioRiskEngine(("A", "B"), window=50, min_observations=10)
+    assert engine.ingest({"A": _closes(a), "B": _closes(b)}) == 79
+
+    risk = np.array([100.0, 100.0])
+    same_side = engine.cap(["A", "B"], np.array([1.0, 1.0]), risk, cap_usdt=150)
+    hedged = engine.cap(["A", "B"], np.array([1.0, -1.0]), risk, cap_usdt=150)
+    assert same_side.portfolio_risk_usdt == pytest.approx(200, rel=0.01)
+    assert same_side.scale == pytest.approx(150 / same_side.portfolio_risk_usdt)
+    assert hedged.scale == 1.0
+
+    db = TradingDatabaseHandler(tmp_path / "trading.db")
+    engine.save(db, "baseline|1h")
+    restored = PortfolioRiskEngine.load(db, "baseline|1h", ("A", "B"), window=50)
+    assert restored.covariance.count == engine.covariance.count
+    # Already ingested bars are not counted twice after a restart.
+    assert restored.ingest({"A": _closes(a), "B": _closes(b)}) == 0
+    assert PortfolioRiskEngine.load(db, "baseline|1h", ("A", "C"), window=50).covariance.count == 0
+
+
+def test_cap_assumes_full_correlation_until_the_window_is_filled():
+    rng = np.random.default_rng(9)
+    a = 100 * np.exp(np.cumsum(rng.normal(scale=0.01, size=80)))
+    b = 50 * np.exp(np.cumsum(rng.normal(scale=0.01, size=80)))
+    risk = np.array([100.0, 100.0])
+
+    engine = PortfolioRiskEngine(("A", "B"), window=50)
+    engine.ingest({"A": _closes(a[:50]), "B": _closes(b[:50])})
+    assert engine.covariance.count == 49
+    partial = engine.cap(["A", "B"], np.array([1.0, -1.0]), risk, cap_usdt=150)
+    assert partial.portfolio_risk_usdt == pytest.approx(200)
+
+    engine.ingest({"A": _closes(a), "B": _closes(b)})
+    full = engine.cap(["A", "B"], np.array([1.0, -1.0]), risk, cap_usdt=150)
+    assert full.portfolio_risk_usdt < 200
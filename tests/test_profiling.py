@@ -0,0 +1,74 @@
+import json
+import pstats
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+import profiling
+import trainer_daemon
+from tests.helpers import CountingAdapter
+
+
+def _run_cycle(tmp_path, monkeypatch, **overrides):
+    config = replace(
+        trainer_daemon.CONFIG,
+        db_path=tmp_path / "trading.db",
+        symbols=("BTC/USDT", "ETH/USDT"),
+        strategy_ids=("test_fixed_long",),
+        ohlcv_limit=30,
+        meta_model_path=None,
+        feature_store_dir=None,
+        discord_webhook=None,
+        portfolio_risk_cap=0.0,
+        cycle_mode="single",
+        profile_dir=tmp_path / "profiles",
+        **overrides,
+    )
+    monkeypatch.setattr(trainer_daemon, "CONFIG", config)
+    monkeypatch.setattr(
+        trainer_daemon, "create_market_data_adapter", lambda *_: CountingAdapter()
+    )
+    trainer_daemon.run_nexus_cycle()
+    [directory] = (tmp_path / "profiles").iterdir()
+    return directory
+
+
+@pytest.mark.usefixtures("test_strategies")
+def test_a_cycle_or_one_symbol_leaves_pstats_and_allocation_artifacts(
+    tmp_path, monkeypatch
+):
+    directory = _run_cycle(tmp_path / "cycle", monkeypatch)
+    assert directory.name.startswith("trainer-")
+    stats = pstats.Stats(str(directory / "cycle.pstats"))
+    assert any(name == "_fetch_closed_candles" for _, _, name in stats.stats)
+    assert (directory / "cycle.allocations.txt").read_text().strip()
+    summary = json.loads((directory / "summary.json").read_text())
+    assert list(summary["sections"]) == ["cycle"]
+    assert summary["over_budget"] == []
+
+    directory = _run_cycle(tmp_path / "symbol", monkeypatch, profile_symbol="ETH/USDT")
+    summary = json.loads((directory / "summary.json").read_text())
+    # One pass through the fetch stage and one through the strategies.
+    assert summary["sections"]["ETH/USDT"]["passes"] == 2
+    assert list(summary["sections"]) == ["ETH/USDT"]
+    pstats.Stats(str(directory / "ETH-USDT.pstats"))
+
+
+def test_the_memory_budget_fails_the_run_after_writing_artifacts(tmp_path):
+    with pytest.raises(profiling.MemoryBudgetExceeded, match="cycle="):
+        with profiling.profiled(
+            "monitor", output_dir=tmp_path, top_allocations=3, memory_budget_mb=1
+        ):
+            block = np.ones(1_000_000)  # ~7.6 MiB
+            del block
+
+    [directory] = tmp_path.iterdir()
+    summary = json.loads((directory / "summary.json").read_text())
+    assert summary["sections"]["cycle"]["peak_mb"] > 7
+    assert summary["over_budget"] == ["cycle"]
+    assert len((directory / "cycle.allocations.txt").read_text().splitlines()) <= 3
+
+    with profiling.profiled("monitor", output_dir=None) as profiler:
+        assert profiler is None
+        assert isinstance(profiling.symbol("BTC/USDT"), profiling.nullcontext)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from risk.bet_sizing import fractional_kelly, fractional_kelly_array
+from risk.risk_manager import (
+    REJECT_NONE,
+    REJECTION_MESSAGES,
+    RiskValidationError,
+    calculate_position_size,
+    calculate_position_sizes,
+)
+
+
+def test_batch_sizing_matches_scalar_rules():
+    equity = np.array([10_000, 0, 10_000, 10_000, 10_000])
+    entries = np.array([100, 100, 100, -1, 100])
+    stops = np.array([95, 95, 100, 95, 101])
+
+    batch = calculate_position_sizes(
+        equity_usdt=equity,
+        risk_fraction=0.0075,
+        entry_prices=entries,
+        stop_losses=stops,
+    )
+
+    for row in range(len(entries)):
+        kwargs = dict(
+            equity_usdt=float(equity[row]),
+            risk_fraction=0.0075,
+            entry_price=float(entries[row]),
+            stop_loss=float(stops[row]),
+        )
+        if batch.rejection[row] == REJECT_NONE:
+            sized = calculate_position_size(**kwargs)
+            assert batch.quantity[row] == sized.quantity
+            assert batch.risk_amount_usdt[row] == sized.risk_amount_usdt
+        else:
+            assert np.isnan(batch.quantity[row])
+            with pytest.raises(RiskValidationError) as excinfo:
+                calculate_position_size(**kwargs)
+            assert str(excinfo.value) == REJECTION_MESSAGES[batch.rejection[row]]
+
+    assert batch.accepted.tolist() == [True, False, False, False, True]
+
+
+def test_fractional_kelly_handles_missing_loss_statistics():
+    assert fractional_kelly(0.6, 1.0, 0.0) == 0.0
+    assert fractional_kelly(0.6, 1.5, 1.0) == pytest.approx(0.25 * (0.6 - 0.4 / 1.5))
+
+    values = fractional_kelly_array([0.6, 0.2, 0.6], [1.5, 1.0, 1.0], [1.0, 1.0, 0.0])
+    assert values[1] == 0.0
+    assert values[2] == 0.0
@@ -0,0 +1,83 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from db.db_handler import TradingDatabaseHandler
+from tests.helpers import insert_signal
+
+
+def _mark(db, signal_id, outcome, price, at="2026-01-01T02:00:00+00:00"):
+    db.mark_signal_outcome(
+        signal_id,
+        outcome=outcome,
+        outcome_price=price,
+        outcome_at=at,
+        status="CLOSED_AMBIGUOUS" if outcome == "AMBIGUOUS" else "CLOSED",
+    )
+
+
+def _table(db):
+    with db._get_connection() as conn:
+        return [dict(row) for row in conn.execute(
+            "SELECT * FROM signal_analytics ORDER BY strategy_id, symbol, day"
+        ).fetchall()]
+
+
+def test_outcomes_update_aggregates_once_and_match_a_rebuild(tmp_path):
+    db = TradingDatabaseHandler(tmp_path / "trading.db")
+    ids = [insert_signal(db, index) for index in range(6)]
+    with db._get_connection() as conn:
+        conn.execute("UPDATE signals SET symbol = 'BTC/USDT'")
+
+    # Entry 100, SL 99, TP 102: a take profit is +2R, a stop loss -1R.
+    _mark(db, ids[0], "TAKE_PROFIT", 102.0)
+    _mark(db, ids[1], "TAKE_PROFIT", 102.0)
+    _mark(db, ids[2], "STOP_LOSS", 99.0)
+    _mark(db, ids[3], "AMBIGUOUS", None)
+    # An unclosed source candle is a data rejection, not a result.
+    db.mark_signal_outcome(
+        ids[5],
+        outcome="REJECTED_DATA",
+        outcome_price=None,
+        outcome_at="2026-01-01T02:00:00+00:00",
+        status="REJECTED",
+    )
+    db.expire_due_signals(datetime(2026, 1, 2, tzinfo=timezone.utc))
+
+    [summary] = db.get_signal_analytics()
+    assert summary["resolved"] == 5
+    assert summary["hit_rate"] == pytest.approx(2 / 3)
+    assert summary["expectancy_r"] == pytest.approx(1.0)
+    assert summary["ambiguous_rate"] == pytest.approx(0.2)
+    assert summary["expired"] == 1
+    assert [row["day"] for row in _table(db)] == ["2026-01-01", "2026-01-02"]
+
+    incremental = _table(db)
+    with db._get_connection() as conn:
+        conn.execute("DELETE FROM signal_analytics")
+    assert db.get_signal_analytics() == []
+    assert db.rebuild_signal_analytics() == 2
+    rebuilt = _table(db)
+    for row in incremental + rebuilt:
+        del row["updated_at"]
+    assert rebuilt == incremental
+
+    # Only the first realized outcome of a signal is aggregated.
+    _mark(db, ids[0], "STOP_LOSS", 99.0)
+    assert db.get_signal_analytics()[0]["resolved"] == 5
+
+
+def test_existing_databases_are_backfilled_when_the_table_appears(tmp_path):
+    db = TradingDatabaseHandler(tmp_path / "trading.db")
+    signal_id = insert_signal(db, 1)
+    _mark(db, signal_id, "TAKE_PROFIT", 102.0)
+    with db._get_connection() as conn:
+        conn.execute("DROP TABLE signal_analytics")
+
+    reopened = TradingDatabaseHandler(db.db_path)
+    [summary] = reopened.get_signal_analytics(group_by=("strategy_id",))
+    assert summary["take_profit"] == 1
+    # created_at 00:00, outcome at 02:00.
+    assert summary["avg_hours_to_outcome"] == pytest.approx(2.0)
+    with pytest.raises(ValueError, match="Cannot group"):
+        reopened.get_signal_analytics(group_by=("entry",))
@@ -0,0 +1,22 @@
+from benchmarks.startup import (
+    STARTUP_BUDGET_SECONDS,
+    heavy_imports,
+    import_report,
+    noop_monitor_pass,
+)
+
+
+def test_entry_points_import_no_heavy_dependencies():
+    for module in ("monitor_trades", "trainer_daemon"):
+        timings = import_report(module)
+        assert timings[-1].module == module
+        assert heavy_imports(timings) == [], module
+
+    # The indicators import scipy only when a bulk recursive average runs.
+    assert heavy_imports(import_report("features.indicators")) == []
+
+
+def test_a_noop_monitor_pass_stays_within_the_startup_budget(tmp_path):
+    seconds, heavy = noop_monitor_pass(tmp_path / "trading.db")
+    assert heavy == []
+    assert seconds < STARTUP_BUDGET_SECONDS
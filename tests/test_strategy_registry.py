@@ -0,0 +1,53 @@
+from dataclasses import replace
+
+import pytest
+
+import trainer_daemon
+from db.db_handler import TradingDatabaseHandler
+from strategies.registry import create_strategies
+from tests.helpers import CountingAdapter
+
+
+@pytest.mark.usefixtures("test_strategies")
+def test_one_fetch_per_symbol_fans_out_to_every_strategy(tmp_path, monkeypatch, capsys):
+    adapter = CountingAdapter()
+    config = replace(
+        trainer_daemon.CONFIG,
+        db_path=tmp_path / "trading.db",
+        symbols=("BTC/USDT", "ETH/USDT"),
+        strategy_ids=("baseline_ml_v1", "test_fixed_long", "test_broken"),
+        ohlcv_limit=30,
+        meta_model_path=None,
+        feature_store_dir=None,
+        discord_webhook=None,
+        portfolio_risk_cap=0.0,
+    )
+    monkeypatch.setattr(trainer_daemon, "CONFIG", config)
+    monkeypatch.setattr(trainer_daemon, "create_market_data_adapter", lambda *_: adapter)
+
+    trainer_daemon.run_nexus_cycle()
+
+    assert adapter.fetches == ["BTC/USDT", "ETH/USDT"]
+    with TradingDatabaseHandler(config.db_path)._get_connection() as conn:
+        rows = conn.execute(
+            "SELECT strategy_id, COUNT(*) FROM signals GROUP BY strategy_id"
+        ).fetchall()
+    assert dict(rows) == {"baseline_ml_v1": 2, "test_fixed_long": 2}
+
+    output = capsys.readouterr().out
+    assert "Strategy test_broken: evaluated=0" in output
+    assert "errors=2" in output.split("Strategy test_broken:")[1].splitlines()[0]
+
+
+def test_unknown_strategy_ids_are_rejected():
+    with pytest.raises(ValueError, match="not_a_strategy"):
+        create_strategies(replace(trainer_daemon.CONFIG, strategy_ids=("not_a_strategy",)))
+
+
+def test_the_baseline_persists_under_a_custom_strategy_id_label():
+    config = replace(
+        trainer_daemon.CONFIG, strategy_id="baseline_ml_v2", strategy_ids=("baseline_ml_v1",)
+    )
+    [strategy] = create_strategies(config)
+    assert strategy.strategy_id == "baseline_ml_v2"
+    assert strategy.model_state_key("BTC/USDT").startswith("baseline_ml_v2|")
@@ -8,250 +8,741 @@ P0 responsibilities:
 - write through the canonical database owner;
 - generate at most one signal per strategy/symbol/timeframe/candle;
 - attach an explicit expiry;
-- calculate risk and position size before a signal can become ACTIVE.
+- calculate risk and position size before a signal can become ACTIVE;
+- cap the correlated risk of a cycle's ACTIVE signals in one step;
+- optionally meta-filter all candidates of a cycle in one batch call;
+- fetch each symbol once and evaluate every configured strategy on it;
+- start symbols by priority only while they fit the cycle's time budget;
+- optionally share a cycle's symbols with other workers through leases;
+- record per-stage timings and counters of every cycle;
+- optionally profile a cycle, or one symbol, with cProfile and tracemalloc;
+- overlap fetching with strategy evaluation, and persistence with
+  notifications, through bounded PIPELINE_DEPTH queues.
 
 This module does not place live orders.
 """
 
 import math
+import time
 import warnings
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timezone
 
-import pandas as pd
-from sklearn.linear_model import SGDClassifier, SGDRegressor
-from sklearn.preprocessing import StandardScaler
+import numpy as np
 
-from adapters.market_data import create_market_data_adapter, timeframe_to_ms
+import metrics
+import profiling
+from cycle_pipeline import staged
+from adapters.market_data import (
+    CandleArray,
+    create_market_data_adapter,
+    timeframe_to_ms,
+)
 from config import CONFIG
+from cycle_queue import CycleWorkQueue, cycle_candle_ms, default_worker_id
+from cycle_scheduler import (
+    CycleScheduler,
+    WorkItem,
+    build_work_items,
+    load_deferred,
+    save_deferred,
+)
 from db.db_handler import TradingDatabaseHandler
+from features.store import FeatureStore, update_feature_store
+from models.baseline import signal_expiry_ms
+from models.meta_model import MetaModel
 from notifications.discord import send_discord_signal
+from risk.portfolio import PortfolioRiskEngine
 from risk.risk_manager import RiskValidationError, calculate_position_size
+from strategies.base import Strategy
+from strategies.registry import create_strategies
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 
+# Below this portfolio scale the capped sizes are no longer tradeable; the
+# cycle's ACTIVE signals are risk-blocked instead of emitted at ~zero size.
+MIN_PORTFOLIO_SCALE = 0.01
 
-def _to_dataframe(candles) -> pd.DataFrame:
-    return pd.DataFrame(
-        [
-            {
-                "ts": candle.timestamp_ms,
-                "o": candle.open,
-                "h": candle.high,
-                "l": candle.low,
-                "c": candle.close,
-                "v": candle.volume,
-            }
-            for candle in candles
-        ]
-    )
 
+def _signal_expiry(
+    candle_timestamp_ms: int,
+    timeframe_ms: int,
+    validity_bars: int,
+) -> datetime:
+    expiry_ms = signal_expiry_ms(candle_timestamp_ms, timeframe_ms, validity_bars)
+    return datetime.fromtimestamp(expiry_ms / 1000, tz=timezone.utc)
 
-def _build_models(df: pd.DataFrame):
-    """Train the existing baseline models without adding a new strategy."""
-    df = df.copy()
-    df["ret"] = df["c"].pct_change().fillna(0.0)
-    df["vol"] = (df["h"] - df["l"]) / df["c"]
-
-    feature_columns = ["ret", "vol"]
-    supervised = df.iloc[:-1].copy()
-
-    if len(supervised) < 20:
-        raise ValueError("Insufficient closed-candle history for model training.")
 
-    X = supervised[feature_columns].to_numpy(dtype=float)
-    y_class = (
-        df["ret"].shift(-1).iloc[:-1].to_numpy(dtype=float) > 0
-    ).astype(int)
-    y_reg = df["ret"].shift(-1).abs().iloc[:-1].to_numpy(dtype=float)
+@dataclass(frozen=True)
+class _Proposal:
+    """A fully sized signal candidate awaiting the cycle-wide filters."""
+
+    strategy_id: str
+    exchange: str
+    symbol: str
+    candle_timestamp_ms: int
+    side: str
+    confidence: float
+    entry: float
+    stop_loss: float
+    take_profit: float
+    predicted_magnitude: float
+    expires_at: datetime
+    status: str
+    outcome: str
+    position_size: float | None
+    risk_amount: float | None
+    meta_features: tuple[float, ...] | None
+
+
+@dataclass(frozen=True)
+class _Fetched:
+    """Result of the fetch stage for one symbol."""
+
+    symbol: str
+    candles: CandleArray | None = None
+    exchange: str | None = None
+    error: Exception | None = None
+
+
+@dataclass(frozen=True)
+class _Persisted:
+    """Result of the persist stage for one proposal."""
+
+    proposal: _Proposal
+    signal_id: int | None = None
+    error: Exception | None = None
+
+
+@dataclass
+class _StrategyCounters:
+    evaluated: int = 0
+    no_signal: int = 0
+    generated: int = 0
+    duplicates: int = 0
+    risk_blocked: int = 0
+    meta_filtered: int = 0
+    cpu_skipped: int = 0
+    errors: int = 0
+    cpu_seconds: float = 0.0
+    stats: dict[str, int] = field(default_factory=dict)
+
+
+def _fetch_closed_candles(
+    db: TradingDatabaseHandler,
+    adapter,
+    symbol: str,
+    timeframe_ms: int,
+) -> tuple[CandleArray, str]:
+    """Return the closed candles and the exchange that actually served them."""
+    with metrics.span("fetch", symbol):
+        candles = adapter.fetch_closed_ohlcv(
+            symbol,
+            CONFIG.timeframe,
+            CONFIG.ohlcv_limit,
+        )
+
+    if not candles:
+        raise ValueError("No closed candles returned.")
+
+    # The adapter guarantees closed candles. Recheck the invariant here
+    # so a future adapter cannot silently violate the trading contract.
+    now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    latest = candles[-1]
+    if latest.timestamp_ms + timeframe_ms > now_ms:
+        raise ValueError(f"Latest candle for {symbol} is not fully closed.")
+
+    array = CandleArray.from_candles(candles)
+    exchange = adapter.provenance(symbol)
+
+    # Keep closed-candle history and derived features for research; losing a
+    # history write must never cost the live signal.
+    try:
+        with metrics.span("store_candles", symbol):
+            db.store_candles(
+                exchange=exchange,
+                symbol=symbol,
+                timeframe=CONFIG.timeframe,
+                candles=candles,
+            )
+        if CONFIG.feature_store_dir is not None:
+            with metrics.span("feature_store", symbol):
+                update_feature_store(
+                    FeatureStore(CONFIG.feature_store_dir),
+                    exchange=exchange,
+                    symbol=symbol,
+                    timeframe=CONFIG.timeframe,
+                    candles=array,
+                )
+    except Exception as exc:
+        print(f"⚠️ Candle history not stored for {symbol}: {exc}")
 
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+    return array, exchange
 
-    clf = SGDClassifier(loss="log_loss", random_state=42)
-    clf.fit(X_scaled, y_class)
 
-    reg = SGDRegressor(
-        loss="epsilon_insensitive",
-        learning_rate="pa1",
-        eta0=1.0,
-        epsilon=0.01,
-        random_state=42,
+def _propose_signal(
+    strategy: Strategy,
+    candles: CandleArray,
+    symbol: str,
+    timeframe_ms: int,
+    exchange: str,
+) -> _Proposal | None:
+    signal = strategy.evaluate(symbol, candles)
+    if signal is None:
+        return None
+
+    if signal.side not in {"LONG", "SHORT"} or not all(
+        math.isfinite(value)
+        for value in (
+            signal.confidence,
+            signal.entry,
+            signal.stop_loss,
+            signal.take_profit,
+            signal.predicted_magnitude,
+        )
+    ):
+        raise ValueError(f"Invalid {strategy.strategy_id} signal for {symbol}: {signal}")
+
+    candle_timestamp_ms = int(candles.timestamp_ms[-1])
+    expires_at = _signal_expiry(
+        candle_timestamp_ms,
+        timeframe_ms,
+        CONFIG.signal_validity_bars,
     )
-    reg.fit(X_scaled, y_reg)
 
-    latest = df.iloc[-1]
-    latest_features = scaler.transform(
-        [[float(latest["ret"]), float(latest["vol"])] ]
+    position_size = None
+    risk_amount = None
+    status = "ACTIVE"
+    outcome = "PENDING"
+
+    try:
+        sized = calculate_position_size(
+            equity_usdt=CONFIG.account_equity_usdt,
+            risk_fraction=CONFIG.risk_per_trade,
+            entry_price=signal.entry,
+            stop_loss=signal.stop_loss,
+        )
+        position_size = sized.quantity
+        risk_amount = sized.risk_amount_usdt
+    except RiskValidationError as exc:
+        # Do not invent an account balance or position size.
+        status = "RISK_BLOCKED"
+        outcome = "REJECTED_RISK"
+        print(f"⚠️ Risk blocked {strategy.strategy_id} {symbol}: {exc}")
+
+    return _Proposal(
+        strategy_id=strategy.strategy_id,
+        exchange=exchange,
+        symbol=symbol,
+        candle_timestamp_ms=candle_timestamp_ms,
+        side=signal.side,
+        confidence=signal.confidence,
+        entry=signal.entry,
+        stop_loss=signal.stop_loss,
+        take_profit=signal.take_profit,
+        predicted_magnitude=signal.predicted_magnitude,
+        expires_at=expires_at,
+        status=status,
+        outcome=outcome,
+        position_size=position_size,
+        risk_amount=risk_amount,
+        meta_features=signal.meta_features,
     )
 
-    probability_up = float(clf.predict_proba(latest_features)[0][1])
-    predicted_magnitude = float(reg.predict(latest_features)[0])
 
-    return probability_up, predicted_magnitude
+def _apply_meta_filter(proposals: list[_Proposal]) -> list[_Proposal]:
+    """Score every ACTIVE candidate with the meta model in a single call."""
+    if CONFIG.meta_model_path is None:
+        return proposals
 
+    candidates = [
+        index for index, proposal in enumerate(proposals)
+        if proposal.status == "ACTIVE" and proposal.meta_features is not None
+    ]
+    if not candidates:
+        return proposals
 
-def _signal_expiry(
-    candle_timestamp_ms: int,
-    timeframe_ms: int,
-    validity_bars: int,
-) -> datetime:
-    candle_close_ms = candle_timestamp_ms + timeframe_ms
-    expiry_ms = candle_close_ms + timeframe_ms * validity_bars
-    return datetime.fromtimestamp(expiry_ms / 1000, tz=timezone.utc)
-
-
-def run_nexus_cycle() -> None:
-    db = TradingDatabaseHandler(CONFIG.db_path)
-    adapter = create_market_data_adapter(CONFIG.market_data_exchange_id)
+    meta_model = MetaModel.load(CONFIG.meta_model_path)
+    probabilities = meta_model.probability(
+        [proposals[index].meta_features for index in candidates]
+    )
 
-    generated = 0
-    duplicates = 0
-    risk_blocked = 0
-    errors = 0
+    filtered = list(proposals)
+    for index, probability in zip(candidates, probabilities):
+        if probability < CONFIG.meta_model_threshold:
+            filtered[index] = replace(
+                proposals[index],
+                status="META_REJECTED",
+                outcome="REJECTED_META",
+                position_size=None,
+                risk_amount=None,
+            )
+    return filtered
 
-    timeframe_ms = timeframe_to_ms(CONFIG.timeframe)
 
+def _stored_history(
+    db: TradingDatabaseHandler,
+    fetched: dict[str, CandleArray],
+    timeframe_ms: int,
+    candle_timestamp_ms: int,
+) -> dict[str, CandleArray]:
+    """Complete this worker's fetched windows with other workers' stored candles.
+
+    Candles are stored under the exchange that served them, so a symbol a
+    hedge exchange answered is read from there: the configured exchange
+    whose window reaches the latest bar wins, in rank order on ties.
+    """
+    exchanges = (CONFIG.market_data_exchange_id, *CONFIG.market_data_hedge_exchanges)
+    history = dict(fetched)
     for symbol in CONFIG.symbols:
-        try:
-            candles = adapter.fetch_closed_ohlcv(
-                symbol,
-                CONFIG.timeframe,
-                CONFIG.ohlcv_limit,
+        if symbol in history:
+            continue
+        for exchange in exchanges:
+            candles = db.get_candle_array(
+                exchange=exchange,
+                symbol=symbol,
+                timeframe=CONFIG.timeframe,
+                start_ms=candle_timestamp_ms - CONFIG.ohlcv_limit * timeframe_ms,
+                end_ms=candle_timestamp_ms,
+            )
+            if len(candles) and (
+                symbol not in history
+                or candles.timestamp_ms[-1] > history[symbol].timestamp_ms[-1]
+            ):
+                history[symbol] = candles
+    return history
+
+
+def _apply_portfolio_cap(
+    db: TradingDatabaseHandler,
+    proposals: list[_Proposal],
+    fetched: dict[str, CandleArray],
+    queue: CycleWorkQueue | None = None,
+) -> tuple[list[_Proposal], float]:
+    """Scale all ACTIVE sizes of this cycle by one common correlated-risk factor.
+
+    With a shared queue, the ACTIVE exposure other workers already persisted
+    for the same candle counts against the cap without being rescaled. Two
+    workers capping at the same instant do not see each other's new signals,
+    so the cap is best effort across workers. Once committed exposure leaves
+    less than ``MIN_PORTFOLIO_SCALE`` of the new risk, the new signals are
+    risk-blocked rather than emitted at (near) zero size.
+    """
+    state_key = f"{CONFIG.strategy_id}|{CONFIG.timeframe}"
+    engine = PortfolioRiskEngine.load(
+        db, state_key, CONFIG.symbols, window=CONFIG.correlation_window_bars
+    )
+    committed = []
+    if queue is not None:
+        timeframe_ms = timeframe_to_ms(CONFIG.timeframe)
+        fetched = _stored_history(db, fetched, timeframe_ms, queue.candle_timestamp_ms)
+        committed = db.get_cycle_exposure(
+            timeframe=CONFIG.timeframe, candle_timestamp_ms=queue.candle_timestamp_ms
+        )
+    if set(fetched) == set(CONFIG.symbols):
+        engine.ingest(
+            {
+                symbol: dict(zip(candles.timestamp_ms.tolist(), candles.close.tolist()))
+                for symbol, candles in fetched.items()
+            }
+        )
+        engine.save(db, state_key)
+
+    if CONFIG.portfolio_risk_cap <= 0:
+        return proposals, 1.0
+
+    active = [
+        index for index, proposal in enumerate(proposals)
+        if proposal.status == "ACTIVE" and proposal.risk_amount is not None
+    ]
+    cap = engine.cap(
+        [proposals[index].symbol for index in active],
+        np.array([1.0 if proposals[index].side == "LONG" else -1.0 for index in active]),
+        np.array([proposals[index].risk_amount for index in active]),
+        CONFIG.portfolio_risk_cap * CONFIG.account_equity_usdt,
+        committed_symbols=[row["symbol"] for row in committed],
+        committed_directions=np.array(
+            [1.0 if row["signal_type"] == "LONG" else -1.0 for row in committed]
+        ),
+        committed_risk_amounts=np.array(
+            [row["risk_amount_usdt"] for row in committed], dtype=float
+        ),
+    )
+    if cap.scale >= 1.0:
+        return proposals, 1.0
+
+    capped = list(proposals)
+    if cap.scale < MIN_PORTFOLIO_SCALE:
+        print(
+            f"⚠️ Portfolio risk cap {cap.cap_usdt:.2f} USDT is exhausted "
+            f"(scale {cap.scale:.4f}); risk-blocking {len(active)} ACTIVE signal(s)"
+        )
+        for index in active:
+            capped[index] = replace(
+                proposals[index],
+                status="RISK_BLOCKED",
+                outcome="REJECTED_RISK",
+                position_size=None,
+                risk_amount=None,
             )
+        return capped, cap.scale
 
-            if not candles:
-                raise ValueError("No closed candles returned.")
+    print(
+        f"⚠️ Portfolio risk {cap.portfolio_risk_usdt:.2f} USDT exceeds cap "
+        f"{cap.cap_usdt:.2f} USDT; scaling ACTIVE sizes by {cap.scale:.4f}"
+    )
+    for index in active:
+        proposal = proposals[index]
+        capped[index] = replace(
+            proposal,
+            risk_amount=proposal.risk_amount * cap.scale,
+            position_size=proposal.position_size * cap.scale,
+        )
+    return capped, cap.scale
+
+
+def _persist_signal(db: TradingDatabaseHandler, proposal: _Proposal) -> int | None:
+    signal_timestamp = datetime.now(timezone.utc)
+    signal_key = db.build_signal_key(
+        strategy_id=proposal.strategy_id,
+        symbol=proposal.symbol,
+        timeframe=CONFIG.timeframe,
+        candle_timestamp_ms=proposal.candle_timestamp_ms,
+    )
 
-            # The adapter guarantees closed candles. Recheck the invariant here
-            # so a future adapter cannot silently violate the trading contract.
-            now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
-            latest = candles[-1]
-            if latest.timestamp_ms + timeframe_ms > now_ms:
-                raise ValueError(f"Latest candle for {symbol} is not fully closed.")
+    return db.insert_signal(
+        {
+            "signal_key": signal_key,
+            "timestamp": signal_timestamp.isoformat(),
+            "symbol": proposal.symbol,
+            "signal_type": proposal.side,
+            "timeframe": CONFIG.timeframe,
+            "strategy_id": proposal.strategy_id,
+            "candle_timestamp_ms": proposal.candle_timestamp_ms,
+            "candle_closed": 1,
+            "entry": proposal.entry,
+            "sl": proposal.stop_loss,
+            "tp": proposal.take_profit,
+            "confidence": proposal.confidence,
+            "outcome": proposal.outcome,
+            "pred_move": proposal.predicted_magnitude,
+            "created_at": signal_timestamp.isoformat(),
+            "expires_at": proposal.expires_at.isoformat(),
+            "status": proposal.status,
+            "exchange": proposal.exchange,
+            "risk_per_trade": CONFIG.risk_per_trade,
+            "risk_amount_usdt": proposal.risk_amount,
+            "position_size": proposal.position_size,
+        }
+    )
 
-            df = _to_dataframe(candles)
-            probability_up, predicted_magnitude = _build_models(df)
 
-            if not (
-                math.isfinite(probability_up)
-                and math.isfinite(predicted_magnitude)
-                and 0.0 <= probability_up <= 1.0
-            ):
-                raise ValueError(
-                    f"Non-finite model output for {symbol}: "
-                    f"probability={probability_up}, magnitude={predicted_magnitude}"
+def _fetch_stage(db: TradingDatabaseHandler, adapter, timeframe_ms: int):
+    def fetch(symbol: str) -> _Fetched:
+        with profiling.symbol(symbol):
+            try:
+                candles, exchange = _fetch_closed_candles(
+                    db, adapter, symbol, timeframe_ms
                 )
+            except Exception as exc:
+                return _Fetched(symbol, error=exc)
+        return _Fetched(symbol, candles, exchange)
 
-            side = "LONG" if probability_up > 0.5 else "SHORT"
-            confidence = probability_up if side == "LONG" else 1.0 - probability_up
-            entry = float(latest.close)
+    return fetch
 
-            # Preserve the current baseline stop model for P0, but move the
-            # account-risk calculation into the dedicated risk layer.
-            move = entry * max(
-                abs(predicted_magnitude), CONFIG.min_stop_distance_pct
-            )
-            stop_loss = entry - move if side == "LONG" else entry + move
-            take_profit = (
-                entry + move * CONFIG.reward_risk_ratio
-                if side == "LONG"
-                else entry - move * CONFIG.reward_risk_ratio
-            )
 
-            signal_timestamp = datetime.now(timezone.utc)
-            expires_at = _signal_expiry(
-                latest.timestamp_ms,
-                timeframe_ms,
-                CONFIG.signal_validity_bars,
-            )
+def _persist_stage(db: TradingDatabaseHandler):
+    def persist(proposal: _Proposal) -> _Persisted:
+        try:
+            with metrics.span("persist", proposal.symbol):
+                return _Persisted(proposal, _persist_signal(db, proposal))
+        except Exception as exc:
+            return _Persisted(proposal, error=exc)
 
-            position_size = None
-            risk_amount = None
-            status = "ACTIVE"
-            outcome = "PENDING"
+    return persist
 
-            try:
-                sized = calculate_position_size(
-                    equity_usdt=CONFIG.account_equity_usdt,
-                    risk_fraction=CONFIG.risk_per_trade,
-                    entry_price=entry,
-                    stop_loss=stop_loss,
-                )
-                position_size = sized.quantity
-                risk_amount = sized.risk_amount_usdt
-            except RiskValidationError as exc:
-                # Do not invent an account balance or position size.
-                status = "RISK_BLOCKED"
-                outcome = "REJECTED_RISK"
-                risk_blocked += 1
-                print(f"⚠️ Risk blocked {symbol}: {exc}")
-
-            signal_key = db.build_signal_key(
-                strategy_id=CONFIG.strategy_id,
-                symbol=symbol,
-                timeframe=CONFIG.timeframe,
-                candle_timestamp_ms=latest.timestamp_ms,
-            )
 
-            signal_id = db.insert_signal(
-                {
-                    "signal_key": signal_key,
-                    "timestamp": signal_timestamp.isoformat(),
-                    "symbol": symbol,
-                    "signal_type": side,
-                    "timeframe": CONFIG.timeframe,
-                    "strategy_id": CONFIG.strategy_id,
-                    "candle_timestamp_ms": latest.timestamp_ms,
-                    "candle_closed": 1,
-                    "entry": entry,
-                    "sl": stop_loss,
-                    "tp": take_profit,
-                    "confidence": confidence,
-                    "outcome": outcome,
-                    "pred_move": predicted_magnitude,
-                    "created_at": signal_timestamp.isoformat(),
-                    "expires_at": expires_at.isoformat(),
-                    "status": status,
-                    "exchange": CONFIG.market_data_exchange_id,
-                    "risk_per_trade": CONFIG.risk_per_trade,
-                    "risk_amount_usdt": risk_amount,
-                    "position_size": position_size,
-                }
-            )
+def _pipeline_depth() -> int:
+    # cProfile and tracemalloc only see the calling thread, so a profiled
+    # cycle runs its stages inline.
+    return 0 if CONFIG.profile_dir is not None else CONFIG.pipeline_depth
+
 
-            if signal_id is None:
-                duplicates += 1
+def _schedule_items(db: TradingDatabaseHandler, state_key: str) -> list[WorkItem]:
+    weights = dict(CONFIG.symbol_priority)
+    try:
+        return build_work_items(
+            CONFIG.symbols,
+            weights=weights,
+            activity=db.get_symbol_activity(
+                exchange=CONFIG.market_data_exchange_id, timeframe=CONFIG.timeframe
+            ),
+            deferred_before=load_deferred(db, state_key),
+        )
+    except Exception as exc:
+        print(f"⚠️ Scheduling state unavailable; using configured weights: {exc}")
+        return build_work_items(CONFIG.symbols, weights=weights)
+
+
+def run_nexus_cycle() -> None:
+    with metrics.instrumented(
+        "trainer",
+        enabled=CONFIG.metrics_enabled,
+        db_path=CONFIG.db_path,
+        output_dir=CONFIG.metrics_dir,
+    ), profiling.profiled(
+        "trainer",
+        output_dir=CONFIG.profile_dir,
+        symbol=CONFIG.profile_symbol,
+        top_allocations=CONFIG.profile_top_allocations,
+        memory_budget_mb=CONFIG.profile_memory_budget_mb,
+    ):
+        _run_nexus_cycle()
+
+
+def _run_nexus_cycle() -> None:
+    scheduler = CycleScheduler(
+        CONFIG.cycle_time_budget_seconds,
+        reserve_seconds=CONFIG.cycle_reserve_seconds,
+    )
+    db = TradingDatabaseHandler(CONFIG.db_path)
+    adapter = create_market_data_adapter(
+        CONFIG.market_data_exchange_id,
+        CONFIG.market_data_hedge_exchanges,
+        CONFIG.market_data_hedge_percentile,
+    )
+    strategies = create_strategies(CONFIG)
+    counters = {strategy.strategy_id: _StrategyCounters() for strategy in strategies}
+
+    errors = 0
+    timeframe_ms = timeframe_to_ms(CONFIG.timeframe)
+
+    queue = None
+    if CONFIG.cycle_mode == "sharded":
+        queue = CycleWorkQueue(
+            db,
+            timeframe=CONFIG.timeframe,
+            candle_timestamp_ms=cycle_candle_ms(
+                timeframe_ms, int(datetime.now(timezone.utc).timestamp() * 1000)
+            ),
+            worker_id=CONFIG.worker_id or default_worker_id(),
+            lease_seconds=CONFIG.cycle_task_lease_seconds,
+            max_attempts=CONFIG.cycle_task_max_attempts,
+        )
+        queue.enqueue(CONFIG.symbols)
+
+    for strategy in strategies:
+        try:
+            with metrics.span("state_load"):
+                strategy.begin_cycle(db)
+        except Exception as exc:
+            counters[strategy.strategy_id].errors += 1
+            print(f"❌ {strategy.strategy_id} state load error: {exc}")
+
+    # Phase 1: fetch each symbol once and fan the shared window out to every
+    # strategy. A failing or over-budget strategy never affects the others.
+    # Symbols that would not finish before the deadline are deferred; in
+    # sharded mode they are simply left in the queue for other workers.
+    schedule_key = f"trainer|{CONFIG.timeframe}"
+    items = _schedule_items(db, schedule_key)
+    if queue is None:
+        work = (item.key for item in scheduler.schedule(items))
+    else:
+        order = [item.key for item in sorted(items, key=WorkItem.priority)]
+        work = scheduler.drain(lambda: queue.claim(order))
+
+    # Fetching runs ahead of the strategies in its own thread. The scheduler
+    # is driven from that thread and, through the bounded queue, times each
+    # symbol at the pace of the slower of the two stages.
+    depth = _pipeline_depth()
+    proposals: list[_Proposal] = []
+    fetched: dict[str, CandleArray] = {}
+    for result in staged(
+        work, _fetch_stage(db, adapter, timeframe_ms), depth=depth, name="fetch"
+    ):
+        symbol = result.symbol
+        if result.error is not None:
+            errors += 1
+            print(f"❌ Error {symbol}: {result.error}")
+            if queue is not None:
+                queue.fail(symbol, str(result.error))
+            continue
+        candles, exchange = result.candles, result.exchange
+        fetched[symbol] = candles
+        if queue is not None:
+            queue.heartbeat()
+
+        with profiling.symbol(symbol):
+            for strategy in strategies:
+                counter = counters[strategy.strategy_id]
+                budget = CONFIG.strategy_cpu_budget_seconds
+                if budget and counter.cpu_seconds >= budget:
+                    counter.cpu_skipped += 1
+                    continue
+
+                # Thread CPU only: the fetch stage runs concurrently on its
+                # own thread and must not be charged to this strategy.
+                started = time.thread_time()
+                try:
+                    with metrics.span(f"strategy:{strategy.strategy_id}", symbol):
+                        proposal = _propose_signal(
+                            strategy, candles, symbol, timeframe_ms, exchange
+                        )
+                except Exception as exc:
+                    counter.errors += 1
+                    print(f"❌ Error {strategy.strategy_id} {symbol}: {exc}")
+                    continue
+                finally:
+                    counter.cpu_seconds += time.thread_time() - started
+                    if queue is not None:
+                        queue.heartbeat()
+                counter.evaluated += 1
+
+                if proposal is None:
+                    counter.no_signal += 1
+                    continue
+                if proposal.status == "RISK_BLOCKED":
+                    counter.risk_blocked += 1
+                proposals.append(proposal)
+
+    if scheduler.deferred:
+        print(
+            f"⚠️ Cycle budget reached after {scheduler.elapsed():.1f}s; deferred "
+            f"{len(scheduler.deferred)} symbol(s) to the next cycle: "
+            f"{', '.join(scheduler.deferred)}"
+        )
+    if queue is None:
+        try:
+            save_deferred(db, schedule_key, scheduler.deferred)
+        except Exception as exc:
+            errors += 1
+            print(f"❌ Scheduling state persistence error: {exc}")
+
+    for strategy in strategies:
+        counter = counters[strategy.strategy_id]
+        try:
+            with metrics.span("state_save"):
+                strategy.end_cycle(db)
+        except Exception as exc:
+            counter.errors += 1
+            print(f"❌ {strategy.strategy_id} state persistence error: {exc}")
+        counter.stats = dict(strategy.cycle_stats())
+        counter.errors += counter.stats.pop("errors", 0)
+
+    # Phase 2: cycle-wide filters see every candidate at once.
+    try:
+        with metrics.span("meta_filter"):
+            proposals = _apply_meta_filter(proposals)
+    except Exception as exc:
+        # A broken meta artifact must not silently drop the whole cycle;
+        # the raw signals are persisted unfiltered instead.
+        errors += 1
+        print(f"❌ Meta filter error: {exc}")
+
+    portfolio_scale = 1.0
+    try:
+        with metrics.span("portfolio_cap"):
+            uncapped = proposals
+            proposals, portfolio_scale = _apply_portfolio_cap(db, proposals, fetched, queue)
+        for before, after in zip(uncapped, proposals):
+            if before.status != after.status == "RISK_BLOCKED":
+                counters[after.strategy_id].risk_blocked += 1
+    except Exception as exc:
+        # Without a correlation estimate the per-trade risk limits still hold.
+        errors += 1
+        print(f"❌ Portfolio risk error: {exc}")
+
+    # Phase 3: persist in a worker thread while this one notifies.
+    for result in staged(proposals, _persist_stage(db), depth=depth, name="persist"):
+        proposal = result.proposal
+        symbol = proposal.symbol
+        counter = counters[proposal.strategy_id]
+        try:
+            if result.error is not None:
+                raise result.error
+            if result.signal_id is None:
+                counter.duplicates += 1
                 print(
-                    f"ℹ️ Duplicate suppressed: {symbol} "
-                    f"{CONFIG.timeframe} candle={latest.timestamp_ms}"
+                    f"ℹ️ Duplicate suppressed: {proposal.strategy_id} {symbol} "
+                    f"{CONFIG.timeframe} candle={proposal.candle_timestamp_ms}"
                 )
                 continue
 
-            generated += 1
+            counter.generated += 1
+            if proposal.status == "META_REJECTED":
+                counter.meta_filtered += 1
 
             if (
-                status == "ACTIVE"
+                proposal.status == "ACTIVE"
                 and CONFIG.discord_webhook
-                and position_size is not None
+                and proposal.position_size is not None
             ):
-                send_discord_signal(
-                    CONFIG.discord_webhook,
-                    symbol,
-                    side,
-                    entry,
-                    stop_loss,
-                    take_profit,
-                    confidence,
-                )
+                with metrics.span("discord", symbol):
+                    send_discord_signal(
+                        CONFIG.discord_webhook,
+                        symbol,
+                        proposal.side,
+                        proposal.entry,
+                        proposal.stop_loss,
+                        proposal.take_profit,
+                        proposal.confidence,
+                    )
 
         except Exception as exc:
-            errors += 1
+            counter.errors += 1
             print(f"❌ Error {symbol}: {exc}")
 
+    if queue is not None:
+        # Tasks are done only once their signals are persisted; a worker that
+        # dies before this point leaves leases that expire and are reclaimed.
+        try:
+            for symbol in list(queue.held):
+                queue.complete(symbol)
+        except Exception as exc:
+            errors += 1
+            print(f"❌ Work queue error: {exc}")
+        if queue.lost:
+            print(
+                f"⚠️ Leases lost to other workers for {', '.join(queue.lost)}; "
+                "signal_key uniqueness kept their signals single"
+            )
+        counts = queue.counts()
+        print(
+            f"ℹ️ Worker {queue.worker_id}: processed={len(fetched)}, "
+            + ", ".join(f"{status.lower()}={n}" for status, n in sorted(counts.items()))
+        )
+
+    for strategy_id, counter in counters.items():
+        extra = "".join(f", {name}={value}" for name, value in counter.stats.items())
+        print(
+            f"ℹ️ Strategy {strategy_id}: "
+            f"evaluated={counter.evaluated}, no_signal={counter.no_signal}, "
+            f"generated={counter.generated}, duplicates_suppressed={counter.duplicates}, "
+            f"risk_blocked={counter.risk_blocked}, meta_filtered={counter.meta_filtered}, "
+            f"cpu_skipped={counter.cpu_skipped}, errors={counter.errors}, "
+            f"cpu_seconds={counter.cpu_seconds:.3f}{extra}"
+        )
+
+    totals = counters.values()
+    summary = {
+        "strategies": len(strategies),
+        "generated": sum(c.generated for c in totals),
+        "duplicates_suppressed": sum(c.duplicates for c in totals),
+        "risk_blocked": sum(c.risk_blocked for c in totals),
+        "meta_filtered": sum(c.meta_filtered for c in totals),
+        "refitted": sum(c.stats.get("refitted", 0) for c in totals),
+        "portfolio_scale": portfolio_scale,
+        "deferred": len(scheduler.deferred),
+        "errors": errors + sum(c.errors for c in totals),
+    }
+    for name, value in summary.items():
+        metrics.count(name, value)
     print(
         "✅ Cycle finished: "
-        f"generated={generated}, duplicates_suppressed={duplicates}, "
-        f"risk_blocked={risk_blocked}, errors={errors}"
+        + ", ".join(
+            f"{name}={value:.4f}" if name == "portfolio_scale" else f"{name}={value}"
+            for name, value in summary.items()
+        )
     )
 
 